@@ -34,13 +34,14 @@ bl_info = {
 
 if "bpy" in locals():
     import importlib
+    importlib.reload(profiler)
     importlib.reload(generate)
     importlib.reload(ui)
     importlib.reload(utils)
     importlib.reload(metarig_menu)
     importlib.reload(rig_lists)
 else:
-    from . import utils, rig_lists, generate, ui, metarig_menu
+    from . import profiler, utils, rig_lists, generate, ui, metarig_menu
 
 import bpy
 import sys
@@ -68,8 +69,23 @@ class GameRigPreferences(AddonPreferences):
         default=False
     )
 
+    reloads_rig_types : BoolProperty(
+        name='Reload Changed Rig Types',
+        description='Reload rig type and metarig modules whose files changed since they were loaded.',
+        default=False
+    )
+
+    profile_dir : StringProperty(
+        name='Profile Output',
+        description='Directory to write generation profiles to (JSON and Chrome trace). Empty to disable.',
+        subtype='DIR_PATH',
+        default=''
+    )
+
     def draw(self, context):
         self.layout.row().prop(self, 'shows_dev_tools')
+        self.layout.row().prop(self, 'reloads_rig_types')
+        self.layout.row().prop(self, 'profile_dir')
 
 
 class GameRigName(bpy.types.PropertyGroup):
@@ -152,6 +168,11 @@ class GameRigRigUITemplateName(bpy.types.PropertyGroup):
     name : bpy.props.StringProperty()
 
 
+class GameRigWidget(bpy.types.PropertyGroup):
+    name : StringProperty()
+    widget : PointerProperty(type=bpy.types.Object)
+
+
 ##### REGISTER #####
 
 classes = (
@@ -162,8 +183,22 @@ classes = (
     GameRigSelectionColors,
     GameRigArmatureLayer,
     GameRigRigUITemplateName,
+    GameRigWidget,
 )
 
+
+def keyframe_index_handlers():
+    """ Returns the (handler list, handler) pairs that keep the cached
+        keyframe indices valid.
+    """
+    return (
+        (bpy.app.handlers.load_post, utils.invalidate_keyframe_index),
+        (bpy.app.handlers.undo_post, utils.invalidate_keyframe_index),
+        (bpy.app.handlers.redo_post, utils.invalidate_keyframe_index),
+        (bpy.app.handlers.depsgraph_update_post, utils.invalidate_edited_keyframe_indices),
+    )
+
+
 def register():
     # Sub-modules.
     ui.register()
@@ -188,6 +223,7 @@ def register():
     bpy.types.Armature.gamerig_selection_colors = PointerProperty(type=GameRigSelectionColors)
     bpy.types.Armature.gamerig_colors_index = IntProperty(default=-1)
     bpy.types.Armature.gamerig_colors_lock = BoolProperty(default=True)
+    bpy.types.Armature.gamerig_widgets = CollectionProperty(type=GameRigWidget)
     bpy.types.Armature.gamerig_theme_to_add = EnumProperty(
         items=(
             ('THEME01', 'THEME01', ''),
@@ -214,6 +250,11 @@ def register():
         name='Theme'
     )
 
+    # Cached keyframe indices are keyed by action pointers
+    for handlers, handler in keyframe_index_handlers():
+        if handler not in handlers:
+            handlers.append(handler)
+
     bpy.types.PoseBone.gamerig_type = StringProperty(name="GameRig Type", description="Rig type for this bone")
     bpy.types.PoseBone.gamerig_parameters = PointerProperty(type=GameRigParameters)
 
@@ -231,13 +272,23 @@ def register():
     IDStore.gamerig_show_layer_names_pane = BoolProperty(default=False)
     IDStore.gamerig_show_bone_groups_pane = BoolProperty(default=False)
 
-    # Add rig parameters
+    # Add rig parameters, recording which parameters each rig type uses.
+    # Declarations stored in the rig type manifest don't need the module.
+    rig_lists.parameter_schema.clear()
     for rig in rig_lists.rig_list:
+        declarations = rig_lists.rig_parameters.get(rig)
+        if declarations is not None:
+            for name, prop_type, keywords in declarations:
+                setattr(GameRigParameters, name, utils.make_property(prop_type, keywords))
+            rig_lists.parameter_schema[rig] = tuple(name for name, prop_type, keywords in declarations)
+            continue
         r = utils.get_rig_type(rig)
+        recorder = utils.ParameterRecorder(GameRigParameters)
         try:
-            r.add_parameters(GameRigParameters)
+            r.add_parameters(recorder)
         except AttributeError:
             pass
+        rig_lists.parameter_schema[rig] = tuple(recorder.names)
 
 
 def unregister():
@@ -249,8 +300,14 @@ def unregister():
     del bpy.types.Armature.gamerig_selection_colors
     del bpy.types.Armature.gamerig_colors_index
     del bpy.types.Armature.gamerig_colors_lock
+    del bpy.types.Armature.gamerig_widgets
     del bpy.types.Armature.gamerig_theme_to_add
 
+    for handlers, handler in keyframe_index_handlers():
+        if handler in handlers:
+            handlers.remove(handler)
+    utils.invalidate_keyframe_index()
+
     del bpy.types.PoseBone.gamerig_type
     del bpy.types.PoseBone.gamerig_parameters
 
@@ -0,0 +1,995 @@
+#====================== BEGIN GPL LICENSE BLOCK ======================
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+#======================= END GPL LICENSE BLOCK ========================
+
+# <pep8 compliant>
+
+""" In-memory armature model.
+
+    ArmatureModel keeps the bones of an armature in NumPy arrays (head,
+    tail, roll, parent index, flags and layers) with a name -> index dict,
+    and ModelObject exposes them through the subset of the Object,
+    EditBone, PoseBone and constraint API that GameRig's rigs and bone
+    helpers use. Rig logic can edit the model without RNA round trips,
+    and commit() writes the result to a Blender armature in one pass.
+    A model loaded from an armature reads its bones by name when first
+    used, and commit() only writes the bones it created or changed.
+
+    Only commit() and from_object() need Blender. The model itself runs
+    under plain CPython with NumPy; it returns mathutils vectors when
+    mathutils is available and ndarray based Vec3 otherwise.
+"""
+
+import math
+import numpy as np
+
+try:
+    from mathutils import Vector, Matrix
+except ImportError:
+    Vector = Matrix = None
+
+
+class Vec3(np.ndarray):
+    """ Minimal stand-in for mathutils.Vector when mathutils is missing.
+    """
+    def __new__(cls, values=(0.0, 0.0, 0.0)):
+        return np.array(values, dtype=float).view(cls)
+
+    @property
+    def length(self):
+        return float(np.sqrt(np.dot(self, self)))
+
+    def normalized(self):
+        length = self.length
+        return self / length if length else self.copy()
+
+    def normalize(self):
+        length = self.length
+        if length:
+            self /= length
+
+    def dot(self, other):
+        return float(np.dot(self, other))
+
+    def cross(self, other):
+        return np.cross(self, other).view(Vec3)
+
+    x = property(lambda self: float(self[0]))
+    y = property(lambda self: float(self[1]))
+    z = property(lambda self: float(self[2]))
+
+
+def make_vector(values):
+    return Vector(values) if Vector is not None else Vec3(values)
+
+
+def make_matrix(values):
+    return Matrix(values.tolist()) if Matrix is not None else np.array(values)
+
+
+def plain_value(value):
+    """ Returns value, with vectors and property arrays turned into tuples.
+    """
+    if isinstance(value, str) or not hasattr(value, '__iter__') or hasattr(value, 'bl_rna'):
+        return value
+    return tuple(value)
+
+
+#=============================================
+# Bone orientation
+#=============================================
+
+def vec_roll_to_mat3(vec, roll):
+    """ Returns the 3x3 orientation of a bone with the given direction and
+        roll, like Blender's vec_roll_to_mat3(): the shortest rotation from
+        +Y to vec, followed by the roll around vec.
+    """
+    nor = np.asarray(vec, dtype=float)
+    nor = nor / np.linalg.norm(nor)
+    x, y, z = nor
+    theta = 1.0 + y
+    if theta > 1.0e-5 or ((x or z) and theta > 1.0e-9):
+        # R = I + K + K^2 / (1 + cos), with K the cross product matrix of Y x nor
+        k = np.array(((0.0, x, 0.0), (-x, 0.0, -z), (0.0, z, 0.0)))
+        b = np.identity(3) + k + (k @ k) / theta
+    else:
+        # nor is -Y: rotate 180 degrees around Z
+        b = np.diag((-1.0, -1.0, 1.0))
+
+    c, s = math.cos(roll), math.sin(roll)
+    n = np.array(((0.0, -z, y), (z, 0.0, -x), (-y, x, 0.0)))
+    r = c * np.identity(3) + s * n + (1.0 - c) * np.outer(nor, nor)
+    return r @ b
+
+
+def mat3_to_vec_roll(mat):
+    """ Returns the (direction, roll) of a 3x3 bone orientation, the inverse
+        of vec_roll_to_mat3().
+    """
+    mat = np.asarray(mat, dtype=float)[:3, :3]
+    vec = mat[:, 1].copy()
+    rollmat = vec_roll_to_mat3(vec, 0.0).T @ mat
+    return vec, math.atan2(rollmat[0, 2], rollmat[2, 2])
+
+
+#=============================================
+# Model
+#=============================================
+
+# Boolean edit bone settings, stored as arrays.
+BONE_FLAGS = (
+    'use_connect', 'use_deform', 'use_inherit_rotation', 'use_inherit_scale',
+    'use_local_location', 'hide', 'select', 'select_head', 'select_tail',
+)
+BONE_FLAG_DEFAULTS = {
+    'use_deform': True, 'use_inherit_rotation': True, 'use_inherit_scale': True,
+}
+
+# Settings utils.copy_bone() copies.
+BONE_COPY_FLAGS = (
+    'use_connect', 'use_deform', 'use_inherit_rotation', 'use_inherit_scale', 'use_local_location',
+)
+BONE_COPY_EXTRAS = ('bbone_segments', 'bbone_easein', 'bbone_easeout')
+
+# Other edit bone settings, stored per bone only once they are set.
+EDIT_BONE_DEFAULTS = {
+    'bbone_segments': 1, 'bbone_easein': 1.0, 'bbone_easeout': 1.0, 'bbone_x': 0.1, 'bbone_z': 0.1,
+    'use_envelope_multiply': False, 'envelope_distance': 0.25, 'envelope_weight': 1.0,
+    'head_radius': 0.1, 'tail_radius': 0.1,
+}
+
+# Pose bone settings read before anything set them.
+POSE_BONE_DEFAULTS = {
+    'rotation_mode': 'QUATERNION',
+    'rotation_quaternion': (1.0, 0.0, 0.0, 0.0), 'rotation_euler': (0.0, 0.0, 0.0),
+    'rotation_axis_angle': (0.0, 0.0, 1.0, 0.0),
+    'location': (0.0, 0.0, 0.0), 'scale': (1.0, 1.0, 1.0),
+    'lock_location': (False, False, False), 'lock_rotation': (False, False, False),
+    'lock_scale': (False, False, False), 'lock_rotation_w': False, 'lock_rotations_4d': False,
+    'lock_ik_x': False, 'lock_ik_y': False, 'lock_ik_z': False, 'ik_stretch': 0.0,
+    'custom_shape': None, 'custom_shape_transform': None, 'bone_group': None,
+}
+
+
+class ArmatureModel:
+    """ Bones of an armature in arrays, indexed by name.
+        Removed bones leave a hole (their name is None) until compact().
+        With a source armature (see from_bones()), bones are loaded from it
+        on first use, and the loaded state of each bone is kept so that
+        commit() can tell the changed bones apart.
+    """
+    def __init__(self, name="Armature"):
+        self.name = name
+        self.names = []
+        self.index = {}
+        self.source_names = []  # Name of each bone in the Blender armature, None for new bones
+        self.count = 0
+        self.head = np.zeros((0, 3))
+        self.tail = np.zeros((0, 3))
+        self.roll = np.zeros(0)
+        self.parent = np.zeros(0, dtype=int)
+        self.layers = np.zeros((0, 32), dtype=bool)
+        self.flags = {flag: np.zeros(0, dtype=bool) for flag in BONE_FLAGS}
+        self.extras = []        # Per bone {attribute: value} of EDIT_BONE_DEFAULTS settings
+        self.pose = []          # Per bone PoseData
+        self.removed = []       # Source names of removed bones
+        self.base = []          # Per bone edit_state() as loaded or committed, None for new bones
+        self.children_known = []  # Per bone, False until its source children are loaded
+        self.source = None      # Edit bones to load bones from
+        self.source_pose = None # Pose bones of the source
+        self.loaded = set()     # Source names loaded so far
+
+    def _reserve(self, count):
+        capacity = len(self.roll)
+        if count <= capacity:
+            return
+        capacity = max(count, 2 * capacity, 16)
+
+        def grow(array):
+            grown = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+            grown[:len(array)] = array
+            return grown
+
+        self.head = grow(self.head)
+        self.tail = grow(self.tail)
+        self.roll = grow(self.roll)
+        self.parent = grow(self.parent)
+        self.layers = grow(self.layers)
+        for flag in BONE_FLAGS:
+            self.flags[flag] = grow(self.flags[flag])
+
+    def exists(self, name):
+        """ True if a bone is named name, in the model or in the part of the
+            source that is not loaded yet.
+        """
+        if name in self.index:
+            return True
+        return self.source is not None and name not in self.loaded and name in self.source
+
+    def unique_name(self, name):
+        """ Returns name, or name.001, name.002... like Blender does for duplicates.
+        """
+        if not self.exists(name):
+            return name
+        base = name
+        if len(name) > 4 and name[-4] == '.' and name[-3:].isdigit():
+            base = name[:-4]
+        i = 1
+        while self.exists("%s.%03d" % (base, i)):
+            i += 1
+        return "%s.%03d" % (base, i)
+
+    def find(self, name):
+        """ Returns the index of the named bone, loading it (and its parents)
+            from the source if needed, or None if there is no such bone.
+        """
+        i = self.index.get(name)
+        if i is None and self.source is not None and name not in self.loaded:
+            eb = self.source.get(name)
+            if eb is not None:
+                i = self.load(eb)
+        return i
+
+    def find_source(self, name):
+        """ Returns the index of the bone loaded from the named source bone,
+            which may have been renamed since, loading it if needed. None if
+            it was removed.
+        """
+        if name not in self.loaded:
+            return self.find(name)
+        if name in self.index and self.source_names[self.index[name]] == name:
+            return self.index[name]
+        return next((i for i, source in enumerate(self.source_names) if source == name), None)
+
+    def load(self, eb):
+        """ Adds a bone of the source, with its parents, and returns its index.
+        """
+        parent = self.find_source(eb.parent.name) if eb.parent else None
+        if parent is None:
+            parent = -1
+        self.loaded.add(eb.name)
+        i = self.add(eb.name, source_name=eb.name)
+        self.head[i] = tuple(eb.head)
+        self.tail[i] = tuple(eb.tail)
+        self.roll[i] = eb.roll
+        self.parent[i] = parent
+        self.layers[i] = tuple(eb.layers)
+        for flag in BONE_FLAGS:
+            self.flags[flag][i] = getattr(eb, flag)
+        self.extras[i] = {key: getattr(eb, key) for key in BONE_COPY_EXTRAS}
+        self.children_known[i] = False
+        if self.source_pose is not None:
+            self.pose[i].source = self.source_pose.get(eb.name)
+        self.base[i] = self.edit_state(i)
+        return i
+
+    def load_children(self, i):
+        """ Loads the source children of a bone, for operations that change them.
+        """
+        if not self.children_known[i]:
+            self.children_known[i] = True
+            for child in self.source[self.source_names[i]].children:
+                self.find_source(child.name)
+
+    def load_all(self):
+        """ Loads every bone of the source.
+        """
+        if self.source is not None:
+            for name in self.source.keys():
+                self.find(name)
+
+    def edit_state(self, i):
+        """ Returns everything commit_edit_bones() writes for a bone, to
+            compare with its loaded state.
+        """
+        p = self.parent[i]
+        parent = (self.source_names[p] or ('new', self.names[p])) if p >= 0 else None
+        return (
+            self.head[i].tobytes(), self.tail[i].tobytes(), float(self.roll[i]), parent,
+            self.layers[i].tobytes(), tuple(bool(self.flags[flag][i]) for flag in BONE_FLAGS),
+            tuple(sorted(self.extras[i].items())),
+        )
+
+    def add(self, name, source_name=None):
+        """ Adds a bone and returns its index.
+        """
+        name = self.unique_name(name)
+        i = self.count
+        self._reserve(i + 1)
+        self.count += 1
+        self.names.append(name)
+        self.source_names.append(source_name)
+        self.index[name] = i
+        self.head[i] = 0.0
+        self.tail[i] = (0.0, 1.0, 0.0)
+        self.roll[i] = 0.0
+        self.parent[i] = -1
+        self.layers[i] = False
+        self.layers[i, 0] = True
+        for flag in BONE_FLAGS:
+            self.flags[flag][i] = BONE_FLAG_DEFAULTS.get(flag, False)
+        self.extras.append({})
+        self.pose.append(PoseData())
+        self.base.append(None)
+        self.children_known.append(True)
+        return i
+
+    def remove(self, i):
+        """ Removes a bone. Like in Blender, its children are parented to its
+            parent and disconnected.
+        """
+        self.load_children(i)
+        children = np.nonzero(self.parent[:self.count] == i)[0]
+        self.parent[children] = self.parent[i]
+        self.flags['use_connect'][children] = False
+        del self.index[self.names[i]]
+        if self.source_names[i] is not None:
+            self.removed.append(self.source_names[i])
+        self.names[i] = None
+        self.parent[i] = -1
+
+    def rename(self, i, name):
+        if name == self.names[i]:
+            return self.names[i]
+        name = self.unique_name(name)
+        del self.index[self.names[i]]
+        self.names[i] = name
+        self.index[name] = i
+        return name
+
+    def alive(self):
+        """ Indices of the bones that were not removed.
+        """
+        return [i for i, name in enumerate(self.names) if name is not None]
+
+    def children(self, i):
+        self.load_children(i)
+        return [int(c) for c in np.nonzero(self.parent[:self.count] == i)[0] if self.names[c] is not None]
+
+    def set_head(self, i, head):
+        """ Moves a head, and the tails of the connected children's parent
+            (as Blender keeps connected bones joined).
+        """
+        self.head[i] = head
+        if self.flags['use_connect'][i] and self.parent[i] >= 0:
+            self.tail[self.parent[i]] = head
+
+    def set_tail(self, i, tail):
+        self.tail[i] = tail
+        for c in self.children(i):
+            if self.flags['use_connect'][c]:
+                self.head[c] = tail
+
+    def copy(self, i, name):
+        """ Adds a copy of a bone, like utils.copy_bone(): its transform,
+            parent, layers, settings and pose settings. Returns its index.
+        """
+        j = self.add(name)
+        self.head[j] = self.head[i]
+        self.tail[j] = self.tail[i]
+        self.roll[j] = self.roll[i]
+        self.parent[j] = self.parent[i]
+        self.layers[j] = self.layers[i]
+        for flag in BONE_COPY_FLAGS:
+            self.flags[flag][j] = self.flags[flag][i]
+        self.extras[j] = {key: value for key, value in self.extras[i].items() if key in BONE_COPY_EXTRAS}
+        ModelPoseBone(self, j).copy_pose(ModelPoseBone(self, i))
+        return j
+
+    def matrix(self, i):
+        """ 4x4 rest matrix of a bone, as a nested array.
+        """
+        mat = np.identity(4)
+        mat[:3, :3] = vec_roll_to_mat3(self.tail[i] - self.head[i], self.roll[i])
+        mat[:3, 3] = self.head[i]
+        return mat
+
+    def compact(self):
+        """ Drops the holes of removed bones.
+        """
+        keep = self.alive()
+        remap = -np.ones(self.count + 1, dtype=int)
+        remap[keep] = np.arange(len(keep))
+        parent = self.parent[keep]
+        self.parent = np.where(parent >= 0, remap[parent], -1)
+        self.head = self.head[keep]
+        self.tail = self.tail[keep]
+        self.roll = self.roll[keep]
+        self.layers = self.layers[keep]
+        for flag in BONE_FLAGS:
+            self.flags[flag] = self.flags[flag][keep]
+        self.names = [self.names[i] for i in keep]
+        self.source_names = [self.source_names[i] for i in keep]
+        self.extras = [self.extras[i] for i in keep]
+        self.pose = [self.pose[i] for i in keep]
+        self.base = [self.base[i] for i in keep]
+        self.children_known = [self.children_known[i] for i in keep]
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.count = len(keep)
+
+    #-------------------------------------
+    # Blender I/O
+
+    @classmethod
+    def from_object(cls, obj):
+        """ Returns a model of an armature object, which must stay in edit
+            mode while the model loads its bones.
+        """
+        return cls.from_bones(obj.name, obj.data.edit_bones, obj.pose.bones)
+
+    @classmethod
+    def from_bones(cls, name, edit_bones, pose_bones=None):
+        """ Returns a model that loads bones from edit_bones when first used.
+            Pose bone settings are read from pose_bones the same way; bones
+            added in the current edit session have no pose bone yet.
+        """
+        model = cls(name)
+        model.source = edit_bones
+        model.source_pose = pose_bones
+        return model
+
+    def commit(self, obj):
+        """ Writes the model to a Blender armature object: the edit bones
+            in edit mode, then the pose bones.
+        """
+        from .utils import set_mode
+
+        set_mode('EDIT')
+        self.commit_edit_bones(obj.data.edit_bones)
+        set_mode('OBJECT')
+        self.commit_pose(obj)
+
+    def commit_edit_bones(self, edit_bones):
+        """ Writes the model to edit bones: bones are removed, renamed and
+            created, then the new bones and the ones whose transform,
+            parent, flags, layers or settings changed are written, parents
+            first. Bones the model never loaded are left alone.
+            Returns the number of bones written.
+        """
+        self.compact()
+        for name in self.removed:
+            if name in edit_bones:
+                edit_bones.remove(edit_bones[name])
+        self.removed = []
+        dirty = [i for i in range(self.count) if self.base[i] is None or self.base[i] != self.edit_state(i)]
+
+        # Rename in two steps, so that swapped names don't collide
+        renamed = [(edit_bones[source], name) for source, name in zip(self.source_names, self.names)
+                   if source is not None and source != name and source in edit_bones]
+        for eb, name in renamed:
+            eb.name = "~" + name
+        for eb, name in renamed:
+            eb.name = name
+        for i in range(self.count):
+            if self.source_names[i] is None:
+                edit_bones.new(self.names[i])
+
+        # Parents first: connecting a bone moves its head, the transforms
+        # set below then restore the model's.
+        written = [edit_bones[self.names[i]] for i in dirty]
+        for i, eb in zip(dirty, written):
+            p = self.parent[i]
+            eb.parent = edit_bones[self.names[p]] if p >= 0 else None
+            eb.use_connect = bool(self.flags['use_connect'][i])
+            for key, value in self.extras[i].items():
+                setattr(eb, key, value)
+        for i, eb in zip(dirty, written):
+            eb.head = tuple(self.head[i])
+            eb.tail = tuple(self.tail[i])
+            eb.roll = float(self.roll[i])
+            eb.layers = [bool(v) for v in self.layers[i]]
+            for flag in BONE_FLAGS:
+                if flag != 'use_connect':
+                    setattr(eb, flag, bool(self.flags[flag][i]))
+
+        self.source_names = list(self.names)
+        self.loaded = set(self.names)
+        self.base = [self.edit_state(i) for i in range(self.count)]
+        return len(dirty)
+
+    def commit_pose(self, obj):
+        """ Writes the pose bone settings, custom properties and constraints
+            the model changed. obj must be out of edit mode.
+        """
+        pose_bones = obj.pose.bones
+        for name, data in zip(self.names, self.pose):
+            if data.pending():
+                data.commit(pose_bones[name], obj, self)
+
+
+class PoseData:
+    """ Pose bone settings, custom properties and constraints of a model
+        bone. Settings are read from the source pose bone, if any, when
+        first used. Only the ones set on the model are written by commit().
+    """
+    def __init__(self, source=None):
+        self.source = source
+        self.attrs = {}
+        self.changed = set()
+        self._props = None
+        self.changed_props = set()
+        self.constraints = []
+
+    def get(self, name):
+        """ Returns a pose bone setting. Raises AttributeError for unknown ones.
+        """
+        if name in self.attrs:
+            return self.attrs[name]
+        if self.source is not None:
+            value = self.attrs[name] = plain_value(getattr(self.source, name))
+            return value
+        if name in POSE_BONE_DEFAULTS:
+            return POSE_BONE_DEFAULTS[name]
+        raise AttributeError(name)
+
+    def pending(self):
+        """ True if commit() has anything to write.
+        """
+        return bool(self.changed or self.changed_props or any(not con.committed for con in self.constraints))
+
+    @property
+    def props(self):
+        if self._props is None:
+            source = self.source
+            self._props = {key: source[key] for key in source.keys()} if source is not None else {}
+        return self._props
+
+    def commit(self, pose_bone, obj, model):
+        for key in self.changed:
+            setattr(pose_bone, key, resolve(self.attrs[key], obj, model))
+        for key in self.changed_props:
+            pose_bone[key] = self.props[key]
+        for con in self.constraints:
+            if con.committed:
+                continue
+            real = pose_bone.constraints.new(type=con.type)
+            for key in con.order:
+                setattr(real, key, resolve(con.attrs[key], obj, model))
+            con.committed = True
+        self.changed = set()
+        self.changed_props = set()
+
+
+def idprop_dict(value):
+    """ Returns a plain dict copy of an ID property group (or dict), {} for None.
+    """
+    if value is None:
+        return {}
+    return value.to_dict() if hasattr(value, 'to_dict') else dict(value)
+
+
+def resolve(value, obj, model):
+    """ Replaces model objects and bones by the Blender ones in committed values.
+    """
+    if isinstance(value, ModelObject) and value.model is model:
+        return obj
+    if isinstance(value, ModelPoseBone):
+        return obj.pose.bones[value.name]
+    return value
+
+
+#=============================================
+# API proxies
+#=============================================
+
+class ModelEditBone:
+    """ EditBone interface to a model bone.
+    """
+    __slots__ = ('model', 'i')
+
+    def __init__(self, model, i):
+        object.__setattr__(self, 'model', model)
+        object.__setattr__(self, 'i', i)
+
+    def __eq__(self, other):
+        return isinstance(other, ModelEditBone) and other.model is self.model and other.i == self.i
+
+    def __hash__(self):
+        return hash((id(self.model), self.i))
+
+    def __repr__(self):
+        return "ModelEditBone(%r)" % self.name
+
+    @property
+    def name(self):
+        return self.model.names[self.i]
+
+    @name.setter
+    def name(self, value):
+        self.model.rename(self.i, value)
+
+    @property
+    def head(self):
+        return make_vector(self.model.head[self.i])
+
+    @head.setter
+    def head(self, value):
+        self.model.set_head(self.i, tuple(value))
+
+    @property
+    def tail(self):
+        return make_vector(self.model.tail[self.i])
+
+    @tail.setter
+    def tail(self, value):
+        self.model.set_tail(self.i, tuple(value))
+
+    @property
+    def roll(self):
+        return float(self.model.roll[self.i])
+
+    @roll.setter
+    def roll(self, value):
+        self.model.roll[self.i] = value
+
+    @property
+    def vector(self):
+        return make_vector(self.model.tail[self.i] - self.model.head[self.i])
+
+    @property
+    def center(self):
+        return make_vector((self.model.head[self.i] + self.model.tail[self.i]) / 2.0)
+
+    @property
+    def length(self):
+        return float(np.linalg.norm(self.model.tail[self.i] - self.model.head[self.i]))
+
+    @length.setter
+    def length(self, value):
+        vec = self.model.tail[self.i] - self.model.head[self.i]
+        norm = np.linalg.norm(vec)
+        vec = vec / norm if norm else np.array((0.0, 1.0, 0.0))
+        self.model.set_tail(self.i, self.model.head[self.i] + vec * value)
+
+    @property
+    def matrix(self):
+        return make_matrix(self.model.matrix(self.i))
+
+    @matrix.setter
+    def matrix(self, value):
+        mat = np.array([list(row) for row in value], dtype=float)
+        vec, roll = mat3_to_vec_roll(mat)
+        length = self.length
+        head = mat[:3, 3]
+        self.model.set_head(self.i, head)
+        self.model.set_tail(self.i, head + vec / np.linalg.norm(vec) * length)
+        self.model.roll[self.i] = roll
+
+    def _axis(self, column):
+        return make_vector(vec_roll_to_mat3(self.model.tail[self.i] - self.model.head[self.i], self.model.roll[self.i])[:, column])
+
+    x_axis = property(lambda self: self._axis(0))
+    y_axis = property(lambda self: self._axis(1))
+    z_axis = property(lambda self: self._axis(2))
+
+    def translate(self, vec):
+        vec = np.asarray(tuple(vec), dtype=float)
+        self.model.head[self.i] += vec
+        self.model.tail[self.i] += vec
+
+    def align_orientation(self, other):
+        """ Aligns the direction and roll to other, keeping the head and length.
+        """
+        length = self.length
+        vec = other.model.tail[other.i] - other.model.head[other.i]
+        self.model.set_tail(self.i, self.model.head[self.i] + vec / np.linalg.norm(vec) * length)
+        self.model.roll[self.i] = other.model.roll[other.i]
+
+    @property
+    def parent(self):
+        p = self.model.parent[self.i]
+        return ModelEditBone(self.model, int(p)) if p >= 0 else None
+
+    @parent.setter
+    def parent(self, value):
+        # Like EditBone.parent, doesn't move a connected head; clearing it disconnects
+        self.model.parent[self.i] = value.i if value is not None else -1
+        if value is None:
+            self.model.flags['use_connect'][self.i] = False
+
+    @property
+    def use_connect(self):
+        return bool(self.model.flags['use_connect'][self.i])
+
+    @use_connect.setter
+    def use_connect(self, value):
+        self.model.flags['use_connect'][self.i] = value
+        if value and self.model.parent[self.i] >= 0:
+            self.model.head[self.i] = self.model.tail[self.model.parent[self.i]]
+
+    @property
+    def parent_recursive(self):
+        parents = []
+        p = self.model.parent[self.i]
+        while p >= 0:
+            parents.append(ModelEditBone(self.model, int(p)))
+            p = self.model.parent[p]
+        return parents
+
+    @property
+    def children(self):
+        return [ModelEditBone(self.model, c) for c in self.model.children(self.i)]
+
+    @property
+    def children_recursive(self):
+        result = []
+        stack = self.model.children(self.i)
+        while stack:
+            c = stack.pop()
+            result.append(ModelEditBone(self.model, c))
+            stack.extend(self.model.children(c))
+        return result
+
+    @property
+    def layers(self):
+        return [bool(v) for v in self.model.layers[self.i]]
+
+    @layers.setter
+    def layers(self, value):
+        self.model.layers[self.i] = tuple(value)
+
+    def __getattr__(self, name):
+        if name in BONE_FLAGS:
+            return bool(self.model.flags[name][self.i])
+        if name in EDIT_BONE_DEFAULTS:
+            return self.model.extras[self.i].get(name, EDIT_BONE_DEFAULTS[name])
+        raise AttributeError("ModelEditBone has no attribute '%s'" % name)
+
+    def __setattr__(self, name, value):
+        if isinstance(getattr(type(self), name, None), property):
+            object.__setattr__(self, name, value)
+        elif name in BONE_FLAGS:
+            self.model.flags[name][self.i] = value
+        elif name in EDIT_BONE_DEFAULTS:
+            self.model.extras[self.i][name] = value
+        else:
+            object.__setattr__(self, name, value)
+
+
+class ModelEditBones:
+    """ edit_bones (and bones) collection interface to a model.
+    """
+    def __init__(self, model):
+        self.model = model
+
+    def __len__(self):
+        self.model.load_all()
+        return len(self.model.index)
+
+    def __contains__(self, name):
+        return self.model.find(name) is not None
+
+    def _index(self, key):
+        if isinstance(key, int):
+            key = self.keys()[key]
+        i = self.model.find(key)
+        if i is None:
+            raise KeyError("bone '%s' not found" % key)
+        return i
+
+    def __getitem__(self, key):
+        return ModelEditBone(self.model, self._index(key))
+
+    def __iter__(self):
+        self.model.load_all()
+        return (ModelEditBone(self.model, i) for i in self.model.alive())
+
+    def get(self, name, default=None):
+        i = self.model.find(name)
+        return ModelEditBone(self.model, i) if i is not None else default
+
+    def keys(self):
+        self.model.load_all()
+        return [self.model.names[i] for i in self.model.alive()]
+
+    def values(self):
+        return list(self)
+
+    def items(self):
+        return [(bone.name, bone) for bone in self]
+
+    def new(self, name):
+        return ModelEditBone(self.model, self.model.add(name))
+
+    def remove(self, bone):
+        self.model.remove(bone.i)
+
+
+class ModelConstraint:
+    """ Constraint recorded on a model pose bone.
+    """
+    def __init__(self, con_type):
+        object.__setattr__(self, 'type', con_type)
+        object.__setattr__(self, 'name', 'IK' if con_type == 'IK' else con_type.replace('_', ' ').title())
+        object.__setattr__(self, 'attrs', {})
+        object.__setattr__(self, 'order', [])
+        object.__setattr__(self, 'committed', False)
+
+    def __getattr__(self, name):
+        try:
+            return self.attrs[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        if name not in self.order:
+            self.order.append(name)
+        self.attrs[name] = value
+
+
+class ModelConstraints:
+    def __init__(self, data):
+        self.data = data
+
+    def __len__(self):
+        return len(self.data.constraints)
+
+    def __iter__(self):
+        return iter(self.data.constraints)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return next(con for con in self.data.constraints if con.name == key)
+        return self.data.constraints[key]
+
+    def new(self, type):
+        con = ModelConstraint(type)
+        self.data.constraints.append(con)
+        return con
+
+
+class ModelPoseBone:
+    """ PoseBone interface to a model bone: settings, custom properties
+        and constraints.
+    """
+    __slots__ = ('model', 'i')
+
+    def __init__(self, model, i):
+        object.__setattr__(self, 'model', model)
+        object.__setattr__(self, 'i', i)
+
+    def __repr__(self):
+        return "ModelPoseBone(%r)" % self.name
+
+    @property
+    def _data(self):
+        return self.model.pose[self.i]
+
+    @property
+    def name(self):
+        return self.model.names[self.i]
+
+    @property
+    def bone(self):
+        return ModelEditBone(self.model, self.i)
+
+    @property
+    def parent(self):
+        p = self.model.parent[self.i]
+        return ModelPoseBone(self.model, int(p)) if p >= 0 else None
+
+    @property
+    def constraints(self):
+        return ModelConstraints(self._data)
+
+    def __getattr__(self, name):
+        try:
+            return self.model.pose[self.i].get(name)
+        except AttributeError:
+            raise AttributeError("ModelPoseBone has no attribute '%s'" % name)
+
+    def __setattr__(self, name, value):
+        data = self.model.pose[self.i]
+        if not isinstance(value, (ModelObject, ModelPoseBone)):
+            value = plain_value(value)
+        data.attrs[name] = value
+        data.changed.add(name)
+
+    def __getitem__(self, key):
+        return self._data.props[key]
+
+    def __setitem__(self, key, value):
+        self._data.props[key] = value
+        self._data.changed_props.add(key)
+
+    def __contains__(self, key):
+        return key in self._data.props
+
+    def get(self, key, default=None):
+        return self._data.props.get(key, default)
+
+    def keys(self):
+        return list(self._data.props.keys())
+
+    def copy_pose(self, other):
+        """ Copies rotation mode, transform locks and custom properties (with
+            their UI settings) from another model pose bone, like
+            utils.copy_pose_bones().
+        """
+        for key in ('rotation_mode', 'rotation_axis_angle', 'rotation_euler', 'rotation_quaternion',
+                    'lock_location', 'lock_scale', 'lock_rotation', 'lock_rotation_w', 'lock_rotations_4d'):
+            setattr(self, key, getattr(other, key))
+        keys = [key for key in other.keys() if key not in ("_RNA_UI", "gamerig_parameters", "gamerig_type")]
+        for key in keys:
+            self[key] = other[key]
+
+        ui = idprop_dict(other.get("_RNA_UI"))
+        if ui and any(key in ui for key in keys):
+            own_ui = idprop_dict(self.get("_RNA_UI"))
+            for key in keys:
+                if key in ui:
+                    own_ui[key] = ui[key]
+            self["_RNA_UI"] = own_ui
+
+
+class ModelPoseBones(ModelEditBones):
+    def __getitem__(self, key):
+        return ModelPoseBone(self.model, self._index(key))
+
+    def __iter__(self):
+        self.model.load_all()
+        return (ModelPoseBone(self.model, i) for i in self.model.alive())
+
+    def get(self, name, default=None):
+        i = self.model.find(name)
+        return ModelPoseBone(self.model, i) if i is not None else default
+
+
+class ModelArmature:
+    def __init__(self, model):
+        self.name = model.name
+        self.edit_bones = ModelEditBones(model)
+        self.bones = self.edit_bones
+
+
+class ModelPose:
+    def __init__(self, model):
+        self.bones = ModelPoseBones(model)
+
+
+class ModelObject:
+    """ Stands in for an armature object in edit mode, so that rig code and
+        the utils bone helpers can run against an ArmatureModel.
+    """
+    is_armature_model = True
+    type = 'ARMATURE'
+    mode = 'EDIT'
+
+    def __init__(self, model, name=None):
+        self.model = model
+        self.name = name or model.name
+        self.data = ModelArmature(model)
+        self.pose = ModelPose(model)
+
+    @classmethod
+    def from_object(cls, obj):
+        """ Returns a model object of a Blender armature object, which must
+            stay in edit mode until the model is committed.
+        """
+        return cls(ArmatureModel.from_object(obj), obj.name)
+
+    def copy_bone(self, bone_name, assign_name=''):
+        """ Same as utils.copy_bone() for the model: returns the name of a new
+            copy of the named bone.
+        """
+        i = self.data.edit_bones._index(bone_name)
+        return self.model.names[self.model.copy(i, assign_name or bone_name)]
+
+    def commit(self, obj):
+        """ Writes the model to a Blender armature object.
+        """
+        self.model.commit(obj)
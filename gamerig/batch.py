@@ -0,0 +1,285 @@
+#====================== BEGIN GPL LICENSE BLOCK ======================
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+#======================= END GPL LICENSE BLOCK ========================
+
+# <pep8 compliant>
+
+""" Headless batch rig generation.
+
+    Generate rigs for many .blend files, spread over a pool of background
+    Blender processes:
+
+        python batch.py --blender /path/to/blender --jobs 4 \\
+            --summary summary.json chars/a.blend chars/b.blend::metarig.001
+
+    or equivalently from Blender's own Python:
+
+        blender --background --python batch.py -- --jobs 4 chars/*.blend
+
+    Each item is "<file.blend>[::<metarig name>]". Without a metarig name,
+    every metarig in the file is generated. Results are saved in place, or
+    into --output-dir if given; a file is not saved if any of its metarigs
+    failed. The summary holds per-file timing and errors.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ADDON_NAME = "gamerig"
+ITEM_SEPARATOR = "::"
+
+
+#=============================================
+# Worker (runs inside a background Blender)
+#=============================================
+
+def find_metarigs(names=None):
+    """ Returns the metarig objects of the open file, or the named ones.
+    """
+    import bpy
+    if names:
+        return [bpy.data.objects[name] for name in names]
+    return [
+        obj for obj in bpy.data.objects
+        if obj.type == 'ARMATURE' and obj.data.get("gamerig_id") is None
+        and any(pb.gamerig_type for pb in obj.pose.bones)
+    ]
+
+
+def run_worker(metarig_names, output, result_path):
+    """ Generates the rigs of the open file and saves it, unless a rig
+        failed to generate.
+    """
+    import bpy
+    import addon_utils
+
+    result = {'file': bpy.data.filepath, 'rigs': [], 'error': None, 'saved': False}
+    start = time.perf_counter()
+    try:
+        addon_utils.enable(ADDON_NAME, default_set=True, handle_error=None)
+        generate = sys.modules[ADDON_NAME + ".generate"]
+
+        for metarig in find_metarigs(metarig_names):
+            rig_start = time.perf_counter()
+            entry = {'metarig': metarig.name, 'error': None}
+            try:
+                # generate_rig works on the active object in the metarig's collection
+                view_layer = bpy.context.view_layer
+                collection = metarig.users_collection[0]
+                layer_collection = _find_layer_collection(view_layer.layer_collection, collection)
+                if layer_collection is not None:
+                    view_layer.active_layer_collection = layer_collection
+                for obj in view_layer.objects:
+                    obj.select_set(False)
+                metarig.select_set(True)
+                view_layer.objects.active = metarig
+                generate.generate_rig(bpy.context, metarig, force=True)
+            except Exception as e:
+                entry['error'] = "%s: %s" % (type(e).__name__, e)
+            entry['time'] = time.perf_counter() - rig_start
+            result['rigs'].append(entry)
+
+        # A failed generation leaves a half built rig, keep the file as it was.
+        if not any(entry['error'] for entry in result['rigs']):
+            if output:
+                bpy.ops.wm.save_as_mainfile(filepath=output)
+            else:
+                bpy.ops.wm.save_mainfile()
+            result['saved'] = True
+    except Exception as e:
+        result['error'] = "%s: %s" % (type(e).__name__, e)
+    result['time'] = time.perf_counter() - start
+
+    with open(result_path, 'w') as f:
+        json.dump(result, f)
+
+
+def _find_layer_collection(layer_collection, collection):
+    if layer_collection.collection == collection:
+        return layer_collection
+    for child in layer_collection.children:
+        found = _find_layer_collection(child, collection)
+        if found is not None:
+            return found
+    return None
+
+
+#=============================================
+# Driver
+#=============================================
+
+def parse_item(item):
+    """ Splits "file.blend::metarig" into (file, [metarig]).
+    """
+    if ITEM_SEPARATOR in item:
+        path, name = item.split(ITEM_SEPARATOR, 1)
+        return path, [name]
+    return item, []
+
+
+def group_items(items):
+    """ Merges items on the same file, so each file is opened once.
+        Returns [(path, [metarig names])]; an empty list means all metarigs.
+    """
+    files = {}
+    order = []
+    for item in items:
+        path, names = parse_item(item)
+        path = os.path.abspath(path)
+        if path not in files:
+            files[path] = names
+            order.append(path)
+        elif files[path] and names:
+            files[path] += names
+        else:
+            files[path] = []
+    return [(path, files[path]) for path in order]
+
+
+def output_paths(paths, output_dir):
+    """ Returns the output path of each input path, '' to save in place.
+        Raises ValueError if two inputs would be saved to the same file.
+    """
+    if not output_dir:
+        return [''] * len(paths)
+    outputs = [os.path.join(output_dir, os.path.basename(path)) for path in paths]
+    seen = {}
+    for path, output in zip(paths, outputs):
+        if output in seen:
+            raise ValueError("%s and %s would both be saved as %s" % (seen[output], path, output))
+        seen[output] = path
+    return outputs
+
+
+def run_file(blender, path, metarig_names, output, result_path):
+    """ Runs one worker Blender process on a file, and returns its result.
+        output: where to save the file, '' to save it in place.
+        result_path: the JSON file the worker reports to, one per input.
+    """
+    cmd = [
+        blender, '--background', '--factory-startup', path,
+        '--python', os.path.abspath(__file__), '--',
+        '--worker', '--result', result_path, '--output', output,
+    ]
+    for name in metarig_names:
+        cmd += ['--metarig', name]
+
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
+    try:
+        with open(result_path) as f:
+            result = json.load(f)
+        os.remove(result_path)
+    except (OSError, ValueError):
+        result = {'file': path, 'rigs': [], 'error': "worker exited with code %d" % proc.returncode, 'saved': False}
+    result['wall_time'] = time.perf_counter() - start
+    if result['error'] or any(r['error'] for r in result['rigs']):
+        result['log'] = proc.stdout[-4000:]
+    return result
+
+
+def run_batch(blender, items, jobs=None, output_dir=None):
+    """ Generates all items over a pool of Blender processes.
+        Returns the list of per-file results, in item order.
+        Raises ValueError if two inputs would be saved to the same file.
+    """
+    files = group_items(items)
+    outputs = output_paths([path for path, names in files], output_dir)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    jobs = jobs or os.cpu_count() or 1
+    result_dir = tempfile.mkdtemp(prefix="gamerig_batch_")
+    try:
+        # Each job is a separate Blender process, threads only wait on them.
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            futures = [
+                pool.submit(
+                    run_file, blender, path, names, output,
+                    os.path.join(result_dir, "result_%d.json" % i)
+                )
+                for i, ((path, names), output) in enumerate(zip(files, outputs))
+            ]
+            return [f.result() for f in futures]
+    finally:
+        shutil.rmtree(result_dir, ignore_errors=True)
+
+
+def print_summary(results):
+    failed = 0
+    for result in results:
+        errors = [result['error']] if result['error'] else []
+        errors += ["%s: %s" % (r['metarig'], r['error']) for r in result['rigs'] if r['error']]
+        failed += bool(errors)
+        print("%s %8.2fs  %s (%d rigs%s)" % (
+            "FAIL" if errors else "ok  ", result['wall_time'], result['file'], len(result['rigs']),
+            "" if result.get('saved') else ", not saved"
+        ))
+        for error in errors:
+            print("      " + error)
+    print("%d files, %d failed" % (len(results), failed))
+    return failed
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Generate GameRig rigs in background Blender processes.")
+    parser.add_argument('items', nargs='*', help="<file.blend>[::<metarig name>]")
+    parser.add_argument('--blender', default=None, help="Blender executable (default: this Blender, or 'blender')")
+    parser.add_argument('--jobs', '-j', type=int, default=None, help="Number of Blender processes (default: CPU count)")
+    parser.add_argument('--output-dir', default=None, help="Save results here instead of overwriting the inputs")
+    parser.add_argument('--summary', default=None, help="Write the per-file timing and error summary as JSON")
+    # Worker side
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--metarig', action='append', default=[], help=argparse.SUPPRESS)
+    parser.add_argument('--output', default='', help=argparse.SUPPRESS)
+    parser.add_argument('--result', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        run_worker(args.metarig, args.output, args.result)
+        return 0
+
+    blender = args.blender
+    if blender is None:
+        try:
+            import bpy
+            blender = bpy.app.binary_path
+        except ImportError:
+            blender = 'blender'
+
+    try:
+        results = run_batch(blender, args.items, args.jobs, args.output_dir)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.summary:
+        with open(args.summary, 'w') as f:
+            json.dump(results, f, indent=1)
+    return 1 if print_summary(results) else 0
+
+
+if __name__ == "__main__":
+    # Under Blender, script arguments follow "--".
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else sys.argv[1:]
+    code = main(argv)
+    if '--worker' not in argv:
+        sys.exit(code)
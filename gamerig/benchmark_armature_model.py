@@ -0,0 +1,325 @@
+#====================== BEGIN GPL LICENSE BLOCK ======================
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+#======================= END GPL LICENSE BLOCK ========================
+
+# <pep8 compliant>
+
+""" Armature model benchmark, under plain CPython (NumPy only).
+
+    Checks the bone orientation math of armature_model against Blender's
+    conventions, then builds limb IK bone structures on a model with
+    limb_model.build_ik_bones(), the code Limb.create_ik() runs, checks the
+    result and times it. It also runs Limb.create_ik()'s load, build and
+    commit cycle against a recording stand-in for Blender's bone
+    collections, checking that each commit writes the new bones only:
+
+        python benchmark_armature_model.py --limbs 200 --runs 5
+
+    Exits with a non-zero status if a check fails.
+"""
+
+import argparse
+import importlib
+import math
+import os
+import random
+import statistics
+import sys
+import time
+import types
+
+PACKAGE_NAME = "gamerig_model"
+
+
+def load_modules():
+    """ Imports armature_model and limb_model from this directory as a
+        package, without running its __init__ (which registers the add-on
+        and needs Blender).
+    """
+    package = types.ModuleType(PACKAGE_NAME)
+    package.__path__ = [os.path.dirname(os.path.abspath(__file__))]
+    sys.modules[PACKAGE_NAME] = package
+    return (
+        importlib.import_module(PACKAGE_NAME + ".armature_model"),
+        importlib.import_module(PACKAGE_NAME + ".rigs.limbs.limb_model"),
+    )
+
+
+#=============================================
+# Checks
+#=============================================
+
+def close(a, b, tolerance=1e-6):
+    return all(abs(x - y) <= tolerance for x, y in zip(a, b))
+
+
+def check_orientation(am, samples=1000):
+    """ vec_roll_to_mat3() gives Blender's orientations, and mat3_to_vec_roll()
+        inverts it.
+    """
+    np = am.np
+    # Bone along +Z with no roll: X stays X, Z points to -Y (as in Blender)
+    mat = am.vec_roll_to_mat3((0.0, 0.0, 1.0), 0.0)
+    assert close(mat[:, 0], (1, 0, 0)) and close(mat[:, 1], (0, 0, 1)) and close(mat[:, 2], (0, -1, 0)), mat
+    # Bone along -Y: 180 degrees around Z
+    assert close(am.vec_roll_to_mat3((0.0, -1.0, 0.0), 0.0).ravel(), np.diag((-1.0, -1.0, 1.0)).ravel())
+
+    rng = random.Random(0)
+    for i in range(samples):
+        vec = [rng.gauss(0.0, 1.0) for j in range(3)]
+        roll = rng.uniform(-math.pi, math.pi)
+        mat = am.vec_roll_to_mat3(vec, roll)
+        assert np.allclose(mat.T @ mat, np.identity(3), atol=1e-9), (vec, roll)
+        assert abs(np.linalg.det(mat) - 1.0) < 1e-9, (vec, roll)
+        assert np.allclose(mat[:, 1], np.asarray(vec) / np.linalg.norm(vec)), (vec, roll)
+        vec2, roll2 = am.mat3_to_vec_roll(mat)
+        assert abs(math.remainder(roll2 - roll, 2 * math.pi)) < 1e-7, (vec, roll, roll2)
+
+
+def add_arm_bones(edit_bones, count):
+    """ Adds count arms (upper arm, forearm, hand ORG bones and a limb
+        parent) to edit bones. Returns their (ORG bone names, parent name).
+    """
+    limbs = []
+    for k in range(count):
+        x = float(k)
+        names = ["ORG-upper_arm_%d.L" % k, "ORG-forearm_%d.L" % k, "ORG-hand_%d.L" % k]
+        points = [(x, 0.0, 1.5), (x + 0.3, 0.05, 1.5), (x + 0.6, 0.0, 1.5), (x + 0.7, 0.0, 1.5)]
+        for name, head, tail in zip(names, points, points[1:]):
+            bone = edit_bones.new(name)
+            bone.head = head
+            bone.tail = tail
+            bone.roll = 0.3
+        parent = edit_bones.new("MCH-upper_arm_%d_parent.L" % k)
+        parent.head = points[0]
+        parent.tail = (x + 0.075, 0.0, 1.5)
+        limbs.append((names, parent.name))
+    return limbs
+
+
+def build_arms(am, limb_model, count):
+    """ Builds count arms on a new model, and their IK bones.
+        Returns the model object, the arms and the build_ik_bones() results.
+    """
+    obj = am.ModelObject(am.ArmatureModel("rig"))
+    limbs = add_arm_bones(obj.data.edit_bones, count)
+    results = [
+        limb_model.build_ik_bones(obj, names, parent, 'arm', 'automatic', True)
+        for names, parent in limbs
+    ]
+    return obj, limbs, results
+
+
+def check_arms(am, obj, limbs, results):
+    eb = obj.data.edit_bones
+    pb = obj.pose.bones
+    for (names, parent), bones in zip(limbs, results):
+        ctrl = bones['ctrl']['limb']
+        upper, forearm, hand = names
+        assert ctrl == upper[4:].replace(".L", "_ik.L"), ctrl
+        assert eb[ctrl].parent.name == parent
+        assert eb[bones['mch_str']].parent.name == parent
+        assert eb[bones['mch_ik']].parent.name == ctrl
+        assert close(eb[bones['mch_ik']].head, eb[forearm].head)
+        assert abs(eb[bones['mch_target']].length - eb[hand].length / 4) < 1e-9
+        assert abs(eb[bones['mch_target']].roll - eb[hand].roll) < 1e-9
+        assert close(eb[bones['mch_str']].tail, eb[hand].head)
+
+        cons = list(pb[bones['mch_ik']].constraints)
+        assert len(cons) == 1 and cons[0].type == 'IK', cons
+        assert cons[0].target is obj and cons[0].subtarget == bones['mch_target']
+        assert cons[0].chain_count == 2 and cons[0].use_stretch
+        assert (pb[bones['mch_ik']].lock_ik_x, pb[bones['mch_ik']].lock_ik_y, pb[bones['mch_ik']].lock_ik_z) == (False, True, True)
+        assert pb[ctrl].lock_location == (True, True, True) and pb[ctrl].lock_rotation == (False, False, True)
+        assert pb[ctrl].ik_stretch == 0.1 and pb[bones['mch_ik']].ik_stretch == 0.1
+    assert len(eb) == len(limbs) * 8, len(eb)
+
+
+#=============================================
+# Commit
+#=============================================
+
+class RecordedBone:
+    """ Stands in for a Blender EditBone, counting attribute writes.
+    """
+    def __init__(self, bones, name, am):
+        values = dict(
+            name=name, head=(0.0, 0.0, 0.0), tail=(0.0, 1.0, 0.0), roll=0.0, parent=None,
+            layers=(True,) + (False,) * 31,
+        )
+        values.update({flag: am.BONE_FLAG_DEFAULTS.get(flag, False) for flag in am.BONE_FLAGS})
+        values.update(am.EDIT_BONE_DEFAULTS)
+        self.__dict__['bones'] = bones
+        self.__dict__.update(values)
+
+    def __setattr__(self, key, value):
+        self.bones.writes += 1
+        if key in ('head', 'tail'):
+            value = tuple(float(v) for v in value)
+        elif key == 'name':
+            del self.bones.items[self.name]
+            self.bones.items[value] = self
+        elif key == 'use_connect' and value and self.parent is not None:
+            self.__dict__['head'] = self.parent.tail
+        self.__dict__[key] = value
+
+    @property
+    def children(self):
+        return [bone for bone in self.bones.items.values() if bone.parent is self]
+
+
+class RecordedBones:
+    """ Stands in for Blender's edit_bones collection.
+    """
+    def __init__(self, am):
+        self.am = am
+        self.items = {}
+        self.writes = 0
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, name):
+        return name in self.items
+
+    def __getitem__(self, name):
+        return self.items[name]
+
+    def get(self, name, default=None):
+        return self.items.get(name, default)
+
+    def keys(self):
+        return list(self.items)
+
+    def new(self, name):
+        bone = self.items[name] = RecordedBone(self, name, self.am)
+        return bone
+
+    def remove(self, bone):
+        del self.items[bone.name]
+
+
+class RecordedConstraints(list):
+    def new(self, type):
+        con = types.SimpleNamespace(type=type)
+        self.append(con)
+        return con
+
+
+class RecordedPoseBones(dict):
+    """ Stands in for Blender's pose.bones: a pose bone for each edit bone.
+    """
+    def __init__(self, am, edit_bones):
+        self.am = am
+        self.edit_bones = edit_bones
+
+    def __missing__(self, name):
+        if name not in self.edit_bones:
+            raise KeyError(name)
+        pb = self[name] = types.SimpleNamespace(constraints=RecordedConstraints(), **self.am.POSE_BONE_DEFAULTS)
+        pb.keys = lambda: []
+        return pb
+
+    def get(self, name, default=None):
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+
+def build_committed_arms(am, limb_model, count):
+    """ Adds count arms to a recorded armature, then builds their IK bones
+        one arm at a time as Limb.create_ik() does: load a model of the
+        armature, build, commit. Returns the armature, the arms, the
+        build_ik_bones() results and the number of edit bone writes of
+        each commit.
+    """
+    rig = types.SimpleNamespace(name="rig")
+    rig.data = types.SimpleNamespace(edit_bones=RecordedBones(am))
+    rig.pose = types.SimpleNamespace(bones=RecordedPoseBones(am, rig.data.edit_bones))
+    edit_bones = rig.data.edit_bones
+    limbs = add_arm_bones(edit_bones, count)
+
+    results = []
+    writes = []
+    for names, parent in limbs:
+        model = am.ModelObject(am.ArmatureModel.from_bones(rig.name, edit_bones, rig.pose.bones))
+        results.append(limb_model.build_ik_bones(model, names, parent, 'arm', 'automatic', True))
+        before = edit_bones.writes
+        model.model.commit_edit_bones(edit_bones)
+        model.model.commit_pose(rig)
+        writes.append(edit_bones.writes - before)
+    return rig, limbs, results, writes
+
+
+def check_committed_arms(am, rig, limbs, results, writes):
+    """ The committed armature holds the IK bones, and every commit wrote
+        the same number of edit bone attributes, however many bones the
+        armature already had.
+    """
+    eb = rig.data.edit_bones
+    pb = rig.pose.bones
+    for (names, parent), bones in zip(limbs, results):
+        ctrl = bones['ctrl']['limb']
+        upper, forearm, hand = names
+        assert eb[ctrl].parent is eb[parent]
+        assert eb[bones['mch_ik']].parent is eb[ctrl]
+        assert eb[upper].parent is None
+        assert close(eb[bones['mch_ik']].head, eb[forearm].head)
+        assert close(eb[bones['mch_str']].tail, eb[hand].head)
+        cons = pb[bones['mch_ik']].constraints
+        assert len(cons) == 1 and cons[0].type == 'IK' and cons[0].target is rig, cons
+        assert cons[0].subtarget == bones['mch_target']
+        assert (pb[bones['mch_ik']].lock_ik_y, pb[bones['mch_ik']].lock_ik_z) == (True, True)
+        assert tuple(pb[ctrl].lock_location) == (True, True, True)
+    assert len(eb) == len(limbs) * 8, len(eb)
+    assert len(set(writes)) == 1, writes
+
+
+#=============================================
+# Main
+#=============================================
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Check and benchmark the GameRig armature model under plain CPython.")
+    parser.add_argument('--limbs', type=int, default=200, help="Arms built per run")
+    parser.add_argument('--runs', type=int, default=5, help="Timed runs")
+    args = parser.parse_args(argv)
+
+    am, limb_model = load_modules()
+    check_orientation(am)
+    check_arms(am, *build_arms(am, limb_model, 3))
+    committed = build_committed_arms(am, limb_model, 50)
+    check_committed_arms(am, *committed)
+    print("checks passed, %d edit bone writes per arm commit" % committed[3][0])
+
+    for label, build in (("model", build_arms), ("load and commit per arm", build_committed_arms)):
+        times = []
+        for i in range(args.runs):
+            start = time.perf_counter()
+            build(am, limb_model, args.limbs)
+            times.append(time.perf_counter() - start)
+        median = statistics.median(times)
+        bones = args.limbs * 8
+        print("%s: %d arms (%d bones): median %.3fs over %d runs, %.0f bones/s" % (
+            label, args.limbs, bones, median, args.runs, bones / median
+        ))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
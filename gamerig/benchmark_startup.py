@@ -0,0 +1,110 @@
+#====================== BEGIN GPL LICENSE BLOCK ======================
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+#======================= END GPL LICENSE BLOCK ========================
+
+# <pep8 compliant>
+
+""" Add-on startup benchmark.
+
+    Times enabling the add-on in fresh background Blender processes, without
+    the rig type manifest (every rig module is imported) and with it, turned
+    on through the GAMERIG_RIG_MANIFEST environment variable:
+
+        python benchmark_startup.py --blender /path/to/blender --runs 5
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ADDON_NAME = "gamerig"
+MANIFEST_NAME = "gamerig_rig_manifest.json"  # Same as rig_lists.MANIFEST_NAME
+MANIFEST_ENV = "GAMERIG_RIG_MANIFEST"  # Same as rig_lists.MANIFEST_ENV
+RESULT_PREFIX = "GAMERIG_STARTUP"
+
+
+def run_worker(cold):
+    """ Enables the add-on and prints the time it took.
+    """
+    import bpy
+    import addon_utils
+
+    if cold:
+        path = os.path.join(bpy.utils.user_resource('CONFIG'), MANIFEST_NAME)
+        if os.path.exists(path):
+            os.remove(path)
+
+    start = time.perf_counter()
+    addon_utils.enable(ADDON_NAME, default_set=False, handle_error=None)
+    duration = time.perf_counter() - start
+
+    rig_modules = [name for name in sys.modules if name.startswith(ADDON_NAME + ".rigs.")]
+    print("%s %f %d" % (RESULT_PREFIX, duration, len(rig_modules)))
+
+
+def run_blender(blender, cold):
+    cmd = [
+        blender, '--background', '--factory-startup',
+        '--python', os.path.abspath(__file__), '--', '--worker',
+    ]
+    env = dict(os.environ)
+    env.pop(MANIFEST_ENV, None)
+    if cold:
+        cmd.append('--cold')
+    else:
+        env[MANIFEST_ENV] = "1"
+    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True, env=env)
+    for line in proc.stdout.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            _, duration, modules = line.split()
+            return float(duration), int(modules)
+    raise RuntimeError("Blender did not report a startup time:\n" + proc.stdout[-4000:])
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Benchmark GameRig add-on startup with and without the rig type manifest.")
+    parser.add_argument('--blender', default='blender', help="Blender executable")
+    parser.add_argument('--runs', type=int, default=5, help="Runs per configuration")
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--cold', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        run_worker(args.cold)
+        return 0
+
+    results = {}
+    for label, cold in (("without manifest", True), ("with manifest", False)):
+        if not cold:
+            run_blender(args.blender, False)  # Make sure the manifest is written
+        runs = [run_blender(args.blender, cold) for i in range(args.runs)]
+        results[label] = statistics.median(d for d, m in runs)
+        print("%-17s median %.3fs  (%d rig modules imported)" % (label, results[label], runs[-1][1]))
+
+    print("ratio without/with manifest: %.2f" % (results["without manifest"] / results["with manifest"]))
+    return 0
+
+
+if __name__ == "__main__":
+    # Under Blender, script arguments follow "--".
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else sys.argv[1:]
+    code = main(argv)
+    if '--worker' not in argv:
+        sys.exit(code)
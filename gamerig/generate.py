@@ -19,18 +19,22 @@
 # <pep8 compliant>
 
 import bpy
+import numpy as np
 import re
-import time
+import hashlib
 import traceback
 import sys
 from rna_prop_ui import rna_idprop_ui_prop_get
 from .utils import (
     get_rig_type, create_widget, assign_and_unlink_all_widgets,
     is_org, is_mch,is_jig,  org, get_wgt_name, random_id,
-    copy_attributes, gamma_correct,
+    ORG_PREFIX, JIG_PREFIX, MCH_PREFIX,
+    copy_attributes, get_copy_attributes, gamma_correct,
+    BoneHierarchy, set_bone_hierarchy, invalidate_bone_hierarchy,
+    set_mode, begin_mode_pipeline, end_mode_pipeline,
     MetarigError
 )
-from . import rig_lists
+from . import rig_lists, rig_ir, profiler
 
 
 RIG_MODULE = "rigs"
@@ -38,24 +42,25 @@ ORG_LAYER = [n == 31 for n in range(0, 32)]  # Armature layer that original bone
 MCH_LAYER = [n == 30 for n in range(0, 32)]  # Armature layer that mechanism bones should be moved to.
 
 
-class Timer:
-    def __init__(self):
-        self.timez = time.time()
-
-    def tick(self, string):
-        t = time.time()
-        print(string + "%.3f" % (t - self.timez))
-        self.timez = t
-
-
 # TODO: generalize to take a group as input instead of an armature.
-def generate_rig(context, metarig):
+def generate_rig(context, metarig, use_mode_pipeline=True, force=False, profile_path=None, use_ir=True):
     """ Generates a rig from a metarig.
+        use_mode_pipeline: run all rigs in a single edit mode session where
+        possible, batching pose bone work instead of toggling modes per bone.
+        force: regenerate even if the metarig is unchanged since the last
+        generation.
+        use_ir: replay the recorded generation of an unchanged metarig
+        instead of running the rig types, and record it otherwise.
+        profile_path: if given, the generation profile is written to
+        <profile_path>.json and <profile_path>.trace.json (Chrome trace).
+        Returns False if generation was skipped, True otherwise.
     """
-    t = Timer()
+    prof = profiler.start("Generate rig")
 
-    # clear created widget list
+    # clear created widget list, shared widget meshes and widget registry
     create_widget.created_widgets = None
+    create_widget.shared_widgets = None
+    create_widget.registry = None
 
     # Find overwrite target rig if exists
     rig_name = metarig.data.gamerig_rig_name
@@ -72,6 +77,22 @@ def generate_rig(context, metarig):
 
     bpy.ops.object.mode_set(mode='OBJECT')
 
+    # Skip regeneration if nothing the rig is built from has changed, and
+    # what it generated is still there. Otherwise every rig is rebuilt.
+    fingerprints = get_rig_fingerprints(metarig)
+    if obj is not None:
+        changed = changed_rigs(metarig, obj.data.get("gamerig_fingerprints"), fingerprints)
+        if not changed and not force and generated_outputs_exist(obj):
+            print("Rig is up to date, skip generation.")
+            metarig.data.pose_position = rest_backup
+            profiler.stop()
+            return False
+        print("Changed rigs: %s" % ", ".join(sorted(changed)))
+        # Invalidate until this generation succeeds
+        for key in ("gamerig_fingerprints", "gamerig_outputs"):
+            if key in obj.data:
+                del obj.data[key]
+
     scene = context.scene
     view_layer = context.view_layer
     collection = context.collection
@@ -79,6 +100,7 @@ def generate_rig(context, metarig):
     id_store = context.window_manager
     #------------------------------------------
     # Create/find the rig object and set it up
+    prof.begin("Duplicate rig")
 
     # Check if the generated rig already exists, so we can
     # regenerate in the same object.  If not, create a new
@@ -125,48 +147,14 @@ def generate_rig(context, metarig):
     for child in obj.children:
         childs[child] = child.parent_bone
 
-    # Remove all bones from the generated rig armature.
-    bpy.ops.object.mode_set(mode='EDIT')
-    for bone in obj.data.edit_bones:
-        obj.data.edit_bones.remove(bone)
-    bpy.ops.object.mode_set(mode='OBJECT')
-
-    # Create temporary duplicates for merging
-    temp_rig_1 = metarig.copy()
-    temp_rig_1.data = metarig.data.copy()
-    collection.objects.link(temp_rig_1)
-
-    temp_rig_2 = metarig.copy()
-    temp_rig_2.data = obj.data
-    collection.objects.link(temp_rig_2)
-
-    # Select the temp rigs for merging
-    for objt in collection.objects:
-        objt.select_set(False)  # deselect all objects
-    temp_rig_1.select_set(True)
-    temp_rig_2.select_set(True)
-    view_layer.objects.active = temp_rig_2
-
-    # Merge the temporary rigs
-    bpy.ops.object.join()
-
-    # Delete the second temp rig
-    bpy.ops.object.delete()
-
-    # Select the generated rig
-    for objt in scene.objects:
-        objt.select_set(False)  # deselect all objects
-    obj.select_set(True)
-    view_layer.objects.active = obj
-
-    # Copy over bone properties
-    for bone in metarig.data.bones:
-        bone_gen = obj.data.bones[bone.name]
-
-        # B-bone stuff
-        bone_gen.bbone_segments = bone.bbone_segments
-        bone_gen.bbone_easein = bone.bbone_easein
-        bone_gen.bbone_easeout = bone.bbone_easeout
+    # Remove all bones from the generated rig armature,
+    # then build the original bones directly from the metarig's bone data.
+    set_mode('EDIT')
+    edit_bones = obj.data.edit_bones
+    for bone in edit_bones:
+        edit_bones.remove(bone)
+    copy_armature_bones(metarig.data, edit_bones)
+    set_mode('OBJECT')
 
     # Copy over the pose_bone properties
     for bone in metarig.pose.bones:
@@ -182,12 +170,7 @@ def generate_rig(context, metarig):
 
         # gamerig_type and gamerig_parameters
         bone_gen.gamerig_type = bone.gamerig_type
-        for prop in dir(bone_gen.gamerig_parameters):
-            if (not prop.startswith("_")) and (not prop.startswith("bl_")) and (prop != "rna_type"):
-                try:
-                    setattr(bone_gen.gamerig_parameters, prop, getattr(bone.gamerig_parameters, prop))
-                except AttributeError:
-                    print("FAILED TO COPY PARAMETER: " + str(prop))
+        copy_parameters(bone.gamerig_parameters, bone_gen.gamerig_parameters, bone.gamerig_type.replace(" ", ""))
 
         # Custom properties
         for prop in bone.keys():
@@ -255,13 +238,14 @@ def generate_rig(context, metarig):
                 k2 = d2.keyframe_points[i]
                 copy_attributes(k1, k2)
 
-    t.tick("Duplicate rig: ")
+    prof.end()
     #----------------------------------
+    prof.begin("Sort bones")
     # Make a list of the original bones so we can keep track of them.
     original_bones = [bone.name for bone in obj.data.bones]
 
     # Add the ORG_PREFIX to the original bones.
-    bpy.ops.object.mode_set(mode='OBJECT')
+    set_mode('OBJECT')
     for i in range(0, len(original_bones)):
         obj.data.bones[original_bones[i]].name = org(original_bones[i])
         original_bones[i] = org(original_bones[i])
@@ -269,58 +253,112 @@ def generate_rig(context, metarig):
     # Create a sorted list of the original bones, sorted in the order we're
     # going to traverse them for rigging.
     # (root-most -> leaf-most, alphabetical)
-    bones_sorted = []
-    for name in original_bones:
-        bones_sorted.append(name)
-    bones_sorted.sort()  # first sort by names
-    bones_sorted.sort(key=lambda bone: len(obj.pose.bones[bone].parent_recursive))  # then parents before children
-    t.tick("Make list of org bones: ")
+    hierarchy = BoneHierarchy(obj.data.bones, obj.pose.bones)
+    bones_sorted = hierarchy.sorted(original_bones)
+    prof.end()
 
     #----------------------------------
-    try:
-        # Collect/initialize all the rigs.
-        rigs = []
-        rigtypes = set()
-        for bone in bones_sorted:
-            bpy.ops.object.mode_set(mode='EDIT')
-            rigs += get_bone_rigs(obj, bone, rigtypes)
-        t.tick("Initialize rigs: ")
-
-        # Generate all the rigs.
-        tt = Timer()
-        ui_scripts = []
-        for rig in rigs:
-            # Go into editmode in the rig armature
-            bpy.ops.object.mode_set(mode='OBJECT')
-            context.view_layer.objects.active = obj
-            obj.select_set(True)
-            bpy.ops.object.mode_set(mode='EDIT')
-            scripts = rig.generate()
-            if scripts is not None:
-                ui_scripts.append(scripts[0])
-            tt.tick("Generate rig : %s: " % rig)
-        t.tick("Generate rigs: ")
-    except Exception as e:
-        # Cleanup if something goes wrong
-        print("GameRig: failed to generate rig.")
+    def restore_after_failure():
+        """ Puts the metarig, the rig and the scene back after a failed
+            generation or replay.
+        """
+        profiler.stop()
+        invalidate_bone_hierarchy()
+        assign_and_unlink_all_widgets(collection, obj)
+        for i in toggledArmatureModifiers:
+            i.object = obj
         metarig.data.pose_position = rest_backup
         obj.data.pose_position = 'POSE'
         bpy.ops.object.mode_set(mode='OBJECT')
 
-        # Continue the exception
-        raise e
+    ir = rig_ir.load_rig_ir(metarig, fingerprints['']) if use_ir else None
+    if ir is not None:
+        # Nothing the rig is built from changed since the IR was recorded
+        prof.begin("Replay rig IR", obj)
+        try:
+            ui_scripts, rig_type_names = rig_ir.replay_rig_ir(obj, ir)
+            rigtypes = set(get_rig_type(name) for name in rig_type_names)
+        except rig_ir.ReplayError as e:
+            # Don't keep a rig that differs from what the rig types build:
+            # drop the IR and generate again from scratch.
+            print("GameRig: %s" % e)
+            print("GameRig: generate from the rig types instead.")
+            rig_ir.remove_rig_ir(metarig)
+            restore_after_failure()
+            return generate_rig(context, metarig, use_mode_pipeline, True, profile_path, use_ir)
+        except Exception as e:
+            print("GameRig: failed to replay rig IR.")
+            rig_ir.remove_rig_ir(metarig)
+            restore_after_failure()
+            raise e
+        prof.end()
+    else:
+        pipeline = begin_mode_pipeline() if use_mode_pipeline else None
+        try:
+            # Collect/initialize all the rigs.
+            prof.begin("Initialize rigs")
+            # Rig initializers only read the original bones, so they can share
+            # the hierarchy index. Rig generation reparents bones, so it is
+            # dropped before that.
+            set_bone_hierarchy(obj, hierarchy)
+            rigs = []
+            rig_bones = []
+            rigtypes = set()
+            for bone in bones_sorted:
+                set_mode('EDIT')
+                bone_rigs = get_bone_rigs(obj, bone, rigtypes)
+                rigs += bone_rigs
+                rig_bones += [bone] * len(bone_rigs)
+            invalidate_bone_hierarchy()
+            prof.end()
+
+            # Generate all the rigs.
+            prof.begin("Generate rigs", obj)
+            ui_scripts = []
+            for rig, bone in zip(rigs, rig_bones):
+                prof.begin("%s (%s)" % (rig.__class__.__module__.split('.', 2)[-1], bone), obj)
+                # Go into editmode in the rig armature
+                if pipeline is not None and obj.mode == 'EDIT' and view_layer.objects.active == obj:
+                    # Already editing the rig, stay in this edit session. The
+                    # switch to edit mode below is counted as saved by set_mode().
+                    pipeline.saved += 1
+                else:
+                    set_mode('OBJECT')
+                    context.view_layer.objects.active = obj
+                    obj.select_set(True)
+                set_mode('EDIT')
+                scripts = rig.generate()
+                if scripts is not None:
+                    ui_scripts.append(scripts[0])
+                prof.end()
+
+            # Apply pending pose bone work in one pass.
+            end_mode_pipeline()
+            prof.end()
+        except Exception as e:
+            # Cleanup if something goes wrong
+            print("GameRig: failed to generate rig.")
+            if pipeline is not None:
+                pipeline.pose_queue = []
+                end_mode_pipeline()
+            restore_after_failure()
+
+            # Continue the exception
+            raise e
+
+        if pipeline is not None:
+            print(pipeline.report())
+
+        if use_ir:
+            with prof.span("Record rig IR"):
+                rig_ir.store_rig_ir(metarig, rig_ir.record_rig_ir(obj, fingerprints[''], ui_scripts, rigtypes))
 
     #----------------------------------
-    bpy.ops.object.mode_set(mode='OBJECT')
-
-    # Get a list of all the bones in the armature
-    bones = [bone.name for bone in obj.data.bones]
+    prof.begin("Layers and drivers")
+    set_mode('OBJECT')
 
-    # All the others make non-deforming. (except for bone that already has 'ORG-' prefix from metarig.)
-    for bone in bones:
-        b = obj.data.bones[bone]
-        if not is_org(b.name) or not b.name in metarig.data.bones:
-            b.use_deform = False
+    # Deform flags and bone layers, and the layers with control bones on them
+    vis_layers = assign_bone_layers(obj, original_bones, metarig.data.bones.keys())
 
     # Alter marked driver targets
     if obj.animation_data:
@@ -334,24 +372,10 @@ def generate_rig(context, metarig):
                         else:
                             target.data_path = 'pose.bones["%s"]["%s"]' % (org(bone), prop)
 
-    # Move all the original bones to their layer.
-    for bone in original_bones:
-        obj.data.bones[bone].layers = ORG_LAYER
-
-    # Move all the bones with names starting with "MCH-" to their layer.
-    for bone in bones:
-        if is_mch(obj.data.bones[bone].name):
-            obj.data.bones[bone].layers = MCH_LAYER
-
     # Assign shapes to bones
-    assign_and_unlink_all_widgets(collection, obj)
+    with prof.span("Widgets"):
+        assign_and_unlink_all_widgets(collection, obj)
     # Reveal all the layers with control bones on them
-    vis_layers = [False for n in range(0, 32)]
-    for bone in bones:
-        for i in range(0, 32):
-            vis_layers[i] = vis_layers[i] or obj.data.bones[bone].layers[i]
-    for i in range(0, 32):
-        vis_layers[i] = vis_layers[i] and not (ORG_LAYER[i] or MCH_LAYER[i])
     obj.data.layers = vis_layers
 
     # Ensure the collection of layer names exists
@@ -364,7 +388,10 @@ def generate_rig(context, metarig):
         #print(l.name)
         layer_layout.append((l.name, l.row))
 
+    prof.end()
+
     # Generate the UI script
+    prof.begin("UI script")
     rig_ui_name = 'gamerig_ui_%s.py' % rig_id
 
     if rig_ui_name in bpy.data.texts.keys():
@@ -396,25 +423,29 @@ def generate_rig(context, metarig):
 
     # Run UI script
     exec(script.as_string(), {})
+    prof.end()
 
     # Create Selection Sets
-    create_selection_sets(obj, metarig)
+    with prof.span("Selection sets"):
+        create_selection_sets(obj, metarig)
 
     # Create Bone Groups
-    create_bone_groups(obj, metarig)
+    with prof.span("Bone groups"):
+        create_bone_groups(obj, metarig)
 
     # Add rig_ui to logic
     create_persistent_rig_ui(obj, script)
-    
+
     # Remove all jig bones.
-    bpy.ops.object.mode_set(mode='EDIT')
+    prof.begin("Deconfigure")
+    set_mode('EDIT')
     for bone in [bone.name for bone in obj.data.edit_bones]:
         if is_jig(bone):
             obj.data.edit_bones.remove(obj.data.edit_bones[bone])
 
     #----------------------------------
     # Deconfigure
-    bpy.ops.object.mode_set(mode='OBJECT')
+    set_mode('OBJECT')
     metarig.data.pose_position = rest_backup
     obj.data.pose_position = 'POSE'
 
@@ -430,8 +461,9 @@ def generate_rig(context, metarig):
     # Restore active collection
     view_layer.active_layer_collection = layer_collection
 
-    t.tick("The rest: ")
-
+    # Remember what this rig was generated from, and what it generated
+    obj.data["gamerig_fingerprints"] = fingerprints
+    obj.data["gamerig_outputs"] = get_generated_outputs(obj, script)
 
     # set location generated rig to metarig location
     obj.location            = metarig.location
@@ -440,8 +472,120 @@ def generate_rig(context, metarig):
     obj.rotation_quaternion = metarig.rotation_quaternion
     obj.rotation_axis_angle = metarig.rotation_axis_angle
     obj.scale               = metarig.scale
+    prof.end()
+
+    profiler.stop()
+    print(prof.summary())
+    if profile_path:
+        prof.write(profile_path)
+
+    return True
+
+
+def assign_bone_layers(obj, original_bones, metarig_bones):
+    """ Makes every bone non-deforming except the ORG bones that come from
+        the metarig, moves original bones to ORG_LAYER and "MCH-" bones to
+        MCH_LAYER, and returns the other layers that still hold bones.
+        Works on whole arrays, with one foreach_get/foreach_set per property.
+    """
+    bones = obj.data.bones
+    n = len(bones)
+    names = np.array(bones.keys(), dtype=str)
+
+    # Classify the bones by name
+    keep_deform = (np.char.startswith(names, ORG_PREFIX) | np.char.startswith(names, JIG_PREFIX)) & np.isin(names, metarig_bones)
+    is_original = np.isin(names, original_bones)
+    is_mechanism = np.char.startswith(names, MCH_PREFIX)
+
+    deform = np.empty(n, dtype=bool)
+    bones.foreach_get('use_deform', deform)
+    bones.foreach_set('use_deform', deform & keep_deform)
+
+    layers = np.empty(n * 32, dtype=bool)
+    bones.foreach_get('layers', layers)
+    layers = layers.reshape(n, 32)
+    org_layer = np.array(ORG_LAYER)
+    mch_layer = np.array(MCH_LAYER)
+    layers[is_original] = org_layer
+    layers[is_mechanism] = mch_layer
+    bones.foreach_set('layers', layers.ravel())
+
+    return (layers.any(axis=0) & ~(org_layer | mch_layer)).tolist()
+
+
+def copy_parameters(params_1, params_2, rig_type):
+    """ Copies the gamerig_parameters of rig_type from params_1 to params_2,
+        which must still hold the defaults.
+        Parameters left at their default have no ID property, so only the ID
+        properties of params_1 that the rig type declares are transferred.
+    """
+    schema = rig_lists.parameter_schema.get(rig_type)
+    for key in params_1.keys():
+        if schema is None or key in schema:
+            params_2[key] = params_1[key]
 
-    t.tick("The rest: ")
+
+# Bone attributes copy_armature_bones() sets itself, or leaves to the new bone.
+BONE_COPY_SKIP_ATTRIBUTES = {
+    'name', 'head', 'tail', 'roll', 'matrix', 'layers', 'parent', 'use_connect',
+    'select', 'select_head', 'select_tail',
+}
+# Older spellings of a setting, skipped when the newer one exists.
+BONE_LEGACY_ATTRIBUTES = {'use_inherit_scale': 'inherit_scale'}
+
+
+def get_bone_copy_attributes(bone, edit_bone):
+    """ Returns the writable attributes of bone that edit_bone also has, as
+        (value attributes, bone pointer attributes), cached per RNA type.
+    """
+    key = (bone.bl_rna.identifier, edit_bone.bl_rna.identifier)
+    attrs = get_bone_copy_attributes.cache.get(key)
+    if attrs is None:
+        edit_keys = set(get_copy_attributes(edit_bone))
+        keys = [
+            k for k in get_copy_attributes(bone)
+            if k in edit_keys and k not in BONE_COPY_SKIP_ATTRIBUTES
+            and BONE_LEGACY_ATTRIBUTES.get(k) not in edit_keys
+        ]
+        properties = bone.bl_rna.properties
+        pointers = tuple(k for k in keys if properties[k].type == 'POINTER')
+        attrs = get_bone_copy_attributes.cache[key] = (
+            tuple(k for k in keys if k not in pointers), pointers
+        )
+    return attrs
+
+get_bone_copy_attributes.cache = {}
+
+
+def copy_armature_bones(armature, edit_bones):
+    """ Creates a copy of every bone of armature in edit_bones (the edit
+        bones of another armature, which must be in edit mode), with the
+        bone settings and custom properties.
+        Reads rest pose bone data only, so armature may stay out of edit mode.
+    """
+    values, pointers = (), ()
+    for bone in armature.bones:
+        eb = edit_bones.new(bone.name)
+        eb.head = bone.head_local
+        eb.tail = bone.tail_local
+        eb.matrix = bone.matrix_local  # keeps head and length, sets the roll
+        eb.layers = tuple(bone.layers)
+        if not values:
+            values, pointers = get_bone_copy_attributes(bone, eb)
+        for attr in values:
+            setattr(eb, attr, getattr(bone, attr))
+        for key in bone.keys():
+            eb[key] = bone[key]
+
+    # Parents and other bone references exist once every bone is created
+    for bone in armature.bones:
+        eb = edit_bones[bone.name]
+        if bone.parent:
+            eb.parent = edit_bones[bone.parent.name]
+            eb.use_connect = bone.use_connect
+        for attr in pointers:
+            target = getattr(bone, attr)
+            setattr(eb, attr, edit_bones[target.name] if target is not None else None)
 
 
 def create_selection_sets(obj, metarig):
@@ -450,7 +594,7 @@ def create_selection_sets(obj, metarig):
     if 'bone_selection_groups' not in bpy.context.preferences.addons and 'bone_selection_sets' not in bpy.context.preferences.addons:
         return
 
-    bpy.ops.object.mode_set(mode='POSE')
+    set_mode('POSE')
 
     bpy.context.view_layer.objects.active = obj
     obj.select_set(True)
@@ -462,6 +606,7 @@ def create_selection_sets(obj, metarig):
             continue
 
         bpy.ops.pose.select_all(action='DESELECT')
+        profiler.count(profiler.OPERATOR_CALLS)
         for b in pbones:
             if b.bone.layers[i]:
                 b.bone.select = True
@@ -481,7 +626,7 @@ def create_selection_sets(obj, metarig):
 
 def create_bone_groups(obj, metarig):
 
-    bpy.ops.object.mode_set(mode='OBJECT')
+    set_mode('OBJECT')
     pb = obj.pose.bones
     layers = metarig.data.gamerig_layers
     groups = metarig.data.gamerig_colors
@@ -569,6 +714,158 @@ def get_bone_rigs(obj, bone_name, rigtypes, halt_on_missing=False):
     return rigs
 
 
+def _fingerprint_value(value):
+    """ Returns a stable string for a property value.
+    """
+    if isinstance(value, float):
+        return "%.5f" % value
+    if hasattr(value, '__len__') and not isinstance(value, str):
+        return "(%s)" % ", ".join(_fingerprint_value(v) for v in value)
+    if hasattr(value, 'name'):
+        return value.name
+    return repr(value)
+
+
+def _bone_fingerprint_data(metarig, bone):
+    """ Returns everything generation reads from one metarig bone, as a string.
+    """
+    pbone = metarig.pose.bones[bone.name]
+    data = [
+        bone.name,
+        bone.parent.name if bone.parent else "",
+        _fingerprint_value(bone.head_local),
+        _fingerprint_value(bone.tail_local),
+        _fingerprint_value([v for row in bone.matrix_local for v in row]),
+        _fingerprint_value(bone.layers),
+        repr((bone.use_connect, bone.use_deform, bone.use_inherit_rotation, bone.use_local_location)),
+        repr((bone.bbone_segments, bone.use_inherit_scale)),
+        _fingerprint_value((bone.bbone_easein, bone.bbone_easeout)),
+        pbone.gamerig_type,
+        pbone.rotation_mode,
+        _fingerprint_value((pbone.lock_location, pbone.lock_rotation, pbone.lock_scale)),
+        repr((pbone.lock_rotation_w, pbone.lock_rotations_4d)),
+    ]
+    params = pbone.gamerig_parameters
+    for key in sorted(params.keys()):
+        data.append("%s=%s" % (key, _fingerprint_value(getattr(params, key, params[key]))))
+    for key in sorted(pbone.keys()):
+        if key not in ("_RNA_UI", "gamerig_parameters", "gamerig_type"):
+            data.append("%s=%s" % (key, _fingerprint_value(pbone[key])))
+    for con in pbone.constraints:
+        data.append("%s:%s:%s:%s:%s" % (
+            con.type, con.name, _fingerprint_value(con.influence),
+            getattr(con, 'target', None) and con.target.name, getattr(con, 'subtarget', '')
+        ))
+    return "\n".join(data)
+
+
+def _rig_module_version(rig_type):
+    """ Returns a version string for a rig type module, hashed from its file
+        and the files of the add-on modules it imports.
+    """
+    return rig_ir.rig_types_version([rig_type])
+
+
+def get_rig_fingerprints(metarig):
+    """ Fingerprints every rig on the metarig.
+        Returns a {bone_name: hex digest} dict, one entry per bone with a rig
+        type, hashed from the transforms of the ORG bones the rig can read
+        (the bone and its descendants), its gamerig_parameters, the rig type
+        module version and the version of the shared add-on modules. The ''
+        entry covers the whole metarig, including armature level settings
+        and drivers.
+    """
+    bone_data = {bone.name: _bone_fingerprint_data(metarig, bone) for bone in metarig.data.bones}
+    versions = {}
+    shared_version = rig_ir.code_version()
+
+    fingerprints = {}
+    for bone in metarig.data.bones:
+        rig_type = metarig.pose.bones[bone.name].gamerig_type.replace(" ", "")
+        if rig_type == "":
+            continue
+        if rig_type not in versions:
+            versions[rig_type] = _rig_module_version(rig_type)
+        h = hashlib.sha1((shared_version + versions[rig_type]).encode())
+        for b in [bone] + sorted(bone.children_recursive, key=lambda b: b.name):
+            h.update(bone_data[b.name].encode())
+        fingerprints[bone.name] = h.hexdigest()
+
+    # Whole metarig
+    arm = metarig.data
+    h = hashlib.sha1(shared_version.encode())
+    for name in sorted(bone_data):
+        h.update(bone_data[name].encode())
+    for version in sorted(versions.items()):
+        h.update(repr(version).encode())
+    h.update(repr((arm.gamerig_rig_name, arm.gamerig_rig_ui_template)).encode())
+    for l in arm.gamerig_layers:
+        h.update(repr((l.name, l.row, l.selset, l.group)).encode())
+    for c in arm.gamerig_colors:
+        h.update(("%s%s%s%s" % (c.name, _fingerprint_value(c.normal), _fingerprint_value(c.select), _fingerprint_value(c.active))).encode())
+    if metarig.animation_data:
+        for d in metarig.animation_data.drivers:
+            h.update(("%s[%d]%s" % (d.data_path, d.array_index, d.driver.expression)).encode())
+    h.update(_fingerprint_value((
+        metarig.location, metarig.rotation_mode, metarig.rotation_euler,
+        metarig.rotation_quaternion, metarig.rotation_axis_angle, metarig.scale
+    )).encode())
+    fingerprints[''] = h.hexdigest()
+
+    return fingerprints
+
+
+def changed_rigs(metarig, old_fingerprints, fingerprints):
+    """ Returns the set of rig bone names whose fingerprint changed, plus the
+        rigs that depend on them (rigs on descendant bones, which parent to
+        or constrain against the changed rig's output). Generation is only
+        skipped when it is empty; otherwise it is reported, and every rig is
+        generated again.
+        The '' entry is included if anything about the metarig changed.
+    """
+    if old_fingerprints is None:
+        return set(fingerprints.keys())
+    old_fingerprints = dict(old_fingerprints)
+
+    changed = {k for k, v in fingerprints.items() if old_fingerprints.get(k) != v}
+    changed |= set(old_fingerprints.keys()) - set(fingerprints.keys())
+
+    for name in list(changed):
+        if name in metarig.data.bones:
+            for child in metarig.data.bones[name].children_recursive:
+                if child.name in fingerprints:
+                    changed.add(child.name)
+    return changed
+
+
+def get_generated_outputs(obj, script):
+    """ Returns what a generation made besides the rig's bones, for
+        generated_outputs_exist() to check: the UI script name, the bone
+        count and the widget object of every bone with a custom shape.
+    """
+    return {
+        'ui_script': script.name,
+        'bones': len(obj.data.bones),
+        'widgets': {pb.name: pb.custom_shape.name for pb in obj.pose.bones if pb.custom_shape},
+    }
+
+
+def generated_outputs_exist(obj):
+    """ True if the outputs recorded by get_generated_outputs() are all
+        still in place, so the rig can be kept as it is.
+    """
+    outputs = obj.data.get("gamerig_outputs")
+    if outputs is None:
+        return False
+    if outputs['ui_script'] not in bpy.data.texts or len(obj.data.bones) != outputs['bones']:
+        return False
+    for bone_name, widget_name in outputs['widgets'].items():
+        pb = obj.pose.bones.get(bone_name)
+        if pb is None or pb.custom_shape is None or pb.custom_shape.name != widget_name:
+            return False
+    return True
+
+
 def get_xy_spread(bones):
     x_max = 0
     y_max = 0
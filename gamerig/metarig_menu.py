@@ -35,9 +35,7 @@ class ArmatureMainMenu(bpy.types.Menu):
         layout = self.layout
         for cl in self.submenus:
             layout.menu(cl.bl_idname, icon='OUTLINER_OB_ARMATURE')
-        for op, name, text in self.operators:
-            icon='BONE_DATA' if name == 'single_bone' else 'OUTLINER_OB_ARMATURE'
-            layout.operator(op, icon=icon, text=text)
+        draw_metarig_operators(layout, self.operators)
 
 
 def mainmenu_func(self, context):
@@ -46,15 +44,19 @@ def mainmenu_func(self, context):
 
 class ArmatureSubMenu(bpy.types.Menu):
     def draw(self, context):
-        layout = self.layout
-        for op, name, text in self.operators:
-            icon='BONE_DATA' if name == 'single_bone' else 'OUTLINER_OB_ARMATURE'
-            layout.operator(op, icon=icon, text=text)
+        draw_metarig_operators(self.layout, self.operators)
+
+
+def draw_metarig_operators(layout, operators):
+    for op, name, text in operators:
+        icon='BONE_DATA' if name == 'single_bone' else 'OUTLINER_OB_ARMATURE'
+        layout.operator(op, icon=icon, text=text)
 
 
 def get_metarig_list(path, depth=0):
-    """ Searches for metarig modules, and returns a list of the
-        imported modules.
+    """ Searches for metarig modules, and returns an index of them:
+        {submenu: [(package path, module name, menu text)]}, without
+        importing them.
     """
     metarigs = []
     metarigs_dict = dict()
@@ -78,13 +80,11 @@ def get_metarig_list(path, depth=0):
             continue
         else:
             module_name = f[:-3]
-            try:
-                if depth == 1:
-                    metarigs.append(utils.get_metarig_module(module_name, utils.METARIG_DIR + '.' + path))
-                else:
-                    metarigs.append(utils.get_metarig_module(module_name, utils.METARIG_DIR))
-            except ImportError:
-                pass
+            text = ' '.join((i.capitalize() for i in module_name.split('_'))) + " (Meta Rig)"
+            if depth == 1:
+                metarigs.append((utils.METARIG_DIR + '.' + path, module_name, text))
+            else:
+                metarigs.append((utils.METARIG_DIR, module_name, text))
 
     if depth == 1:
         return metarigs
@@ -94,15 +94,23 @@ def get_metarig_list(path, depth=0):
 
 
 class AddMetarigOperatorBase(bpy.types.Operator):
+    """ Base of the per-metarig add operators, which only hold the
+        metarig_path and metarig_module of their metarig.
+    """
+    bl_options = {'REGISTER', 'UNDO'}
+
     @classmethod
     def poll(cls, context):
         return not context.object or context.object.mode == 'OBJECT'
 
-
-def make_metarig_add_execute(m):
-    """ Create an execute method for a metarig creation operator.
-    """
     def execute(self, context):
+        # The metarig module is only imported when it is added
+        try:
+            m = utils.get_metarig_module(self.metarig_module, self.metarig_path)
+        except ImportError as e:
+            self.report({'ERROR'}, "Could not load metarig %s: %s" % (self.metarig_module, e))
+            return {'CANCELLED'}
+
         # Add armature object
         bpy.ops.object.armature_add()
         obj = context.active_object
@@ -119,36 +127,40 @@ def make_metarig_add_execute(m):
 
         bpy.ops.object.mode_set(mode='OBJECT')
         return {'FINISHED'}
-    return execute
 
 
-# Get the metarig modules
+def make_metarig_operator(path, module_name, text):
+    """ Creates the add operator of a metarig from its index entry, with
+        the same class name and bl_idname as when the operators were made
+        from the imported modules.
+    """
+    name = '_D_'.join((path + '.' + module_name).split('.')[1:]).replace(' ', '_')
+    T = type("GameRig_Add_" + name + "_Metarig", (AddMetarigOperatorBase,), {
+        '__doc__': "Add " + text,
+        'bl_idname': "object.gamerig_" + name.lower() + "_metarig_add",
+        'bl_label': "Add " + text,
+        'metarig_path': path,
+        'metarig_module': module_name,
+    })
+    return T
+
+
+# Index the metarig modules and create their add operators
 metarigs_dict = get_metarig_list("")
 
-# Create metarig add Operators
 metarig_ops = {}
 for metarig_class in metarigs_dict:
-    metarig_ops[metarig_class] = []
-    for m in metarigs_dict[metarig_class]:
-        name = '_D_'.join(m.__name__.split('.')[2:]).replace(' ', '_')
-        text = ' '.join((i.capitalize() for i in m.__name__.rsplit('.', 1)[-1].split('_'))) + " (Meta Rig)"
-
-        # Dynamically construct an Operator
-        T = type("GameRig_Add_" + name + "_Metarig", (AddMetarigOperatorBase,), {})
-        T.bl_idname = "object.gamerig_" + name.lower() + "_metarig_add"
-        T.bl_label = "Add " + text
-        T.bl_options = {'REGISTER', 'UNDO'}
-        T.execute = make_metarig_add_execute(m)
-
-        metarig_ops[metarig_class].append((T, name, text))
-
+    metarig_ops[metarig_class] = [
+        (make_metarig_operator(path, name, text), name, text)
+        for path, name, text in metarigs_dict[metarig_class]
+    ]
 
 for mop, name, text in metarig_ops[utils.METARIG_DIR]:
     ArmatureMainMenu.operators.append((mop.bl_idname, name, text))
 
-metarigs_dict.pop(utils.METARIG_DIR)
-
 for submenu_name in sorted(list(metarigs_dict.keys())):
+    if submenu_name == utils.METARIG_DIR:
+        continue
     # Create menu functions
     armature_submenu = type('Class_GameRig_' + submenu_name + '_submenu', (ArmatureSubMenu,), {})
     armature_submenu.bl_label = submenu_name
@@ -157,9 +169,9 @@ for submenu_name in sorted(list(metarigs_dict.keys())):
     ArmatureMainMenu.submenus.append(armature_submenu)
 
 def register():
-    for op in metarig_ops:
-        for cl, name, text in metarig_ops[op]:
-            bpy.utils.register_class(cl)
+    for mops in metarig_ops.values():
+        for mop, name, text in mops:
+            bpy.utils.register_class(mop)
 
     for arm_sub in ArmatureMainMenu.submenus:
         bpy.utils.register_class(arm_sub)
@@ -170,9 +182,9 @@ def register():
 
 
 def unregister():
-    for op in metarig_ops:
-        for cl, name, text in metarig_ops[op]:
-            bpy.utils.unregister_class(cl)
+    for mops in metarig_ops.values():
+        for mop, name, text in mops:
+            bpy.utils.unregister_class(mop)
 
     for arm_sub in ArmatureMainMenu.submenus:
         bpy.utils.unregister_class(arm_sub)
@@ -0,0 +1,97 @@
+#====================== BEGIN GPL LICENSE BLOCK ======================
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+#======================= END GPL LICENSE BLOCK ========================
+
+# <pep8 compliant>
+
+""" Bone name manipulation. Doesn't need Blender, so that rig logic built
+    on armature_model can use it under plain CPython.
+"""
+
+import re
+
+ORG_PREFIX = "ORG-"  # Prefix of original bones.
+JIG_PREFIX = "JIG-"  # Prefix of jig bones. (delete automatically after generation.)
+MCH_PREFIX = "MCH-"  # Prefix of mechanism bones.
+
+
+def strip_trailing_number(s):
+    m = re.search(r'\.(\d{3})$', s)
+    return s[0:-4] if m else s
+
+
+def unique_name(collection, base_name):
+    base_name = strip_trailing_number(base_name)
+    count = 1
+    name = base_name
+
+    while collection.get(name):
+        name = "%s.%03d" % (base_name, count)
+        count += 1
+    return name
+
+
+def basename(name):
+    """ Returns the name with ORG_PREFIX stripped from it.
+        """
+    if name.startswith(ORG_PREFIX):
+        return name[len(ORG_PREFIX):]
+    elif name.startswith(JIG_PREFIX):
+        return name[len(JIG_PREFIX):]
+    elif name.startswith(MCH_PREFIX):
+        return name[len(MCH_PREFIX):]
+    else:
+        return name
+
+
+def is_org(name):
+    return name.startswith(ORG_PREFIX) or name.startswith(JIG_PREFIX)
+
+
+def is_jig(name):
+    return name.startswith(JIG_PREFIX)
+
+
+def is_mch(name):
+    return name.startswith(MCH_PREFIX)
+
+
+def org(name):
+    """ Prepends the ORG_PREFIX to a name if it doesn't already have
+        it, and returns it.
+    """
+    if is_org(name):
+        return name
+    else:
+        return ORG_PREFIX + name
+
+
+def mch(name):
+    """ Prepends the MCH_PREFIX to a name if it doesn't already have
+        it, and returns it.
+    """
+    if name.startswith(MCH_PREFIX):
+        return name
+    else:
+        return MCH_PREFIX + name
+
+make_mechanism_name = mch
+
+
+def insert_before_first_period(name, text):
+    t = name.split('.', 1)
+    return t[0] + text + '.' + t[1] if len(t) > 1 else name + text
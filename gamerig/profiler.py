@@ -0,0 +1,269 @@
+#====================== BEGIN GPL LICENSE BLOCK ======================
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+#======================= END GPL LICENSE BLOCK ========================
+
+# <pep8 compliant>
+
+import json
+import time
+from contextlib import contextmanager
+
+# Counter names
+OPERATOR_CALLS = "operator_calls"
+MODE_SWITCHES  = "mode_switches"
+BONES          = "bones_created"
+CONSTRAINTS    = "constraints_added"
+DRIVERS        = "drivers_added"
+
+
+class Span:
+    """ One timed, named region of generation. Counters are inclusive of
+        child spans, and of the deferred work queued while the span was
+        open (see Profiler.deferred()); its time is kept in deferred_time.
+    """
+    def __init__(self, name, parent=None, obj=None):
+        self.name     = name
+        self.parent   = parent
+        self.children = []
+        self.counters = {}
+        self.start    = time.perf_counter()
+        self.end      = None
+        self.obj      = obj
+        self.snapshot = armature_counts(obj) if obj is not None else None
+        self.deferred_time = 0.0
+
+    @property
+    def duration(self):
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    def to_dict(self):
+        return {
+            'name'     : self.name,
+            'duration' : self.duration,
+            'deferred' : self.deferred_time,
+            'counters' : dict(self.counters),
+            'children' : [c.to_dict() for c in self.children],
+        }
+
+
+def armature_counts(obj):
+    """ Returns current bone, constraint and driver counts of an armature object.
+        In edit mode bones are counted from the edit bones, while the pose
+        (and its constraints) is as of the last time the armature left edit
+        mode; pose work deferred until then is counted by Profiler.deferred().
+    """
+    if obj.mode == 'EDIT':
+        bones = len(obj.data.edit_bones)
+    else:
+        bones = len(obj.data.bones)
+    constraints = sum(len(pb.constraints) for pb in obj.pose.bones) if obj.pose else 0
+    drivers = len(obj.animation_data.drivers) if obj.animation_data else 0
+    return {BONES: bones, CONSTRAINTS: constraints, DRIVERS: drivers}
+
+
+class Profiler:
+    """ Collects nested spans with counters, and exports them as JSON or
+        as a Chrome trace-event file (chrome://tracing, Perfetto).
+    """
+    def __init__(self, name="generate"):
+        self.root  = Span(name)
+        self.stack = [self.root]
+
+    def begin(self, name, obj=None):
+        """ Opens a child span of the current span.
+        """
+        span = Span(name, self.stack[-1], obj)
+        self.stack[-1].children.append(span)
+        self.stack.append(span)
+        return span
+
+    def end(self):
+        """ Closes the current span.
+        """
+        span = self.stack.pop()
+        span.end = time.perf_counter()
+        if span.snapshot is not None:
+            try:
+                after = armature_counts(span.obj)
+            except ReferenceError:
+                pass
+            else:
+                for key, value in after.items():
+                    delta = value - span.snapshot[key]
+                    if delta > 0:
+                        span.counters[key] = span.counters.get(key, 0) + delta
+        return span
+
+    @contextmanager
+    def deferred(self, span, obj):
+        """ Runs work queued while span was open, such as the pose bone work
+            of the mode pipeline, and attributes its counters and time to
+            span and its closed ancestors. Its open ancestors count it through
+            their own snapshots; the other open spans (e.g. the rig that left
+            edit mode and so ran the queue) don't count it.
+        """
+        before = armature_counts(obj) if obj is not None else None
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            try:
+                after = armature_counts(obj) if obj is not None else None
+            except ReferenceError:
+                after = None
+            deltas = {}
+            if after is not None:
+                deltas = {key: value - before[key] for key, value in after.items() if value > before[key]}
+
+            ancestors = set()
+            while span is not None:
+                ancestors.add(span)
+                if span.end is not None:
+                    span.deferred_time += duration
+                    for key, delta in deltas.items():
+                        span.counters[key] = span.counters.get(key, 0) + delta
+                span = span.parent
+            for open_span in self.stack:
+                if open_span not in ancestors and open_span.snapshot is not None:
+                    for key, delta in deltas.items():
+                        open_span.counters[key] = open_span.counters.get(key, 0) - delta
+
+    @contextmanager
+    def span(self, name, obj=None):
+        self.begin(name, obj)
+        try:
+            yield self.stack[-1]
+        finally:
+            self.end()
+
+    def count(self, key, n=1):
+        """ Adds n to a counter on every open span.
+        """
+        for span in self.stack:
+            if span.snapshot is None or key not in span.snapshot:
+                span.counters[key] = span.counters.get(key, 0) + n
+
+    def finish(self):
+        while len(self.stack) > 1:
+            self.end()
+        self.root.end = time.perf_counter()
+        return self.root
+
+    def summary(self):
+        """ Returns a printable tree of spans.
+        """
+        lines = []
+
+        def walk(span, depth):
+            counters = ", ".join("%s=%d" % kv for kv in sorted(span.counters.items()))
+            deferred = (" +%.3f deferred" % span.deferred_time) if span.deferred_time else ""
+            lines.append("%s%s: %.3f%s%s" % ("  " * depth, span.name, span.duration, deferred, (" (%s)" % counters) if counters else ""))
+            for child in span.children:
+                walk(child, depth + 1)
+
+        walk(self.root, 0)
+        return "\n".join(lines)
+
+    def to_json(self):
+        return json.dumps(self.root.to_dict(), indent=1)
+
+    def to_chrome_trace(self):
+        events = []
+        origin = self.root.start
+
+        def walk(span):
+            events.append({
+                'name' : span.name,
+                'ph'   : 'X',
+                'ts'   : (span.start - origin) * 1e6,
+                'dur'  : span.duration * 1e6,
+                'pid'  : 0,
+                'tid'  : 0,
+                'args' : dict(span.counters, deferred=span.deferred_time),
+            })
+            for child in span.children:
+                walk(child)
+
+        walk(self.root)
+        return json.dumps({'traceEvents': events, 'displayTimeUnit': 'ms'})
+
+    def write(self, path):
+        """ Writes <path>.json and <path>.trace.json.
+        """
+        with open(path + ".json", 'w') as f:
+            f.write(self.to_json())
+        with open(path + ".trace.json", 'w') as f:
+            f.write(self.to_chrome_trace())
+
+
+def active():
+    """ Returns the running profiler, or None.
+    """
+    return getattr(start, 'profiler', None)
+
+
+def start(name="generate"):
+    start.profiler = Profiler(name)
+    return start.profiler
+
+
+def stop():
+    profiler = active()
+    if profiler is not None:
+        profiler.finish()
+        start.profiler = None
+    return profiler
+
+
+def current_span():
+    """ Returns the innermost open span of the running profiler, or None.
+    """
+    profiler = active()
+    return profiler.stack[-1] if profiler is not None else None
+
+
+@contextmanager
+def deferred(span, obj):
+    """ Runs deferred work on behalf of span, with the running profiler if any.
+    """
+    profiler = active()
+    if profiler is None or span is None:
+        yield
+    else:
+        with profiler.deferred(span, obj):
+            yield
+
+
+def count(key, n=1):
+    """ Adds to a counter of the running profiler, if any.
+    """
+    profiler = active()
+    if profiler is not None:
+        profiler.count(key, n)
+
+
+@contextmanager
+def span(name, obj=None):
+    """ Times a region with the running profiler, if any.
+    """
+    profiler = active()
+    if profiler is None:
+        yield None
+    else:
+        with profiler.span(name, obj) as s:
+            yield s
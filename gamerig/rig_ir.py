@@ -0,0 +1,638 @@
+#====================== BEGIN GPL LICENSE BLOCK ======================
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+#======================= END GPL LICENSE BLOCK ========================
+
+# <pep8 compliant>
+
+""" Rig generation intermediate representation (IR).
+
+    record_rig_ir() captures what the rig types built on a generated rig:
+    bones with their transforms, parents and settings, pose bone settings,
+    custom properties, constraints, drivers, widget meshes, UI script
+    fragments and the rig types used for operator scripts. The IR is a
+    JSON-serialisable dict, with bone and pose bone data stored column by
+    column.
+
+    replay_rig_ir() applies an IR to a rig that holds the ORG bones built
+    from the metarig, one operation kind at a time, without running any
+    rig type code.
+"""
+
+import bpy
+import ast
+import hashlib
+import json
+import os
+from mathutils import Matrix
+
+from .utils import (
+    get_copy_attributes, create_widget, set_mode,
+    RIG_DIR, MetarigError
+)
+from .rigs.widgets import build_mesh
+
+IR_VERSION = 3
+
+ADDON_DIR = os.path.dirname(__file__)
+
+# Add-on modules the rig types generate through. An IR recorded with other
+# versions of them, or of the add-on modules they import, is not replayed.
+SHARED_MODULES = (
+    'utils.py', 'naming.py', 'armature_model.py', 'generate.py', 'rig_ir.py',
+    os.path.join('rigs', 'widgets.py'), os.path.join('rigs', 'ui_template.py'),
+)
+RIG_REFERENCE = "__rig__"  # Stands for the generated rig in ID references
+
+# Attributes restored by other steps, or that would overwrite the pose.
+BONE_SKIP_ATTRIBUTES = {'name', 'select', 'select_head', 'select_tail'}
+POSE_BONE_SKIP_ATTRIBUTES = {'name', 'custom_shape', 'matrix', 'matrix_basis'}
+
+ID_COLLECTIONS = {
+    'Object': 'objects', 'Mesh': 'meshes', 'Armature': 'armatures', 'Scene': 'scenes',
+    'Material': 'materials', 'Text': 'texts', 'Action': 'actions', 'Key': 'shape_keys',
+}
+
+
+class ReplayError(MetarigError):
+    """ Raised by replay_rig_ir() when parts of the IR could not be applied.
+    """
+    def __init__(self, failures):
+        self.failures = failures
+        super().__init__("%d IR operation(s) failed to replay:\n  %s" % (len(failures), "\n  ".join(failures)))
+
+
+def module_info(path):
+    """ Returns (content hash, imported add-on module paths) of a module file.
+        Only relative imports are followed, as the add-on imports itself
+        that way. Cached by file modification time and size.
+    """
+    try:
+        stat = os.stat(path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        stamp = None
+    if not hasattr(module_info, 'cache'):
+        module_info.cache = {}
+    entry = module_info.cache.get(path)
+    if entry is None or entry[0] != stamp:
+        if stamp is None:
+            info = ("missing", ())
+        else:
+            with open(path, 'rb') as f:
+                source = f.read()
+            info = (hashlib.sha1(source).hexdigest(), module_imports(path, source))
+        entry = module_info.cache[path] = (stamp, info)
+    return entry[1]
+
+
+def module_imports(path, source):
+    """ Returns the paths of the add-on modules imported by the relative
+        imports of source, the contents of the module file at path.
+    """
+    try:
+        tree = ast.parse(source, path)
+    except SyntaxError:
+        return ()
+    names = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.ImportFrom) or node.level == 0:
+            continue
+        base = os.path.dirname(path)
+        for i in range(node.level - 1):
+            base = os.path.dirname(base)
+        if node.module:
+            base = os.path.join(base, *node.module.split('.'))
+            names.append(base)
+        # "from . import name" may import a submodule
+        names += [os.path.join(base, alias.name) for alias in node.names if alias.name != '*']
+
+    paths = set()
+    for name in names:
+        for candidate in (name + '.py', os.path.join(name, '__init__.py')):
+            if os.path.isfile(candidate):
+                paths.add(os.path.normpath(candidate))
+                break
+    return tuple(sorted(paths))
+
+
+def modules_version(paths):
+    """ Returns a hash of the module files at paths, and of every add-on
+        module they import, directly or not.
+    """
+    seen = set()
+    todo = [os.path.normpath(path) for path in paths]
+    while todo:
+        path = todo.pop()
+        if path not in seen:
+            seen.add(path)
+            todo += module_info(path)[1]
+    h = hashlib.sha1()
+    for path in sorted(seen):
+        h.update(("%s:%s\n" % (os.path.relpath(path, ADDON_DIR), module_info(path)[0])).encode())
+    return h.hexdigest()
+
+
+def code_version():
+    """ Returns a hash of the shared add-on modules, for the IR to be
+        recorded and checked against.
+    """
+    return modules_version(os.path.join(ADDON_DIR, path) for path in SHARED_MODULES)
+
+
+def rig_types_version(rig_types):
+    """ Returns a hash of the rig type modules named in rig_types (such as
+        'limbs.arm') and of the helper modules they import.
+    """
+    return modules_version(
+        os.path.join(ADDON_DIR, RIG_DIR, *rig_type.split('.')) + '.py' for rig_type in rig_types
+    )
+
+
+#=============================================
+# Values
+#=============================================
+
+_SKIP = object()
+
+
+def encode_value(value, rig):
+    """ Returns a JSON compatible form of an RNA property value, or _SKIP
+        for values the IR does not carry (non-ID structs, collections).
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, bpy.types.ID):
+        if value == rig:
+            return RIG_REFERENCE
+        return {'id': value.name, 'type': value.bl_rna.identifier}
+    if isinstance(value, bpy.types.PoseBone):
+        return {'pose_bone': value.name}
+    if isinstance(value, set):
+        return {'set': sorted(value)}
+    if isinstance(value, Matrix):
+        return {'matrix': [list(row) for row in value]}
+    if isinstance(value, bpy.types.bpy_struct):
+        return _SKIP
+    try:
+        return list(value)
+    except TypeError:
+        return _SKIP
+
+
+def decode_value(value, rig):
+    """ Inverse of encode_value().
+        Raises KeyError if a referenced ID or pose bone no longer exists.
+    """
+    if value == RIG_REFERENCE:
+        return rig
+    if isinstance(value, dict):
+        if 'id' in value:
+            collection = ID_COLLECTIONS.get(value['type'], value['type'].lower() + 's')
+            id_data = getattr(bpy.data, collection, {}).get(value['id'])
+            if id_data is None:
+                raise KeyError("%s '%s' not found" % (value['type'], value['id']))
+            return id_data
+        if 'pose_bone' in value:
+            pose_bone = rig.pose.bones.get(value['pose_bone'])
+            if pose_bone is None:
+                raise KeyError("pose bone '%s' not found" % value['pose_bone'])
+            return pose_bone
+        if 'set' in value:
+            return set(value['set'])
+        if 'matrix' in value:
+            return Matrix(value['matrix'])
+    return value
+
+
+def encode_idprop(value):
+    """ Returns a JSON compatible copy of a custom property value.
+    """
+    if hasattr(value, 'to_dict'):
+        return value.to_dict()
+    if hasattr(value, 'to_list'):
+        return value.to_list()
+    return value
+
+
+def record_struct(struct, rig, skip=()):
+    """ Returns the writable RNA properties of struct as an {attribute: value} dict.
+    """
+    attrs = {}
+    for key in get_copy_attributes(struct):
+        if key in skip:
+            continue
+        value = encode_value(getattr(struct, key), rig)
+        if value is not _SKIP:
+            attrs[key] = value
+    return attrs
+
+
+def struct_label(struct):
+    """ Returns a readable path of struct, for failure messages.
+    """
+    try:
+        return "%s: %s" % (struct.id_data.name, struct.path_from_id())
+    except (AttributeError, ValueError):
+        return repr(struct)
+
+
+def apply_struct(struct, attrs, rig, failures, first=()):
+    """ Sets the recorded attributes on struct, the ones in first before the others.
+        Attributes that can't be set are added to the failures list.
+    """
+    for key in list(first) + [key for key in attrs if key not in first]:
+        if key in attrs:
+            try:
+                setattr(struct, key, decode_value(attrs[key], rig))
+            except (AttributeError, KeyError, TypeError, ValueError) as e:
+                failures.append("%s.%s: %s" % (struct_label(struct), key, e))
+
+
+#=============================================
+# Columns
+#=============================================
+
+def is_column_property(prop):
+    """ True if foreach_get/foreach_set can transfer the RNA property.
+    """
+    return prop.type in {'BOOLEAN', 'INT', 'FLOAT'}
+
+
+def record_columns(collection, rig, skip):
+    """ Records the writable properties of every item of an RNA collection.
+        Number and boolean properties become flat columns, which replay in
+        one foreach_set each; the others are kept as one value per item.
+    """
+    items = list(collection)
+    ir = {'names': [item.name for item in items], 'columns': {}, 'values': {}}
+    if not items:
+        return ir
+
+    rna = items[0].bl_rna
+    for key in get_copy_attributes(items[0]):
+        if key in skip:
+            continue
+        prop = rna.properties[key]
+        if is_column_property(prop):
+            size = max(getattr(prop, 'array_length', 0), 1)
+            flat = [0] * (len(items) * size)
+            collection.foreach_get(key, flat)
+            ir['columns'][key] = [size, flat]
+        else:
+            values = [encode_value(getattr(item, key), rig) for item in items]
+            if not any(value is _SKIP for value in values):
+                ir['values'][key] = values
+    return ir
+
+
+def set_column(collection, key, names, size, values):
+    """ Sets the values of the named items of a collection in one foreach_set,
+        keeping the current values of the other items.
+    """
+    current = [0] * (len(collection) * size)
+    collection.foreach_get(key, current)
+    index = {name: i for i, name in enumerate(collection.keys())}
+    for j, name in enumerate(names):
+        i = index.get(name)
+        if i is not None:
+            current[i * size:(i + 1) * size] = values[j * size:(j + 1) * size]
+    collection.foreach_set(key, current)
+
+
+def apply_columns(collection, ir, rig, failures):
+    """ Applies columns recorded by record_columns().
+        Columns and values that can't be set are added to the failures list.
+    """
+    names = ir['names']
+    missing = [name for name in names if name not in collection]
+    if missing:
+        failures.append("missing items: %s" % ", ".join(missing))
+    for key, (size, values) in ir['columns'].items():
+        try:
+            set_column(collection, key, names, size, values)
+        except (AttributeError, TypeError, ValueError) as e:
+            failures.append("column %s: %s" % (key, e))
+    for key, values in ir['values'].items():
+        for name, value in zip(names, values):
+            item = collection.get(name)
+            if item is not None:
+                try:
+                    setattr(item, key, decode_value(value, rig))
+                except (AttributeError, KeyError, TypeError, ValueError) as e:
+                    failures.append("%s.%s: %s" % (struct_label(item), key, e))
+
+
+#=============================================
+# Recording
+#=============================================
+
+def record_edit_bones(edit_bones):
+    names = edit_bones.keys()
+    index = {name: i for i, name in enumerate(names)}
+    ir = {'names': names}
+    for key in ('head', 'tail'):
+        flat = [0.0] * (3 * len(edit_bones))
+        edit_bones.foreach_get(key, flat)
+        ir[key] = flat
+    ir['roll'] = [0.0] * len(edit_bones)
+    edit_bones.foreach_get('roll', ir['roll'])
+    ir['parent'] = [index[eb.parent.name] if eb.parent else -1 for eb in edit_bones]
+    ir['use_connect'] = [eb.use_connect for eb in edit_bones]
+    return ir
+
+
+def record_mesh(mesh):
+    verts = [0.0] * (3 * len(mesh.vertices))
+    mesh.vertices.foreach_get('co', verts)
+    edges = [0] * (2 * len(mesh.edges))
+    mesh.edges.foreach_get('vertices', edges)
+    faces = [list(p.vertices) for p in mesh.polygons]
+    return {'verts': verts, 'edges': edges, 'faces': faces}
+
+
+def record_widgets(rig):
+    """ Records the widgets created by this generation and their meshes.
+    """
+    widgets = []
+    meshes = {}
+    matrix_inv = rig.matrix_world.inverted()
+    for obj, bone_name in create_widget.created_widgets or []:
+        if obj.data.name not in meshes:
+            meshes[obj.data.name] = record_mesh(obj.data)
+        widgets.append({
+            'bone': bone_name,
+            'mesh': obj.data.name,
+            'matrix': encode_value(matrix_inv @ obj.matrix_world, rig),
+            'modifiers': [[m.name, m.type, record_struct(m, rig)] for m in obj.modifiers],
+        })
+    return widgets, meshes
+
+
+def record_drivers(rig):
+    drivers = []
+    if not rig.animation_data:
+        return drivers
+    for fcurve in rig.animation_data.drivers:
+        driver = fcurve.driver
+        co = [0.0] * (2 * len(fcurve.keyframe_points))
+        fcurve.keyframe_points.foreach_get('co', co)
+        drivers.append({
+            'data_path': fcurve.data_path,
+            'index': fcurve.array_index,
+            'type': driver.type,
+            'expression': driver.expression,
+            'use_self': driver.use_self,
+            'variables': [
+                {
+                    'name': var.name,
+                    'type': var.type,
+                    'targets': [record_struct(target, rig) for target in var.targets],
+                }
+                for var in driver.variables
+            ],
+            'modifiers': [[m.type, record_struct(m, rig)] for m in fcurve.modifiers],
+            'keyframes': co,
+        })
+    return drivers
+
+
+def record_rig_ir(rig, fingerprint, ui_scripts, rig_types):
+    """ Records a generated rig, right after its rig types generated it.
+        fingerprint: the whole metarig fingerprint the IR is valid for.
+        rig_types: the rig type modules whose operator scripts the UI needs.
+    """
+    set_mode('EDIT')
+    edit_bones = record_edit_bones(rig.data.edit_bones)
+    set_mode('OBJECT')
+
+    widgets, meshes = record_widgets(rig)
+    rig_type_names = sorted(
+        module.__name__.split(".%s." % RIG_DIR, 1)[-1] for module in rig_types
+    )
+    return {
+        'version': IR_VERSION,
+        'code_version': code_version(),
+        'fingerprint': fingerprint,
+        'edit_bones': edit_bones,
+        'bones': record_columns(rig.data.bones, rig, BONE_SKIP_ATTRIBUTES),
+        'pose_bones': record_columns(rig.pose.bones, rig, POSE_BONE_SKIP_ATTRIBUTES),
+        'properties': {
+            pb.name: {key: encode_idprop(pb[key]) for key in pb.keys()}
+            for pb in rig.pose.bones if pb.keys()
+        },
+        'constraints': [
+            [pb.name, con.type, record_struct(con, rig)]
+            for pb in rig.pose.bones for con in pb.constraints
+        ],
+        'drivers': record_drivers(rig),
+        'widgets': widgets,
+        'meshes': meshes,
+        'ui_scripts': list(ui_scripts),
+        'rig_types': rig_type_names,
+        'rig_version': rig_types_version(rig_type_names),
+    }
+
+
+#=============================================
+# Replay
+#=============================================
+
+def apply_edit_bones(edit_bones, ir):
+    names = ir['names']
+    for name in names:
+        if name not in edit_bones:
+            edit_bones.new(name)
+    set_column(edit_bones, 'head', names, 3, ir['head'])
+    set_column(edit_bones, 'tail', names, 3, ir['tail'])
+    set_column(edit_bones, 'roll', names, 1, ir['roll'])
+    for name, parent, use_connect in zip(names, ir['parent'], ir['use_connect']):
+        eb = edit_bones[name]
+        eb.parent = edit_bones[names[parent]] if parent >= 0 else None
+        eb.use_connect = use_connect
+
+
+def apply_constraints(pose_bones, constraints, rig, failures):
+    # The IR holds every constraint, including the ones copied from the metarig
+    for name in {name for name, con_type, attrs in constraints}:
+        pb = pose_bones.get(name)
+        if pb is None:
+            failures.append("constraints of missing pose bone '%s'" % name)
+            continue
+        for con in list(pb.constraints):
+            pb.constraints.remove(con)
+    for name, con_type, attrs in constraints:
+        if name in pose_bones:
+            con = pose_bones[name].constraints.new(type=con_type)
+            apply_struct(con, attrs, rig, failures, first=('target', 'pole_target'))
+
+
+def apply_drivers(rig, drivers, failures):
+    # The IR holds every driver, including the ones copied from the metarig
+    if rig.animation_data is None:
+        rig.animation_data_create()
+    fcurves = rig.animation_data.drivers
+    for fcurve in list(fcurves):
+        fcurves.remove(fcurve)
+
+    for d in drivers:
+        try:
+            fcurve = fcurves.new(d['data_path'], index=d['index'])
+        except (RuntimeError, TypeError) as e:
+            failures.append("driver %s[%d]: %s" % (d['data_path'], d['index'], e))
+            continue
+        driver = fcurve.driver
+        driver.type = d['type']
+        driver.expression = d['expression']
+        driver.use_self = d['use_self']
+
+        for v in d['variables']:
+            var = driver.variables.new()
+            var.name = v['name']
+            var.type = v['type']
+            for target, attrs in zip(var.targets, v['targets']):
+                apply_struct(target, attrs, rig, failures, first=('id_type',))
+
+        for m in list(fcurve.modifiers):
+            fcurve.modifiers.remove(m)
+        for m_type, attrs in d['modifiers']:
+            apply_struct(fcurve.modifiers.new(type=m_type), attrs, rig, failures)
+
+        co = d['keyframes']
+        if co:
+            fcurve.keyframe_points.add(len(co) // 2)
+            fcurve.keyframe_points.foreach_set('co', co)
+            fcurve.update()
+
+
+def apply_widgets(rig, widgets, meshes, failures):
+    """ Creates the widgets through create_widget(), so that they are
+        assigned and registered like freshly generated ones.
+    """
+    built = {}
+    for w in widgets:
+        mesh = built.get(w['mesh'])
+        obj = create_widget(rig, w['bone'], mesh=mesh)
+        if obj is None:
+            continue
+        if mesh is None:
+            data = meshes.get(w['mesh'])
+            if data is None:
+                failures.append("widget mesh '%s' of %s not recorded" % (w['mesh'], w['bone']))
+                continue
+            verts = [data['verts'][i:i + 3] for i in range(0, len(data['verts']), 3)]
+            edges = [data['edges'][i:i + 2] for i in range(0, len(data['edges']), 2)]
+            if data['faces']:
+                obj.data.from_pydata(verts, edges, data['faces'])
+                obj.data.update()
+            else:
+                build_mesh(obj.data, verts, edges)
+            built[w['mesh']] = obj.data
+        obj.matrix_world = rig.matrix_world @ decode_value(w['matrix'], rig)
+        for name, m_type, attrs in w['modifiers']:
+            apply_struct(obj.modifiers.new(name, m_type), attrs, rig, failures)
+
+
+def replay_rig_ir(rig, ir):
+    """ Applies a recorded generation to rig, which must hold the ORG bones
+        built from the same metarig. Returns the UI script fragments and the
+        names of the rig types whose operator scripts the UI needs.
+        Raises ReplayError if any part of the IR could not be applied, such
+        as a constraint on a bone that is gone; the rig is then incomplete
+        and must be generated from the rig types.
+    """
+    failures = []
+    set_mode('EDIT')
+    apply_edit_bones(rig.data.edit_bones, ir['edit_bones'])
+    set_mode('OBJECT')
+
+    apply_columns(rig.data.bones, ir['bones'], rig, failures)
+    apply_columns(rig.pose.bones, ir['pose_bones'], rig, failures)
+    for name, props in ir['properties'].items():
+        pb = rig.pose.bones.get(name)
+        if pb is None:
+            failures.append("properties of missing pose bone '%s'" % name)
+            continue
+        for key, value in props.items():
+            try:
+                pb[key] = value
+            except (KeyError, TypeError) as e:
+                failures.append('%s["%s"]: %s' % (struct_label(pb), key, e))
+    apply_constraints(rig.pose.bones, ir['constraints'], rig, failures)
+    apply_drivers(rig, ir['drivers'], failures)
+    apply_widgets(rig, ir['widgets'], ir['meshes'], failures)
+
+    if failures:
+        raise ReplayError(failures)
+    return ir['ui_scripts'], ir['rig_types']
+
+
+#=============================================
+# Storage
+#=============================================
+
+def ir_text_name(metarig):
+    return "gamerig_ir_%s.json" % metarig.name
+
+
+def store_rig_ir(metarig, ir):
+    """ Keeps the IR of a metarig in a text datablock of the blend file.
+    """
+    name = ir_text_name(metarig)
+    text = bpy.data.texts.get(name) or bpy.data.texts.new(name)
+    text.clear()
+    text.write(json.dumps(ir, separators=(',', ':')))
+
+
+def remove_rig_ir(metarig):
+    """ Removes the stored IR of a metarig, if any.
+    """
+    text = bpy.data.texts.get(ir_text_name(metarig))
+    if text is not None:
+        bpy.data.texts.remove(text)
+
+
+def load_rig_ir(metarig, fingerprint):
+    """ Returns the stored IR of a metarig if it was recorded for fingerprint
+        with the current shared modules, rig type modules and their helper
+        modules, or None.
+    """
+    text = bpy.data.texts.get(ir_text_name(metarig))
+    if text is None:
+        return None
+    try:
+        ir = json.loads(text.as_string())
+    except ValueError:
+        return None
+    if ir.get('version') != IR_VERSION or ir.get('fingerprint') != fingerprint:
+        return None
+    if ir.get('code_version') != code_version():
+        return None
+    if ir.get('rig_version') != rig_types_version(ir.get('rig_types', ())):
+        return None
+    return ir
+
+
+def write_rig_ir(ir, path):
+    """ Writes an IR to a JSON file, for caching or offline analysis.
+    """
+    with open(path, 'w') as f:
+        json.dump(ir, f, separators=(',', ':'))
+
+
+def read_rig_ir(path):
+    with open(path) as f:
+        return json.load(f)
@@ -16,24 +16,142 @@
 #
 #======================= END GPL LICENSE BLOCK ========================
 
+import bpy
+import json
 import os
+import sys
+import types
 
 from . import utils
 
+MANIFEST_NAME = "gamerig_rig_manifest.json"
+MANIFEST_VERSION = 1
+# The manifest is off until its startup gain is measured; setting this
+# environment variable to 1 turns it on (see benchmark_startup.py).
+MANIFEST_ENV = "GAMERIG_RIG_MANIFEST"
 
-def get_rig_list(path):
+
+def use_manifest():
+    """ True if rig types are described from the manifest.
+    """
+    return os.environ.get(MANIFEST_ENV) == "1"
+
+
+def manifest_path():
+    """ Returns the path of the rig type manifest, in the user config directory.
+    """
+    return os.path.join(bpy.utils.user_resource('CONFIG', create=True), MANIFEST_NAME)
+
+
+def load_manifest():
+    """ Returns the stored rig type manifest, {relative file path: entry}.
+    """
+    try:
+        with open(manifest_path()) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('version') != MANIFEST_VERSION or manifest.get('rig_dir') != RIG_DIR_ABS:
+        return {}
+    return manifest['modules']
+
+
+def save_manifest(modules):
+    try:
+        with open(manifest_path(), 'w') as f:
+            json.dump({'version': MANIFEST_VERSION, 'rig_dir': RIG_DIR_ABS, 'modules': modules}, f)
+    except OSError as e:
+        print("GameRig: could not save the rig type manifest: %s" % e)
+
+
+def module_dependencies(module):
+    """ Returns {relative file path: mtime} of the other rig type modules
+        a module takes names from (e.g. a base rig class).
+    """
+    prefix = "%s.%s." % (utils.MODULE_NAME, utils.RIG_DIR)
+    deps = {}
+    for value in vars(module).values():
+        name = value.__name__ if isinstance(value, types.ModuleType) else getattr(value, '__module__', None)
+        if isinstance(name, str) and name.startswith(prefix) and name != module.__name__:
+            file_path = getattr(sys.modules.get(name), '__file__', None)
+            if file_path:
+                deps[os.path.relpath(file_path, RIG_DIR_ABS)] = os.stat(file_path).st_mtime_ns
+    return deps
+
+
+def describe_module(module_name, mtime):
+    """ Imports a rig type module, and returns its manifest entry: what it
+        defines, and the declarations of its parameters (None if they cannot
+        be stored, in which case register() imports the module).
+    """
+    rig = utils.get_rig_type(module_name)
+    entry = {
+        'mtime'          : mtime,
+        'deps'           : module_dependencies(rig),
+        'rig'            : hasattr(rig, "Rig"),
+        'implementation' : bool(getattr(rig, 'IMPLEMENTATION', False)),
+        'uitemplate'     : None,
+        'parameters'     : [],
+    }
+    if hasattr(rig, "UI_TEMPLATE"):
+        if hasattr(rig, "UI_LABEL_TEXT") and rig.UI_LABEL_TEXT:
+            if len(rig.UI_LABEL_TEXT) > 1:
+                entry['uitemplate'] = [rig.UI_TEMPLATE, rig.UI_LABEL_TEXT[0], rig.UI_LABEL_TEXT[1]]
+            else:
+                entry['uitemplate'] = [rig.UI_TEMPLATE, rig.UI_LABEL_TEXT[0], '']
+        else:
+            entry['uitemplate'] = [rig.UI_TEMPLATE, module_name, '']
+    if entry['rig'] and hasattr(rig, 'add_parameters'):
+        recorder = utils.ParameterRecorder()
+        try:
+            rig.add_parameters(recorder)
+        except AttributeError:
+            entry['parameters'] = None
+        else:
+            entry['parameters'] = recorder.to_json()
+    return entry
+
+
+def dependencies_unchanged(deps):
+    for key, mtime in deps.items():
+        try:
+            if os.stat(os.path.join(RIG_DIR_ABS, key)).st_mtime_ns != mtime:
+                return False
+        except OSError:
+            return False
+    return True
+
+
+def module_entry(module_name, file_path, manifest, used):
+    """ Returns the manifest entry of a rig type module, importing the
+        module only if its file changed since the entry was recorded.
+    """
+    key = os.path.relpath(file_path, RIG_DIR_ABS)
+    mtime = os.stat(file_path).st_mtime_ns
+    entry = manifest.get(key)
+    if entry is None or entry['mtime'] != mtime or not dependencies_unchanged(entry['deps']):
+        entry = describe_module(module_name, mtime)
+    used[key] = entry
+    return entry
+
+
+def get_rig_list(path, manifest=None, used=None):
     """ Recursively searches for rig types, and returns a list.
     """
     rigs_dict = dict()
     rigs = []
     implementation_rigs = []
     riguitemplates = {}
-    MODULE_DIR = os.path.dirname(__file__)
-    RIG_DIR_ABS = os.path.join(MODULE_DIR, utils.RIG_DIR)
+    parameters = {}
     SEARCH_DIR_ABS = os.path.join(RIG_DIR_ABS, path)
     files = os.listdir(SEARCH_DIR_ABS)
     files.sort()
 
+    top = manifest is None
+    if top:
+        manifest = load_manifest() if use_manifest() else {}
+        used = {}
+
     for f in files:
         is_dir = os.path.isdir(os.path.join(SEARCH_DIR_ABS, f))  # Whether the file is a directory
 
@@ -47,42 +165,64 @@ def get_rig_list(path):
         if is_dir:
             # Check directories
             module_name = os.path.join(path, f).replace(os.sep, ".")
-            rig = utils.get_rig_type(module_name)
-            # Check if it's a rig itself
-            if hasattr(rig, "Rig"):
+            init_path = os.path.join(SEARCH_DIR_ABS, f, "__init__.py")
+            # Check if it's a rig itself (a directory without __init__.py can't be)
+            entry = module_entry(module_name, init_path, manifest, used) if os.path.isfile(init_path) else None
+            if entry is not None and entry['rig']:
                 rigs.append(f)
+                parameters[f] = entry['parameters']
             else:
                 # Check for sub-rigs
-                sub_dict = get_rig_list(os.path.join(path, f, ""))  # "" adds a final slash
+                sub_dict = get_rig_list(os.path.join(path, f, ""), manifest, used)  # "" adds a final slash
                 rigs.extend(["%s.%s" % (f, l) for l in sub_dict['rig_list']])
                 implementation_rigs.extend(["%s.%s" % (f, l) for l in sub_dict['implementation_rigs']])
                 riguitemplates.update(sub_dict['uitemplates'])
+                parameters.update({"%s.%s" % (f, l): p for l, p in sub_dict['parameters'].items()})
         elif f.endswith(".py"):
             # Check straight-up python files
             t = f[:-3]
             module_name = os.path.join(path, t).replace(os.sep, ".")
-            rig = utils.get_rig_type(module_name)
-            if hasattr(rig, "Rig"):
+            entry = module_entry(module_name, os.path.join(SEARCH_DIR_ABS, f), manifest, used)
+            if entry['rig']:
                 rigs.append(t)
-            elif hasattr(rig, "UI_TEMPLATE"):
-                if hasattr(rig, "UI_LABEL_TEXT") and rig.UI_LABEL_TEXT:
-                    if len(rig.UI_LABEL_TEXT) > 1:
-                        riguitemplates[module_name] = [rig.UI_TEMPLATE, rig.UI_LABEL_TEXT[0], rig.UI_LABEL_TEXT[1]]
-                    else:
-                        riguitemplates[module_name] = [rig.UI_TEMPLATE, rig.UI_LABEL_TEXT[0], '']
-                else:
-                    riguitemplates[module_name] = [rig.UI_TEMPLATE, module_name, '']
-            if hasattr(rig, 'IMPLEMENTATION') and rig.IMPLEMENTATION:
+                parameters[t] = entry['parameters']
+            elif entry['uitemplate'] is not None:
+                riguitemplates[module_name] = entry['uitemplate']
+            if entry['implementation']:
                 implementation_rigs.append(t)
     rigs.sort()
 
+    if top and use_manifest() and used != manifest:
+        save_manifest(used)
+
     rigs_dict['rig_list'] = rigs
     rigs_dict['implementation_rigs'] = implementation_rigs
     rigs_dict['uitemplates'] = riguitemplates
+    rigs_dict['parameters'] = parameters
 
     return rigs_dict
 
 
+def filtered_rig_list(collection_name, include_implementation=True):
+    """ Returns the rig types of a collection ("All", or "None" for rig
+        types outside any collection), computed once per rig list.
+    """
+    key = (collection_name, include_implementation)
+    result = filtered_rig_list.cache.get(key)
+    if result is None:
+        result = []
+        for r in rig_list:
+            if not include_implementation and r in implementation_rigs:
+                continue
+            if collection_name == "All" or r.startswith(collection_name + '.')\
+              or (collection_name == "None" and "." not in r):
+                result.append(r)
+        result = filtered_rig_list.cache[key] = tuple(result)
+    return result
+
+filtered_rig_list.cache = {}
+
+
 def get_collection_list(rig_list):
     collection_list = []
     for r in rig_list:
@@ -93,12 +233,16 @@ def get_collection_list(rig_list):
 
 
 # Public variables
+RIG_DIR_ABS = os.path.join(os.path.dirname(__file__), utils.RIG_DIR)
 rigs_dict = get_rig_list("")
 rig_list = rigs_dict['rig_list']
 implementation_rigs = rigs_dict['implementation_rigs']
+rig_types = frozenset(rig_list)
 collection_list = get_collection_list(rig_list)
 col_enum_list = [("All", "All", ""), ("None", "None", "")] + [(c, c, "") for c in collection_list]
 riguitemplate_dic = rigs_dict['uitemplates']
+rig_parameters = rigs_dict['parameters']  # {rig type: parameter declarations, or None}
+parameter_schema = {}  # {rig type: names of its gamerig_parameters}, filled by register()
 rig_ui_template_enum_list = [("Built in", "Built in", "GameRig Built in Rig UI Template")] + [(k, v[1], v[2]) for k, v in riguitemplate_dic.items()]
 #print('riguitemplate_dic = %s' % riguitemplate_dic.keys())
 #print('rig_ui_template_enum_list = %s' % rig_ui_template_enum_list)
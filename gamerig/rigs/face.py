@@ -2,8 +2,8 @@ import bpy, re
 from mathutils import Vector
 from rna_prop_ui import rna_idprop_ui_prop_get
 from ..utils import (
-    MetarigError, copy_bone, flip_bone, connected_children_names, find_root_bone,
-    create_widget,
+    MetarigError, set_mode, copy_bone, flip_bone, connected_children_names, find_root_bone,
+    create_widget, shared_widget,
     org, basename, mch, insert_before_first_period, MCH_PREFIX
 )
 from .widgets import create_face_widget, create_eye_widget, create_eyes_widget, create_ear_widget, create_jaw_widget
@@ -133,7 +133,7 @@ class Rig:
         ret = {}
 
         ## create control bones
-        bpy.ops.object.mode_set(mode ='EDIT')
+        set_mode('EDIT')
         eb = self.obj.data.edit_bones
 
         # eyes ctrls
@@ -228,7 +228,7 @@ class Rig:
             ret['tongue'] = [ tongue_ctrl_name ]
 
         ## Assign widgets
-        bpy.ops.object.mode_set(mode ='OBJECT')
+        set_mode('OBJECT')
 
         # Assign each eye widgets
         if 'eyes' in ret:
@@ -267,7 +267,7 @@ class Rig:
         rbn = self.rbn
 
         ## create tweak bones
-        bpy.ops.object.mode_set(mode ='EDIT')
+        set_mode('EDIT')
         eb = self.obj.data.edit_bones
 
         tweaks = []
@@ -319,7 +319,7 @@ class Rig:
 
                     tweaks.append( tweak_name )
 
-        bpy.ops.object.mode_set(mode ='OBJECT')
+        set_mode('OBJECT')
         pb = self.obj.pose.bones
 
         for bone in tweaks:
@@ -391,7 +391,7 @@ class Rig:
     def create_mch( self, jaw_ctrl, tongue_ctrl ):
         org_bones = self.org_bones
         rbn = self.rbn
-        bpy.ops.object.mode_set(mode ='EDIT')
+        set_mode('EDIT')
         eb = self.obj.data.edit_bones
 
         # Create eyes mch bones
@@ -498,7 +498,7 @@ class Rig:
     def create_mch_targets( self ):
         org_bones = self.org_bones
         rbn = self.rbn
-        bpy.ops.object.mode_set(mode ='EDIT')
+        set_mode('EDIT')
         eb = self.obj.data.edit_bones
 
         mchts = []
@@ -515,7 +515,7 @@ class Rig:
 
     def parent_bones( self, all_bones, tweak_unique, mchts ):
         rbn = self.rbn
-        bpy.ops.object.mode_set(mode ='EDIT')
+        set_mode('EDIT')
         eb = self.obj.data.edit_bones
 
         face_name = org('face')
@@ -721,7 +721,7 @@ class Rig:
 
     def make_constraits( self, constraint_type, bone, subtarget, influence = 1 ):
         rbn = self.rbn
-        bpy.ops.object.mode_set(mode ='OBJECT')
+        set_mode('OBJECT')
         pb = self.obj.pose.bones
         
         if not (bone in self.bone_name_map and subtarget in self.bone_name_map):
@@ -1023,7 +1023,7 @@ class Rig:
 
     def drivers_and_props( self, all_bones ):
         rbn = self.rbn
-        bpy.ops.object.mode_set(mode ='OBJECT')
+        set_mode('OBJECT')
         pb = self.obj.pose.bones
 
         # Mouse Lock
@@ -1104,7 +1104,7 @@ class Rig:
 
     def create_bones(self):
         rbn = self.rbn
-        bpy.ops.object.mode_set(mode ='EDIT')
+        set_mode('EDIT')
         eb = self.obj.data.edit_bones
 
         face_name = org('face')
@@ -2383,6 +2383,7 @@ def create_sample(obj):
         arm.edit_bones.active = bone
 
 
+@shared_widget
 def create_square_widget(rig, bone_name, size=1.0, bone_transform_name=None):
     obj = create_widget(rig, bone_name, bone_transform_name)
     if obj is not None:
@@ -2,7 +2,7 @@ import bpy
 from mathutils import Vector
 from rna_prop_ui import rna_idprop_ui_prop_get
 from ..utils import (
-    copy_bone, connected_children_names,
+    set_mode, copy_bone, connected_children_names,
     basename, mch,
     create_widget,
     MetarigError
@@ -23,7 +23,7 @@ class Rig:
     def generate(self):
         org_bones = self.org_bones
 
-        bpy.ops.object.mode_set(mode ='EDIT')
+        set_mode('EDIT')
         eb = self.obj.data.edit_bones
 
         # Bone name lists
@@ -94,7 +94,7 @@ class Rig:
                 ctrl_bone_e.parent         = mch_bone_e
                 ctrl_bone_e.use_connect    = False
 
-        bpy.ops.object.mode_set(mode ='OBJECT')
+        set_mode('OBJECT')
 
         pb = self.obj.pose.bones
 
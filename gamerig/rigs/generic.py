@@ -20,7 +20,7 @@
 
 import bpy
 
-from ..utils import copy_bone, basename
+from ..utils import set_mode, copy_bone, basename
 from .widgets import create_bone_widget, create_circle_widget
 
 class Rig:
@@ -44,7 +44,7 @@ class Rig:
             The main armature should be selected and active before this is called.
 
         """
-        bpy.ops.object.mode_set(mode='EDIT')
+        set_mode('EDIT')
 
         # Make a control bone (copy of original).
         if self.control_widget_type != 'None':
@@ -53,7 +53,7 @@ class Rig:
         # Get edit bones
         eb = self.obj.data.edit_bones
 
-        bpy.ops.object.mode_set(mode='OBJECT')
+        set_mode('OBJECT')
         pb = self.obj.pose.bones
 
         if self.control_widget_type != 'None':
@@ -19,7 +19,7 @@
 # <pep8 compliant>
 import bpy
 from rna_prop_ui import rna_idprop_ui_prop_get
-from ...utils import MetarigError, copy_bone
+from ...utils import MetarigError, set_mode, copy_bone
 from ..widgets import create_hand_widget
 from .limb import *
 
@@ -65,7 +65,7 @@ if is_selected( fk_ctrl ):
     def create_arm(self, bones):
         org_bones = self.org_bones
 
-        bpy.ops.object.mode_set(mode='EDIT')
+        set_mode('EDIT')
         eb = self.obj.data.edit_bones
 
         ctrl = get_bone_name( org_bones[2], 'ctrl', 'ik' )
@@ -131,7 +131,7 @@ class Arm_FK2IK(bpy.types.Operator):
     """
     bl_idname = "pose.gamerig_arm_fk2ik_{rig_id}"
     bl_label = "Snap FK arm to IK"
-    bl_options = {{'UNDO'}}
+    bl_options = {{'REGISTER', 'UNDO'}}
 
     uarm_fk: bpy.props.StringProperty(name="Upper Arm FK Name")
     farm_fk: bpy.props.StringProperty(name="Forerm FK Name")
@@ -141,39 +141,38 @@ class Arm_FK2IK(bpy.types.Operator):
     farm_ik: bpy.props.StringProperty(name="Forearm IK Name")
     hand_ik: bpy.props.StringProperty(name="Hand IK Name")
 
+    frames: bpy.props.EnumProperty(name="Frames", items=SNAP_FRAME_ITEMS, default='CURRENT')
+
     @classmethod
     def poll(cls, context):
         return context.active_object is not None and context.mode == 'POSE'
 
+    def snap(self, obj):
+        """ Matches the fk bones in an arm rig to the ik bones.
+        """
+        uarm  = obj.pose.bones[self.uarm_fk]
+        farm  = obj.pose.bones[self.farm_fk]
+        hand  = obj.pose.bones[self.hand_fk]
+        uarmi = obj.pose.bones[self.uarm_ik]
+        farmi = obj.pose.bones[self.farm_ik]
+        handi = obj.pose.bones[self.hand_ik]
+
+        match_pose_bones([
+            (uarm, uarmi),          # Upper arm position
+            (farm, farmi, 'RS'),    # Forearm position
+            (hand, handi),          # Hand position
+        ], update=False)
+
     def execute(self, context):
         use_global_undo = context.user_preferences.edit.use_global_undo
         context.user_preferences.edit.use_global_undo = False
         try:
-            """ Matches the fk bones in an arm rig to the ik bones.
-            """
             obj = context.active_object
-
-            uarm  = obj.pose.bones[self.uarm_fk]
-            farm  = obj.pose.bones[self.farm_fk]
-            hand  = obj.pose.bones[self.hand_fk]
-            uarmi = obj.pose.bones[self.uarm_ik]
-            farmi = obj.pose.bones[self.farm_ik]
-            handi = obj.pose.bones[self.hand_ik]
-
-            # Upper arm position
-            match_pose_translation(uarm, uarmi)
-            match_pose_rotation(uarm, uarmi)
-            match_pose_scale(uarm, uarmi)
-
-            # Forearm position
-            match_pose_translation(hand, handi)
-            match_pose_rotation(farm, farmi)
-            match_pose_scale(farm, farmi)
-
-            # Hand position
-            match_pose_translation(hand, handi)
-            match_pose_rotation(hand, handi)
-            match_pose_scale(hand, handi)
+            run_snap(
+                context, lambda: self.snap(obj), self.frames,
+                [self.uarm_fk, self.farm_fk, self.hand_fk],
+                [self.uarm_ik, self.farm_ik, self.hand_ik]
+            )
         finally:
             context.user_preferences.edit.use_global_undo = use_global_undo
         return {{'FINISHED'}}
@@ -184,7 +183,7 @@ class Arm_IK2FK(bpy.types.Operator):
     """
     bl_idname = "pose.gamerig_arm_ik2fk_{rig_id}"
     bl_label = "Snap IK arm to FK"
-    bl_options = {{'UNDO'}}
+    bl_options = {{'REGISTER', 'UNDO'}}
 
     uarm_fk: bpy.props.StringProperty(name="Upper Arm FK Name")
     farm_fk: bpy.props.StringProperty(name="Forerm FK Name")
@@ -194,35 +193,38 @@ class Arm_IK2FK(bpy.types.Operator):
     farm_ik: bpy.props.StringProperty(name="Forearm IK Name")
     hand_ik: bpy.props.StringProperty(name="Hand IK Name")
 
+    frames: bpy.props.EnumProperty(name="Frames", items=SNAP_FRAME_ITEMS, default='CURRENT')
+
     @classmethod
     def poll(cls, context):
         return context.active_object is not None and context.mode == 'POSE'
 
+    def snap(self, obj):
+        """ Matches the ik bones in an arm rig to the fk bones.
+        """
+        uarm  = obj.pose.bones[self.uarm_fk]
+        hand  = obj.pose.bones[self.hand_fk]
+        uarmi = obj.pose.bones[self.uarm_ik]
+        handi = obj.pose.bones[self.hand_ik]
+
+        match_pose_bones([
+            (handi, hand),          # Hand position
+            (uarmi, uarm),          # Upper Arm position
+        ])
+
+        # Rotation Correction
+        correct_rotation(uarmi, uarm, hand)
+
     def execute(self, context):
         use_global_undo = context.user_preferences.edit.use_global_undo
         context.user_preferences.edit.use_global_undo = False
         try:
-            """ Matches the ik bones in an arm rig to the fk bones.
-            """
             obj = context.active_object
-
-            uarm  = obj.pose.bones[self.uarm_fk]
-            hand  = obj.pose.bones[self.hand_fk]
-            uarmi = obj.pose.bones[self.uarm_ik]
-            handi = obj.pose.bones[self.hand_ik]
-
-            # Hand position
-            match_pose_translation(handi, hand)
-            match_pose_rotation(handi, hand)
-            match_pose_scale(handi, hand)
-
-            # Upper Arm position
-            match_pose_translation(uarmi, uarm)
-            match_pose_rotation(uarmi, uarm)
-            match_pose_scale(uarmi, uarm)
-
-            # Rotation Correction
-            correct_rotation(uarmi, uarm)
+            run_snap(
+                context, lambda: self.snap(obj), self.frames,
+                [self.uarm_ik, self.hand_ik],
+                [self.uarm_fk, self.farm_fk, self.hand_fk]
+            )
         finally:
             context.user_preferences.edit.use_global_undo = use_global_undo
         return {{'FINISHED'}}
@@ -19,7 +19,7 @@
 # <pep8 compliant>
 import bpy, math
 from rna_prop_ui import rna_idprop_ui_prop_get
-from ...utils import MetarigError, connected_children_names, new_bone, copy_bone, put_bone, flip_bone
+from ...utils import MetarigError, connected_children_names, new_bone, set_mode, copy_bone, put_bone, flip_bone
 from ..widgets import create_foot_widget, create_ballsocket_widget, create_toe_widget
 from .limb import *
 
@@ -73,7 +73,7 @@ if is_selected( fk_ctrl ):
 
         bones['ik']['ctrl']['terminal'] = []
 
-        bpy.ops.object.mode_set(mode='EDIT')
+        set_mode('EDIT')
         eb = self.obj.data.edit_bones
 
         # Create IK leg control
@@ -267,7 +267,7 @@ if is_selected( fk_ctrl ):
         # Add ballsocket widget to heel
         create_ballsocket_widget(self.obj, heel)
 
-        bpy.ops.object.mode_set(mode='EDIT')
+        set_mode('EDIT')
         eb = self.obj.data.edit_bones
 
         if len( org_bones ) >= 4:
@@ -332,7 +332,7 @@ class Leg_FK2IK(bpy.types.Operator):
     """
     bl_idname = "pose.gamerig_leg_fk2ik_{rig_id}"
     bl_label = "Snap FK leg to IK"
-    bl_options = {{'UNDO'}}
+    bl_options = {{'REGISTER', 'UNDO'}}
 
     thigh_fk: bpy.props.StringProperty(name="Thigh FK Name")
     shin_fk:  bpy.props.StringProperty(name="Shin FK Name")
@@ -344,44 +344,42 @@ class Leg_FK2IK(bpy.types.Operator):
     foot_ik:  bpy.props.StringProperty(name="Foot IK Name")
     toe_ik:   bpy.props.StringProperty(name="Toe IK Name")
 
+    frames:   bpy.props.EnumProperty(name="Frames", items=SNAP_FRAME_ITEMS, default='CURRENT')
+
     @classmethod
     def poll(cls, context):
         return context.active_object is not None and context.mode == 'POSE'
 
+    def snap(self, obj):
+        """ Matches the fk bones in a leg rig to the ik bones.
+        """
+        thigh  = obj.pose.bones[self.thigh_fk]
+        shin   = obj.pose.bones[self.shin_fk]
+        foot   = obj.pose.bones[self.foot_fk]
+        toe    = obj.pose.bones[self.toe_fk]
+
+        thighi = obj.pose.bones[self.thigh_ik]
+        shini  = obj.pose.bones[self.shin_ik]
+        footi  = obj.pose.bones[self.foot_ik]
+        toei   = obj.pose.bones[self.toe_ik]
+
+        match_pose_bones([
+            (thigh, thighi),        # Thigh position
+            (shin, shini, 'RS'),    # Shin position
+            (foot, footi, 'RS'),    # Foot position
+            (toe, toei, 'RS'),      # Toe position
+        ], update=False)
+
     def execute(self, context):
         use_global_undo = context.user_preferences.edit.use_global_undo
         context.user_preferences.edit.use_global_undo = False
         try:
-            """ Matches the fk bones in a leg rig to the ik bones.
-            """
             obj = context.active_object
-
-            thigh  = obj.pose.bones[self.thigh_fk]
-            shin   = obj.pose.bones[self.shin_fk]
-            foot   = obj.pose.bones[self.foot_fk]
-            toe    = obj.pose.bones[self.toe_fk]
-            
-            thighi = obj.pose.bones[self.thigh_ik]
-            shini  = obj.pose.bones[self.shin_ik]
-            footi  = obj.pose.bones[self.foot_ik]
-            toei   = obj.pose.bones[self.toe_ik]
-
-            # Thigh position
-            match_pose_translation(thigh, thighi)
-            match_pose_rotation(thigh, thighi)
-            match_pose_scale(thigh, thighi)
-
-            # Shin position
-            match_pose_rotation(shin, shini)
-            match_pose_scale(shin, shini)
-
-            # Foot position
-            match_pose_rotation(foot, footi)
-            match_pose_scale(foot, footi)
-
-            # Toe position
-            match_pose_rotation(toe, toei)
-            match_pose_scale(toe, toei)
+            run_snap(
+                context, lambda: self.snap(obj), self.frames,
+                [self.thigh_fk, self.shin_fk, self.foot_fk, self.toe_fk],
+                [self.thigh_ik, self.shin_ik, self.foot_ik, self.toe_ik]
+            )
         finally:
             context.user_preferences.edit.use_global_undo = use_global_undo
         return {{'FINISHED'}}
@@ -392,7 +390,7 @@ class Leg_IK2FK(bpy.types.Operator):
     """
     bl_idname = "pose.gamerig_leg_ik2fk_{rig_id}"
     bl_label = "Snap IK leg to FK"
-    bl_options = {{'UNDO'}}
+    bl_options = {{'REGISTER', 'UNDO'}}
 
     thigh_fk: bpy.props.StringProperty(name="Thigh FK Name")
     shin_fk:  bpy.props.StringProperty(name="Shin FK Name")
@@ -406,54 +404,50 @@ class Leg_IK2FK(bpy.types.Operator):
     mfoot_ik: bpy.props.StringProperty(name="MFoot IK Name")
     toe_ik:   bpy.props.StringProperty(name="Toe IK Name")
 
+    frames:   bpy.props.EnumProperty(name="Frames", items=SNAP_FRAME_ITEMS, default='CURRENT')
+
     @classmethod
     def poll(cls, context):
         return context.active_object is not None and context.mode == 'POSE'
 
+    def snap(self, obj):
+        """ Matches the ik bones in a leg rig to the fk bones.
+        """
+        thigh    = obj.pose.bones[self.thigh_fk]
+        shin     = obj.pose.bones[self.shin_fk]
+        foot     = obj.pose.bones[self.foot_fk]
+        toe      = obj.pose.bones[self.toe_fk]
+
+        thighi   = obj.pose.bones[self.thigh_ik]
+        shini    = obj.pose.bones[self.shin_ik]
+        footi    = obj.pose.bones[self.foot_ik]
+        footroll = obj.pose.bones[self.footroll]
+        mfooti   = obj.pose.bones[self.mfoot_ik]
+        toei     = obj.pose.bones[self.toe_ik]
+
+        # Clear footroll
+        set_pose_rotation(footroll, Matrix())
+
+        mat = mfooti.bone.matrix_local.inverted() @ footi.bone.matrix_local
+        match_pose_bones([
+            (footi, foot.matrix @ mat), # Foot position
+            (toei, toe),                # Toe position
+            (thighi, thigh),            # Thigh position
+        ])
+
+        # Rotation Correction
+        correct_rotation(thighi, thigh, foot)
+
     def execute(self, context):
         use_global_undo = context.user_preferences.edit.use_global_undo
         context.user_preferences.edit.use_global_undo = False
         try:
-            """ Matches the ik bones in a leg rig to the fk bones.
-            """
             obj = context.active_object
-
-            thigh    = obj.pose.bones[self.thigh_fk]
-            shin     = obj.pose.bones[self.shin_fk]
-            foot     = obj.pose.bones[self.foot_fk]
-            toe      = obj.pose.bones[self.toe_fk]
-
-            thighi   = obj.pose.bones[self.thigh_ik]
-            shini    = obj.pose.bones[self.shin_ik]
-            footi    = obj.pose.bones[self.foot_ik]
-            footroll = obj.pose.bones[self.footroll]
-            mfooti   = obj.pose.bones[self.mfoot_ik]
-            toei     = obj.pose.bones[self.toe_ik]
-            
-            # Clear footroll
-            set_pose_rotation(footroll, Matrix())
-
-            # Foot position
-            mat = mfooti.bone.matrix_local.inverted() * footi.bone.matrix_local
-            footmat = get_pose_matrix_in_other_space(foot.matrix, footi) * mat
-            set_pose_translation(footi, footmat)
-            set_pose_rotation(footi, footmat)
-            set_pose_scale(footi, footmat)
-            bpy.ops.object.mode_set(mode='OBJECT')
-            bpy.ops.object.mode_set(mode='POSE')
-
-            # Toe position
-            match_pose_translation(toei, toe)
-            match_pose_rotation(toei, toe)
-            match_pose_scale(toei, toe)
-
-            # Thigh position
-            match_pose_translation(thighi, thigh)
-            match_pose_rotation(thighi, thigh)
-            match_pose_scale(thighi, thigh)
-
-            # Rotation Correction
-            correct_rotation(thighi,thigh)
+            run_snap(
+                context, lambda: self.snap(obj), self.frames,
+                [self.thigh_ik, self.foot_ik, self.footroll, self.toe_ik],
+                [self.thigh_fk, self.shin_fk, self.foot_fk, self.toe_fk]
+            )
         finally:
             context.user_preferences.edit.use_global_undo = use_global_undo
         return {{'FINISHED'}}
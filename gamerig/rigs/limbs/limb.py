@@ -3,12 +3,14 @@ from rna_prop_ui import rna_idprop_ui_prop_get
 from math import trunc
 from mathutils import Vector
 from ...utils import (
-    copy_bone, org, mch, basename,
+    set_mode, copy_bone, org, mch, basename,
     connected_children_names, find_root_bone,
     create_widget,
     MetarigError
 )
+from ...armature_model import ModelObject
 from ..widgets import create_sphere_widget, create_limb_widget, create_ikarrow_widget, create_directed_circle_widget
+from .limb_model import get_bone_name, build_ik_bones
 
 class Limb:
     def __init__(self, obj, bone_name, params):
@@ -32,7 +34,7 @@ class Limb:
     def create_parent( self ):
         org_bones = self.org_bones
 
-        bpy.ops.object.mode_set(mode ='EDIT')
+        set_mode('EDIT')
         eb = self.obj.data.edit_bones
 
         name = get_bone_name( basename( org_bones[0] ), 'mch', 'parent' )
@@ -76,74 +78,25 @@ class Limb:
 
 
     def create_ik( self, parent ):
-        org_bones = self.org_bones
-
-        bpy.ops.object.mode_set(mode ='EDIT')
-        eb = self.obj.data.edit_bones
-
-        ctrl       = get_bone_name( org_bones[0], 'ctrl', 'ik'        )
-        mch_ik     = get_bone_name( org_bones[0], 'mch',  'ik'        )
-        mch_target = get_bone_name( org_bones[0], 'mch',  'ik_target' )
-
-        for o, ik in zip( org_bones, [ ctrl, mch_ik, mch_target ] ):
-            bone = copy_bone( self.obj, o, ik )
-
-            if org_bones.index(o) == len( org_bones ) - 1:
-                eb[ bone ].length /= 4
-
-        # Create MCH Stretch
-        mch_str = copy_bone(
-            self.obj,
-            org_bones[0],
-            get_bone_name( org_bones[0], 'mch', 'IK Stretch' )
+        # The IK bones are built on an armature model, which only loads the
+        # bones they are made from and only commits the new ones
+        set_mode('EDIT')
+        model = ModelObject.from_object( self.obj )
+        bones = build_ik_bones(
+            model, self.org_bones, parent, self.limb_type, self.rot_axis, self.allow_ik_stretch
         )
+        model.commit( self.obj )
 
-        if self.limb_type == 'arm':
-            eb[ mch_str ].tail = eb[ org_bones[-1] ].head
-        else:
-            eb[ mch_str ].tail = eb[ org_bones[-2] ].head
+        # Widget
+        create_ikarrow_widget( self.obj, bones['ctrl']['limb'] )
 
-        # Parenting
-        eb[ ctrl    ].parent = eb[ parent ]
-        eb[ mch_str ].parent = eb[ parent ]
-        eb[ mch_ik  ].parent = eb[ ctrl   ]
-        
-        self.make_constraint( mch_ik, {
-            'constraint'  : 'IK',
-            'subtarget'   : mch_target,
-            'chain_count' : 2,
-            'use_stretch' : self.allow_ik_stretch,
-        })
-
-        pb = self.obj.pose.bones
-        pb[ mch_ik ].ik_stretch = 0.1
-        pb[ ctrl   ].ik_stretch = 0.1
-
-        # IK constraint Rotation locks
-        for axis in ['x','y','z']:
-            if axis != self.rot_axis:
-               setattr( pb[ mch_ik ], 'lock_ik_' + axis, True )
-        if self.rot_axis == 'automatic':
-            pb[ mch_ik ].lock_ik_x = False
-
-        # Locks and Widget
-        pb[ ctrl ].lock_location = True, True, True
-        pb[ ctrl ].lock_rotation = False, False, True
-        pb[ ctrl ].lock_scale = True, True, True
-        create_ikarrow_widget( self.obj, ctrl )
-
-        return {
-            'ctrl'          : { 'limb' : ctrl },
-            'mch_ik'        : mch_ik,
-            'mch_target'    : mch_target,
-            'mch_str'       : mch_str
-        }
+        return bones
 
 
     def create_fk( self, parent ):
         org_bones = self.org_bones.copy()
 
-        bpy.ops.object.mode_set(mode ='EDIT')
+        set_mode('EDIT')
         eb = self.obj.data.edit_bones
 
         ctrls = []
@@ -188,7 +141,7 @@ class Limb:
                 'subtarget'   : self.root_bone
             })
         else:
-            bpy.ops.object.mode_set(mode ='OBJECT')
+            set_mode('OBJECT')
 
         # Locks and widgets
         pb = self.obj.pose.bones
@@ -212,7 +165,7 @@ class Limb:
 
 
     def org_parenting_and_switch( self, org, ik, fk, parent ):
-        bpy.ops.object.mode_set(mode ='EDIT')
+        set_mode('EDIT')
         eb = self.obj.data.edit_bones
         # re-parent ORGs in a connected chain
         for i,o in enumerate(org):
@@ -221,7 +174,7 @@ class Limb:
                 if i <= len(org)-1:
                     eb[o].use_connect = True
 
-        bpy.ops.object.mode_set(mode ='OBJECT')
+        set_mode('OBJECT')
         pb = self.obj.pose.bones
 
         # Limb Follow Driver
@@ -283,7 +236,7 @@ class Limb:
 
 
     def generate(self, create_terminal, script_template):
-        bpy.ops.object.mode_set(mode ='EDIT')
+        set_mode('EDIT')
         eb = self.obj.data.edit_bones
 
         # Clear parents for org bones
@@ -322,7 +275,7 @@ class Limb:
 
 
     def make_constraint( self, bone, constraint ):
-        bpy.ops.object.mode_set(mode = 'OBJECT')
+        set_mode('OBJECT')
         pb = self.obj.pose.bones
 
         owner_pb = pb[bone]
@@ -531,23 +484,3 @@ if is_selected( ik_ctrl ):
 
         for i in range(24,32):
             row.prop(params, "fk_layers", index=i, toggle=True, text="")
-
-
-def get_bone_name( name, btype, suffix = '' ):
-    if btype == 'mch':
-        name = mch( basename( name ) )
-    elif btype == 'ctrl':
-        name = basename( name )
-
-    if suffix:
-        # RE pattern match right or left parts
-        # match the letter "L" (or "R"), followed by an optional dot (".")
-        # and 0 or more digits at the end of the the string
-        results = re.match( r'^(\S+)(\.\S+)$',  name )
-        if results:
-            bname, addition = results.groups()
-            name = bname + "_" + suffix + addition
-        else:
-            name = name  + "_" + suffix
-
-    return name
@@ -0,0 +1,123 @@
+#====================== BEGIN GPL LICENSE BLOCK ======================
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+#======================= END GPL LICENSE BLOCK ========================
+
+# <pep8 compliant>
+
+""" Limb bone structures built on an armature model (see armature_model).
+    Doesn't need Blender, so the limb rig logic can run and be benchmarked
+    under plain CPython; Limb commits the model to the rig.
+"""
+
+import re
+from ...naming import mch, basename
+
+
+def add_constraint( obj, bone, constraint ):
+    """ Adds a constraint to a model pose bone, from a Limb.make_constraint()
+        style dict, targeting obj.
+    """
+    const = obj.pose.bones[bone].constraints.new( constraint['constraint'] )
+    const.target = obj
+    for p, value in constraint.items():
+        if p not in ( 'constraint', 'target' ):
+            setattr( const, p, value )
+    return const
+
+
+def build_ik_bones( obj, org_bones, parent, limb_type, rot_axis, allow_ik_stretch ):
+    """ Creates the IK control and mechanism bones of a limb on a model
+        object, with their constraints and locks. Returns them as
+        Limb.create_ik() does.
+    """
+    eb = obj.data.edit_bones
+
+    ctrl       = get_bone_name( org_bones[0], 'ctrl', 'ik'        )
+    mch_ik     = get_bone_name( org_bones[0], 'mch',  'ik'        )
+    mch_target = get_bone_name( org_bones[0], 'mch',  'ik_target' )
+
+    for o, ik in zip( org_bones, [ ctrl, mch_ik, mch_target ] ):
+        bone = obj.copy_bone( o, ik )
+
+        if org_bones.index(o) == len( org_bones ) - 1:
+            eb[ bone ].length /= 4
+
+    # Create MCH Stretch
+    mch_str = obj.copy_bone(
+        org_bones[0],
+        get_bone_name( org_bones[0], 'mch', 'IK Stretch' )
+    )
+
+    if limb_type == 'arm':
+        eb[ mch_str ].tail = eb[ org_bones[-1] ].head
+    else:
+        eb[ mch_str ].tail = eb[ org_bones[-2] ].head
+
+    # Parenting
+    eb[ ctrl    ].parent = eb[ parent ]
+    eb[ mch_str ].parent = eb[ parent ]
+    eb[ mch_ik  ].parent = eb[ ctrl   ]
+
+    add_constraint( obj, mch_ik, {
+        'constraint'  : 'IK',
+        'subtarget'   : mch_target,
+        'chain_count' : 2,
+        'use_stretch' : allow_ik_stretch,
+    })
+
+    pb = obj.pose.bones
+    pb[ mch_ik ].ik_stretch = 0.1
+    pb[ ctrl   ].ik_stretch = 0.1
+
+    # IK constraint Rotation locks
+    for axis in ['x','y','z']:
+        if axis != rot_axis:
+           setattr( pb[ mch_ik ], 'lock_ik_' + axis, True )
+    if rot_axis == 'automatic':
+        pb[ mch_ik ].lock_ik_x = False
+
+    # Locks
+    pb[ ctrl ].lock_location = True, True, True
+    pb[ ctrl ].lock_rotation = False, False, True
+    pb[ ctrl ].lock_scale = True, True, True
+
+    return {
+        'ctrl'          : { 'limb' : ctrl },
+        'mch_ik'        : mch_ik,
+        'mch_target'    : mch_target,
+        'mch_str'       : mch_str
+    }
+
+
+def get_bone_name( name, btype, suffix = '' ):
+    if btype == 'mch':
+        name = mch( basename( name ) )
+    elif btype == 'ctrl':
+        name = basename( name )
+
+    if suffix:
+        # RE pattern match right or left parts
+        # match the letter "L" (or "R"), followed by an optional dot (".")
+        # and 0 or more digits at the end of the the string
+        results = re.match( r'^(\S+)(\.\S+)$',  name )
+        if results:
+            bname, addition = results.groups()
+            name = bname + "_" + suffix + addition
+        else:
+            name = name  + "_" + suffix
+
+    return name
@@ -21,7 +21,7 @@ import bpy
 from rna_prop_ui import rna_idprop_ui_prop_get
 from ...utils import (
     connected_children_names,
-    flip_bone, copy_bone,
+    flip_bone, set_mode, copy_bone,
     MetarigError
 )
 from ..widgets import create_paw_widget, create_ballsocket_widget, create_toe_widget
@@ -79,7 +79,7 @@ if is_selected( fk_ctrl ):
 
         bones['ik']['ctrl']['terminal'] = []
 
-        bpy.ops.object.mode_set(mode='EDIT')
+        set_mode('EDIT')
         eb = self.obj.data.edit_bones
 
         # Create IK paw control
@@ -161,7 +161,7 @@ if is_selected( fk_ctrl ):
         # Add ballsocket widget to heel
         create_ballsocket_widget(self.obj, heel)
 
-        bpy.ops.object.mode_set(mode='EDIT')
+        set_mode('EDIT')
         eb = self.obj.data.edit_bones
 
         if len( org_bones ) >= 4:
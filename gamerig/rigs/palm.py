@@ -23,7 +23,7 @@ from math import cos, pi
 
 import bpy
 
-from ..utils import MetarigError, copy_bone, basename
+from ..utils import MetarigError, set_mode, copy_bone, basename
 from .widgets import create_palm_widget
 
 def bone_siblings(obj, bone):
@@ -87,7 +87,7 @@ class Rig:
             The main armature should be selected and active before this is called.
 
         """
-        bpy.ops.object.mode_set(mode='EDIT')
+        set_mode('EDIT')
 
         # Figure out the name for the control bone (remove the last .##)
         last_bone = self.org_bones[-1:][0]
@@ -117,7 +117,7 @@ class Rig:
         eb[ctrl].parent = eb[org_parent]
 
         # Constraints
-        bpy.ops.object.mode_set(mode='OBJECT')
+        set_mode('OBJECT')
         pb = self.obj.pose.bones
 
         ctrlbone = pb[ctrl]
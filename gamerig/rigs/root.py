@@ -20,7 +20,7 @@
 
 import bpy
 
-from ..utils import copy_bone, basename, create_widget
+from ..utils import set_mode, copy_bone, basename, create_widget, shared_widget
 
 
 class Rig:
@@ -40,7 +40,7 @@ class Rig:
             The main armature should be selected and active before this is called.
 
         """
-        bpy.ops.object.mode_set(mode='EDIT')
+        set_mode('EDIT')
 
         # Make a control bone (copy of original).
         bone = copy_bone(self.obj, self.org_bone, self.basename)
@@ -48,7 +48,7 @@ class Rig:
         # Get edit bones
         eb = self.obj.data.edit_bones
 
-        bpy.ops.object.mode_set(mode='OBJECT')
+        set_mode('OBJECT')
         pb = self.obj.pose.bones
 
         # Constrain the original bone.
@@ -61,6 +61,7 @@ class Rig:
         create_root_widget(self.obj, bone)
 
 
+@shared_widget
 def create_root_widget(rig, bone_name, bone_transform_name=None):
     """ Creates a widget for the root bone.
     """
@@ -1,7 +1,7 @@
 import bpy
 from rna_prop_ui import rna_idprop_ui_prop_get
 from ..utils import (
-    copy_bone, org, basename, connected_children_names,
+    set_mode, copy_bone, org, basename, connected_children_names,
     create_widget,
     MetarigError
 )
@@ -24,7 +24,7 @@ class Rig:
 
     def make_controls( self ):
 
-        bpy.ops.object.mode_set(mode ='EDIT')
+        set_mode('EDIT')
         org_bones = self.org_bones
 
         ctrl_chain = []
@@ -40,7 +40,7 @@ class Rig:
             ctrl_chain.append( ctrl_bone )
 
         # Make widgets
-        bpy.ops.object.mode_set(mode ='OBJECT')
+        set_mode('OBJECT')
 
         for ctrl in ctrl_chain:
             create_circle_widget(self.obj, ctrl, radius=0.3, head_tail=0.5)
@@ -50,7 +50,7 @@ class Rig:
 
     def parent_bones( self, all_bones ):
 
-        bpy.ops.object.mode_set(mode ='EDIT')
+        set_mode('EDIT')
         org_bones = self.org_bones
         eb        = self.obj.data.edit_bones
 
@@ -62,7 +62,7 @@ class Rig:
 
     def make_constraints( self, all_bones ):
 
-        bpy.ops.object.mode_set(mode ='OBJECT')
+        set_mode('OBJECT')
         org_bones = self.org_bones
         pb        = self.obj.pose.bones
 
@@ -91,7 +91,7 @@ class Rig:
 
 
     def generate(self):
-        bpy.ops.object.mode_set(mode ='EDIT')
+        set_mode('EDIT')
         eb = self.obj.data.edit_bones
 
         # Clear all initial parenting
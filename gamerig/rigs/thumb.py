@@ -2,7 +2,7 @@ import bpy
 from mathutils import Vector
 from rna_prop_ui import rna_idprop_ui_prop_get
 from ..utils import (
-    copy_bone, connected_children_names,
+    set_mode, copy_bone, connected_children_names,
     create_widget,
     MetarigError,
     basename, mch
@@ -24,7 +24,7 @@ class Rig:
     def generate(self):
         org_bones = self.org_bones
 
-        bpy.ops.object.mode_set(mode ='EDIT')
+        set_mode('EDIT')
         eb = self.obj.data.edit_bones
 
         # Bone name lists
@@ -95,7 +95,7 @@ class Rig:
         ctrl_bone_master = eb[ master_name ]
         ctrl_bone_master.parent = eb[ ctrl_chain[0] ]
 
-        bpy.ops.object.mode_set(mode ='OBJECT')
+        set_mode('OBJECT')
 
         pb = self.obj.pose.bones
 
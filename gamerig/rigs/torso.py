@@ -2,9 +2,9 @@ import bpy
 from mathutils import Vector
 from rna_prop_ui import rna_idprop_ui_prop_get
 from ..utils import (
-    copy_bone, put_bone,
+    set_mode, copy_bone, put_bone,
     org, basename, make_mechanism_name, connected_children_names,
-    create_widget,
+    create_widget, shared_widget,
     MetarigError
 )
 from .widgets import create_sphere_widget, create_directed_circle_widget
@@ -103,7 +103,7 @@ class Rig:
         org_bones  = self.org_bones
         pivot_name = org_bones[pivot-1]
 
-        bpy.ops.object.mode_set(mode ='EDIT')
+        set_mode('EDIT')
         eb = self.obj.data.edit_bones
 
         # Create torso control bone
@@ -132,7 +132,7 @@ class Rig:
     def create_neck( self, neck_bones ):
         org_bones = self.org_bones
 
-        bpy.ops.object.mode_set(mode ='EDIT')
+        set_mode('EDIT')
         eb = self.obj.data.edit_bones
 
         # Create neck control
@@ -191,7 +191,7 @@ class Rig:
     def create_chest( self, chest_bones ):
         org_bones = self.org_bones
 
-        bpy.ops.object.mode_set(mode ='EDIT')
+        set_mode('EDIT')
         eb = self.obj.data.edit_bones
 
         # get total spine length
@@ -231,7 +231,7 @@ class Rig:
     def create_hips( self, hip_bones ):
         org_bones = self.org_bones
 
-        bpy.ops.object.mode_set(mode ='EDIT')
+        set_mode('EDIT')
         eb = self.obj.data.edit_bones
 
         # Create hips control bone
@@ -274,7 +274,7 @@ class Rig:
     def parent_bones( self, bones ):
         org_bones = self.org_bones
 
-        bpy.ops.object.mode_set(mode ='EDIT')
+        set_mode('EDIT')
         eb = self.obj.data.edit_bones
 
         # Parent deform bones
@@ -358,7 +358,7 @@ class Rig:
 
 
     def make_constraint( self, bone, constraint ):
-        bpy.ops.object.mode_set(mode = 'OBJECT')
+        set_mode('OBJECT')
         pb = self.obj.pose.bones
 
         owner_pb     = pb[bone]
@@ -455,7 +455,7 @@ class Rig:
 
 
     def create_drivers( self, bones ):
-        bpy.ops.object.mode_set(mode ='OBJECT')
+        set_mode('OBJECT')
         pb = self.obj.pose.bones
 
         # Setting the torso's props
@@ -522,7 +522,7 @@ class Rig:
 
 
     def locks_and_widgets( self, bones ):
-        bpy.ops.object.mode_set(mode ='OBJECT')
+        set_mode('OBJECT')
         pb = self.obj.pose.bones
 
         # Locks
@@ -576,7 +576,7 @@ class Rig:
 
         bone_chains = self.build_bone_structure()
 
-        bpy.ops.object.mode_set(mode ='EDIT')
+        set_mode('EDIT')
         eb = self.obj.data.edit_bones
 
         # Clear parents for org bones
@@ -599,7 +599,7 @@ class Rig:
             bones['hips']  = self.create_hips( lower_torso_bones )
 
             # TEST
-            bpy.ops.object.mode_set(mode ='EDIT')
+            set_mode('EDIT')
             eb = self.obj.data.edit_bones
 
             self.parent_bones(      bones )
@@ -669,6 +669,7 @@ def add_parameters( params ):
     )
 
 
+@shared_widget
 def create_torso_widget(rig, bone_name, size=1, bone_transform_name=None):
     """ Creates a torso cube widget.
     """
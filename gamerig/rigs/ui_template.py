@@ -23,98 +23,104 @@ UI_TEMPLATE = '''
 # for gamerig
 #
 import bpy
-from mathutils import Matrix, Vector
-from math import acos, pi, radians
+from mathutils import Matrix, Vector, Quaternion
+from math import acos, atan2, pi, radians
 from bpy.utils import register_class
 
-############################
-## Math utility functions ##
-############################
+#######################
+## Rest matrix cache ##
+#######################
 
-def tail_distance(angle,bone_ik,bone_fk):
-    """ Returns the distance between the tails of two bones
-        after rotating bone_ik in AXIS_ANGLE mode.
+class RestMatrices:
+    """ Rest matrices of a bone, which only change when the armature is edited.
     """
-    rot_mod=bone_ik.rotation_mode
-    if rot_mod != 'AXIS_ANGLE':
-        bone_ik.rotation_mode = 'AXIS_ANGLE'
-    bone_ik.rotation_axis_angle[0] = angle
-    bpy.context.scene.update()
+    __slots__ = ('rest', 'rest_inv', 'rest_quat', 'rest_in_parent', 'rest_in_parent_quat', 'parent_in_rest')
+
+    def __init__(self, bone):
+        self.rest = bone.matrix_local.copy()
+        self.rest_inv = self.rest.inverted()
+        self.rest_quat = self.rest.to_quaternion()
+        if bone.parent:
+            par_rest = bone.parent.matrix_local
+            self.rest_in_parent = par_rest.inverted() @ self.rest
+            self.parent_in_rest = self.rest_inv @ par_rest
+        else:
+            self.rest_in_parent = self.rest.copy()
+            self.parent_in_rest = self.rest_inv.copy()
+        self.rest_in_parent_quat = self.rest_in_parent.to_quaternion()
 
-    dv = (bone_fk.tail - bone_ik.tail).length
 
-    bone_ik.rotation_mode = rot_mod
-    return dv
+# gamerig_id -> (armature pointer, bone name -> RestMatrices)
+rest_cache = dict()
 
-def find_min_range(bone_ik,bone_fk,f=tail_distance,delta=pi/8):
-    """ finds the range where lies the minimum of function f applied on bone_ik and bone_fk
-        at a certain angle.
-    """
-    rot_mod=bone_ik.rotation_mode
-    if rot_mod != 'AXIS_ANGLE':
-        bone_ik.rotation_mode = 'AXIS_ANGLE'
-
-    start_angle = bone_ik.rotation_axis_angle[0]
-    angle = start_angle
-    while (angle > (start_angle - 2*pi)) and (angle < (start_angle + 2*pi)):
-        l_dist = f(angle-delta,bone_ik,bone_fk)
-        c_dist = f(angle,bone_ik,bone_fk)
-        r_dist = f(angle+delta,bone_ik,bone_fk)
-        if min((l_dist,c_dist,r_dist)) == c_dist:
-            bone_ik.rotation_mode = rot_mod
-            return (angle-delta,angle+delta)
-        else:
-            angle=angle+delta
 
-def ternarySearch(f, left, right, bone_ik, bone_fk, absolutePrecision):
+def get_rest_matrices(pose_bone):
+    """ Returns the cached RestMatrices of a pose bone.
     """
-    Find minimum of unimodal function f() within [left, right]
-    To find the maximum, revert the if/else statement or revert the comparison.
+    armature = pose_bone.id_data.data
+    key = armature.get("gamerig_id", armature.name)
+    pointer = armature.as_pointer()
+    entry = rest_cache.get(key)
+    if entry is None or entry[0] != pointer:
+        entry = (pointer, dict())
+        rest_cache[key] = entry
+    bones = entry[1]
+    rest = bones.get(pose_bone.name)
+    if rest is None:
+        rest = bones[pose_bone.name] = RestMatrices(pose_bone.bone)
+    return rest
+
+
+def invalidate_rest_cache(*args):
+    """ Drops the cached rest matrices of edited armatures.
+        Runs as a depsgraph update handler.
     """
-    while True:
-        #left and right are the current bounds; the maximum is between them
-        if abs(right - left) < absolutePrecision:
-            return (left + right)/2
+    depsgraph = args[1] if len(args) > 1 else bpy.context.evaluated_depsgraph_get()
+    for update in depsgraph.updates:
+        if isinstance(update.id, bpy.types.Armature):
+            armature = update.id.original
+            rest_cache.pop(armature.get("gamerig_id", armature.name), None)
 
-        leftThird = left + (right - left)/3
-        rightThird = right - (right - left)/3
 
-        if f(leftThird, bone_ik, bone_fk) > f(rightThird, bone_ik, bone_fk):
-            left = leftThird
-        else:
-            right = rightThird
+def clear_rest_cache(*args):
+    """ Drops all cached rest matrices, after loading a file or undoing.
+    """
+    rest_cache.clear()
+
+
+invalidate_rest_cache.gamerig_rest_cache = "{rig_id}"
+clear_rest_cache.gamerig_rest_cache = "{rig_id}"
+for handlers, handler in (
+    (bpy.app.handlers.depsgraph_update_post, invalidate_rest_cache),
+    (bpy.app.handlers.load_post, clear_rest_cache),
+    (bpy.app.handlers.undo_post, clear_rest_cache),
+    (bpy.app.handlers.redo_post, clear_rest_cache),
+):
+    # Replace the handlers of a previous run of this script
+    for old in [h for h in handlers if getattr(h, 'gamerig_rest_cache', None) == "{rig_id}"]:
+        handlers.remove(old)
+    handlers.append(handler)
+
 
 #########################################
 ## "Visual Transform" helper functions ##
 #########################################
 
-def get_pose_matrix_in_other_space(mat, pose_bone):
+def get_pose_matrix_in_other_space(mat, pose_bone, parent_matrix=None):
     """ Returns the transform matrix relative to pose_bone's current
         transform space.  In other words, presuming that mat is in
         armature space, slapping the returned matrix onto pose_bone
         should give it the armature-space transforms of mat.
+        parent_matrix overrides the current pose matrix of the parent.
         TODO: try to handle cases with axis-scaled parents better.
     """
-    rest = pose_bone.bone.matrix_local.copy()
-    rest_inv = rest.inverted()
+    rest = get_rest_matrices(pose_bone)
     if pose_bone.parent:
-        par_mat = pose_bone.parent.matrix.copy()
-        par_inv = par_mat.inverted()
-        par_rest = pose_bone.parent.bone.matrix_local.copy()
-    else:
-        par_mat = Matrix()
-        par_inv = Matrix()
-        par_rest = Matrix()
-
-    # Get matrix in bone's current transform space
-    smat = rest_inv @ (par_rest @ (par_inv @ mat))
-
-    # Compensate for non-local location
-    #if not pose_bone.bone.use_local_location:
-    #    loc = smat.to_translation() @ (par_rest.inverted() @ rest).to_quaternion()
-    #    smat.translation = loc
-
-    return smat
+        if parent_matrix is None:
+            parent_matrix = pose_bone.parent.matrix
+        # Get matrix in bone's current transform space
+        return rest.parent_in_rest @ (parent_matrix.inverted() @ mat)
+    return rest.rest_inv @ mat
 
 
 def get_local_pose_matrix(pose_bone):
@@ -130,16 +136,7 @@ def set_pose_translation(pose_bone, mat):
     if pose_bone.bone.use_local_location == True:
         pose_bone.location = mat.to_translation()
     else:
-        loc = mat.to_translation()
-
-        rest = pose_bone.bone.matrix_local.copy()
-        if pose_bone.bone.parent:
-            par_rest = pose_bone.bone.parent.matrix_local.copy()
-        else:
-            par_rest = Matrix()
-
-        q = (par_rest.inverted() @ rest).to_quaternion()
-        pose_bone.location = q @ loc
+        pose_bone.location = get_rest_matrices(pose_bone).rest_in_parent_quat @ mat.to_translation()
 
 
 def set_pose_rotation(pose_bone, mat):
@@ -166,15 +163,85 @@ def set_pose_scale(pose_bone, mat):
     pose_bone.scale = mat.to_scale()
 
 
+def get_pose_matrix_from_basis(pose_bone, parent_matrix=None):
+    """ Returns the armature space matrix pose_bone gets from its own
+        transform channels, without evaluating the rig.
+        parent_matrix overrides the current pose matrix of the parent.
+    """
+    rest = get_rest_matrices(pose_bone)
+    if pose_bone.parent:
+        if parent_matrix is None:
+            parent_matrix = pose_bone.parent.matrix
+        return parent_matrix @ rest.rest_in_parent @ pose_bone.matrix_basis
+    return rest.rest @ pose_bone.matrix_basis
+
+
+def is_pose_matrix_predictable(pose_bone):
+    """ Returns True if pose_bone's matrix only depends on its parent
+        and its own transform channels.
+    """
+    bone = pose_bone.bone
+    if not (bone.use_inherit_rotation and bone.use_inherit_scale):
+        return False
+    return not any(not c.mute and c.influence > 0.0 for c in pose_bone.constraints)
+
+
+def match_pose_bones(pairs, update=True):
+    """ Matches the visual transforms of several pose bones at once.
+        pairs is a sequence of (pose_bone, target) or (pose_bone, target, channels)
+        tuples. target is a pose bone or an armature space matrix, channels
+        is a string of 'T', 'R' and 'S' (translation, rotation, scale; all
+        of them by default).
+        Targets are read before any bone is changed. Bones are solved
+        parents first, using the matrices their solved parents will get,
+        and the rig is evaluated once at the end. It is only evaluated in
+        between when a bone descends from a solved bone through a bone
+        with constraints. Pass update=False when nothing reads the
+        evaluated pose afterwards.
+        This function assumes you are in pose mode on the relevant armature.
+    """
+    jobs = []
+    for pair in pairs:
+        pose_bone, target = pair[0], pair[1]
+        channels = pair[2] if len(pair) > 2 else 'TRS'
+        if not isinstance(target, Matrix):
+            target = target.matrix.copy()
+        jobs.append((len(pose_bone.parent_recursive), pose_bone, target, channels))
+    jobs.sort(key=lambda job: job[0])
+
+    # Solved bone name -> predicted matrix, or None if it can't be predicted
+    solved = dict()
+    for depth, pose_bone, target, channels in jobs:
+        parent_matrix = None
+        if pose_bone.parent and solved.get(pose_bone.parent.name) is not None:
+            parent_matrix = solved[pose_bone.parent.name]
+        elif any(p.name in solved for p in pose_bone.parent_recursive):
+            bpy.context.view_layer.update()
+            solved.clear()
+
+        mat = get_pose_matrix_in_other_space(target, pose_bone, parent_matrix)
+        if 'T' in channels:
+            set_pose_translation(pose_bone, mat)
+        if 'R' in channels:
+            set_pose_rotation(pose_bone, mat)
+        if 'S' in channels:
+            set_pose_scale(pose_bone, mat)
+
+        if is_pose_matrix_predictable(pose_bone):
+            solved[pose_bone.name] = get_pose_matrix_from_basis(pose_bone, parent_matrix)
+        else:
+            solved[pose_bone.name] = None
+
+    if update:
+        bpy.context.view_layer.update()
+
+
 def match_pose_translation(pose_bone, target_bone):
     """ Matches pose_bone's visual translation to target_bone's visual
         translation.
         This function assumes you are in pose mode on the relevant armature.
     """
-    mat = get_pose_matrix_in_other_space(target_bone.matrix, pose_bone)
-    set_pose_translation(pose_bone, mat)
-    bpy.ops.object.mode_set(mode='OBJECT')
-    bpy.ops.object.mode_set(mode='POSE')
+    match_pose_bones([(pose_bone, target_bone, 'T')])
 
 
 def match_pose_rotation(pose_bone, target_bone):
@@ -182,10 +249,7 @@ def match_pose_rotation(pose_bone, target_bone):
         rotation.
         This function assumes you are in pose mode on the relevant armature.
     """
-    mat = get_pose_matrix_in_other_space(target_bone.matrix, pose_bone)
-    set_pose_rotation(pose_bone, mat)
-    bpy.ops.object.mode_set(mode='OBJECT')
-    bpy.ops.object.mode_set(mode='POSE')
+    match_pose_bones([(pose_bone, target_bone, 'R')])
 
 
 def match_pose_scale(pose_bone, target_bone):
@@ -193,24 +257,207 @@ def match_pose_scale(pose_bone, target_bone):
         scale.
         This function assumes you are in pose mode on the relevant armature.
     """
-    mat = get_pose_matrix_in_other_space(target_bone.matrix, pose_bone)
-    set_pose_scale(pose_bone, mat)
-    bpy.ops.object.mode_set(mode='OBJECT')
-    bpy.ops.object.mode_set(mode='POSE')
+    match_pose_bones([(pose_bone, target_bone, 'S')])
+
+
+def correct_rotation(bone_ik, bone_fk, tip=None):
+    """ Corrects the ik rotation in ik2fk snapping functions.
+        Rotates bone_ik about the axis from its head to the end of the chain
+        (the head of tip, by default the tail of bone_fk's connected child),
+        so that its tail meets the tail of bone_fk. The IK solution rotates
+        rigidly about that axis, so the angle is computed directly from the
+        bone positions without evaluating the scene.
+    """
+    if tip is not None:
+        end = tip.head
+    else:
+        end = next(c for c in bone_fk.children if c.bone.use_connect).tail
+
+    axis = end - bone_ik.head
+    if axis.length < 1e-6:
+        return
+    axis.normalize()
+
+    # Tail directions, projected on the plane perpendicular to the axis
+    v_ik = bone_ik.tail - bone_ik.head
+    v_fk = bone_fk.tail - bone_fk.head
+    v_ik -= axis * v_ik.dot(axis)
+    v_fk -= axis * v_fk.dot(axis)
+    if v_ik.length < 1e-6 or v_fk.length < 1e-6:
+        # Straight chain, nothing to correct
+        return
+    angle = atan2(axis.dot(v_ik.cross(v_fk)), v_ik.dot(v_fk))
+
+    # Apply the armature space rotation in the bone's own transform space
+    rest = get_rest_matrices(bone_ik)
+    if bone_ik.parent:
+        space = (bone_ik.parent.matrix @ rest.rest_in_parent).to_quaternion()
+    else:
+        space = rest.rest_quat
+    rot = space.inverted() @ Quaternion(axis, angle) @ space
+    set_pose_rotation(bone_ik, (rot @ bone_ik.matrix_basis.to_quaternion()).to_matrix().to_4x4())
+
+
+########################
+## Snap baking helpers ##
+########################
+
+SNAP_FRAME_ITEMS = [
+    ('CURRENT', "Current Frame", "Snap the current frame only"),
+    ('RANGE', "Frame Range", "Snap and key every frame of the scene (or preview) range"),
+    ('KEYED', "Keyed Frames", "Snap and key the frames where the limb is keyed"),
+]
+
+
+def get_keyed_bone_frames(obj, bone_names):
+    """ Returns the sorted frames where any of the named bones is keyed
+        in the active action.
+    """
+    action = obj.animation_data.action if obj.animation_data else None
+    if action is None:
+        return []
+    prefixes = tuple('pose.bones["%s"]' % name for name in bone_names)
+    frames = set()
+    for fcurve in action.fcurves:
+        if fcurve.data_path.startswith(prefixes):
+            co = [0.0] * (2 * len(fcurve.keyframe_points))
+            fcurve.keyframe_points.foreach_get('co', co)
+            frames.update(co[0::2])
+    return sorted(frames)
+
+
+def get_snap_frames(scene, obj, mode, bone_names):
+    """ Returns the frames to snap for a SNAP_FRAME_ITEMS mode.
+    """
+    if mode == 'RANGE':
+        if scene.use_preview_range:
+            return list(range(scene.frame_preview_start, scene.frame_preview_end + 1))
+        return list(range(scene.frame_start, scene.frame_end + 1))
+    if mode == 'KEYED':
+        return get_keyed_bone_frames(obj, bone_names)
+    return [scene.frame_current]
 
 
-def correct_rotation(bone_ik, bone_fk):
-    """ Corrects the ik rotation in ik2fk snapping functions
+def get_transform_channels(pose_bone):
+    """ Returns the (property, size) transform channels to key on a pose bone.
     """
+    if pose_bone.rotation_mode == 'QUATERNION':
+        rotation = ('rotation_quaternion', 4)
+    elif pose_bone.rotation_mode == 'AXIS_ANGLE':
+        rotation = ('rotation_axis_angle', 4)
+    else:
+        rotation = ('rotation_euler', 3)
+    return [('location', 3), rotation, ('scale', 3)]
 
-    alfarange = find_min_range(bone_ik,bone_fk)
-    alfamin = ternarySearch(tail_distance,alfarange[0],alfarange[1],bone_ik,bone_fk,0.1)
 
-    rot_mod = bone_ik.rotation_mode
-    if rot_mod != 'AXIS_ANGLE':
-        bone_ik.rotation_mode = 'AXIS_ANGLE'
-    bone_ik.rotation_axis_angle[0] = alfamin
-    bone_ik.rotation_mode = rot_mod
+def insert_keyframes(action, data_path, index, group, frames, values):
+    """ Keys values at frames on an fcurve in one pass, replacing the
+        values of existing keys on the same frames.
+    """
+    fcurve = action.fcurves.find(data_path, index=index)
+    if fcurve is None:
+        fcurve = action.fcurves.new(data_path, index=index, action_group=group)
+    points = fcurve.keyframe_points
+
+    count = len(points)
+    co = [0.0] * (2 * count)
+    left = [0.0] * (2 * count)
+    right = [0.0] * (2 * count)
+    points.foreach_get('co', co)
+    points.foreach_get('handle_left', left)
+    points.foreach_get('handle_right', right)
+
+    existing = dict((co[2 * i], i) for i in range(count))
+    added = 0
+    for frame, value in zip(frames, values):
+        i = existing.get(frame)
+        if i is None:
+            co += [frame, value]
+            left += [frame, value]
+            right += [frame, value]
+            added += 1
+        else:
+            delta = value - co[2 * i + 1]
+            co[2 * i + 1] = value
+            left[2 * i + 1] += delta
+            right[2 * i + 1] += delta
+
+    if added:
+        points.add(added)
+    points.foreach_set('co', co)
+    points.foreach_set('handle_left', left)
+    points.foreach_set('handle_right', right)
+    fcurve.update()
+
+
+def bake_snap(context, obj, snap, bone_names, frames):
+    """ Runs snap() on each frame and keys the transforms of the named
+        bones over all the frames in bulk.
+        Each frame is evaluated once by the frame change; snap() only adds
+        evaluations where the snapped pose must be read back.
+    """
+    scene = context.scene
+    frame_current = scene.frame_current
+    pose_bones = [obj.pose.bones[name] for name in bone_names]
+    channels = [(pose_bone, get_transform_channels(pose_bone)) for pose_bone in pose_bones]
+
+    # (bone name, property) -> list of values per frame
+    samples = dict()
+    for pose_bone, props in channels:
+        for prop, size in props:
+            samples[(pose_bone.name, prop)] = []
+
+    try:
+        for frame in frames:
+            scene.frame_set(int(frame), subframe=frame - int(frame))
+            snap()
+            for pose_bone, props in channels:
+                for prop, size in props:
+                    values = samples[(pose_bone.name, prop)]
+                    value = getattr(pose_bone, prop)
+                    if prop == 'rotation_quaternion':
+                        # Keep the keys in the same hemisphere
+                        value = value.copy()
+                        if values and value.dot(values[-1]) < 0.0:
+                            value.negate()
+                    elif prop == 'rotation_euler':
+                        value = value.copy()
+                        if values:
+                            value.make_compatible(values[-1])
+                    else:
+                        value = tuple(value)
+                    values.append(value)
+    finally:
+        scene.frame_set(frame_current)
+
+    if obj.animation_data is None:
+        obj.animation_data_create()
+    action = obj.animation_data.action
+    if action is None:
+        action = obj.animation_data.action = bpy.data.actions.new(obj.name + "Action")
+
+    for pose_bone, props in channels:
+        data_path_prefix = 'pose.bones["%s"].' % pose_bone.name
+        for prop, size in props:
+            values = samples[(pose_bone.name, prop)]
+            for index in range(size):
+                insert_keyframes(
+                    action, data_path_prefix + prop, index, pose_bone.name,
+                    frames, [value[index] for value in values]
+                )
+
+
+def run_snap(context, snap, mode, bone_names, source_names):
+    """ Snaps the current frame, or bakes the snap of bone_names over the
+        frames selected by mode (keyed frames are looked up on both the
+        snapped and the source bones).
+    """
+    if mode == 'CURRENT':
+        snap()
+        return
+    obj = context.active_object
+    frames = get_snap_frames(context.scene, obj, mode, bone_names + source_names)
+    bake_snap(context, obj, snap, bone_names, frames)
 
 
 ###########################
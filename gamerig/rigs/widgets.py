@@ -1,18 +1,47 @@
 import bpy
 import importlib
-from ..utils import create_widget
+import numpy as np
+from ..utils import create_widget, shared_widget
 
 
+def build_mesh(mesh, verts, edges):
+    """ Fills an empty mesh with the given vertex coordinates, an (N, 3)
+        array, and edges, an (M, 2) array of vertex indices.
+    """
+    mesh.vertices.add(len(verts))
+    mesh.vertices.foreach_set('co', np.ascontiguousarray(verts, dtype=np.float32).ravel())
+    mesh.edges.add(len(edges))
+    mesh.edges.foreach_set('vertices', np.ascontiguousarray(edges, dtype=np.int32).ravel())
+    mesh.update()
+
+
+def shape_arrays(verts, edges):
+    """ Returns the canonical float32 vertex and int32 edge arrays of a shape.
+    """
+    return np.array(verts, dtype=np.float32), np.array(edges, dtype=np.int32)
+
+
+LINE_VERTS, LINE_EDGES = shape_arrays(((0, 0, 0), (0, 1, 0)), ((0, 1),))
+
+
+@shared_widget
 def create_line_widget(rig, bone_name, bone_transform_name=None):
     """ Creates a basic line widget, a line that spans the length of the bone.
     """
     obj = create_widget(rig, bone_name, bone_transform_name)
     if obj is not None:
-        mesh = obj.data
-        mesh.from_pydata([(0, 0, 0), (0, 1, 0)], [(0, 1)], [])
-        mesh.update()
+        build_mesh(obj.data, LINE_VERTS, LINE_EDGES)
+
 
+# Unit circle in the XZ plane
+CIRCLE_VERTS, CIRCLE_EDGES = shape_arrays(
+    ((0.7071068286895752, 0.0, -0.7071065306663513), (0.8314696550369263, 0.0, -0.5555699467658997), (0.9238795042037964, 0.0, -0.3826831877231598), (0.9807852506637573, 0.0, -0.19509011507034302), (1.0, 0.0, 1.6105803979371558e-07), (0.9807853698730469, 0.0, 0.19509044289588928), (0.9238796234130859, 0.0, 0.38268351554870605), (0.8314696550369263, 0.0, 0.5555704236030579), (0.7071068286895752, 0.0, 0.7071070075035095), (0.5555702447891235, 0.0, 0.8314698934555054), (0.38268327713012695, 0.0, 0.923879861831665), (0.19509008526802063, 0.0, 0.9807855486869812), (-3.2584136988589307e-07, 0.0, 1.000000238418579), (-0.19509072601795197, 0.0, 0.9807854294776917), (-0.3826838731765747, 0.0, 0.9238795638084412), (-0.5555707216262817, 0.0, 0.8314695358276367), (-0.7071071863174438, 0.0, 0.7071065902709961), (-0.8314700126647949, 0.0, 0.5555698871612549), (-0.923879861831665, 0.0, 0.3826829195022583), (-0.9807853698730469, 0.0, 0.1950896978378296), (-1.0, 0.0, -7.290432222362142e-07), (-0.9807850122451782, 0.0, -0.195091113448143), (-0.9238790273666382, 0.0, -0.38268423080444336), (-0.831468939781189, 0.0, -0.5555710196495056), (-0.7071058750152588, 0.0, -0.707107424736023), (-0.555569052696228, 0.0, -0.8314701318740845), (-0.38268208503723145, 0.0, -0.923879861831665), (-0.19508881866931915, 0.0, -0.9807853102684021), (1.6053570561780361e-06, 0.0, -0.9999997615814209), (0.19509197771549225, 0.0, -0.9807847142219543), (0.3826850652694702, 0.0, -0.9238786101341248), (0.5555717945098877, 0.0, -0.8314683437347412)),
+    ((0, 1), (1, 2), (2, 3), (3, 4), (4, 5), (5, 6), (6, 7), (7, 8), (8, 9), (9, 10), (10, 11), (11, 12), (12, 13), (13, 14), (14, 15), (15, 16), (16, 17), (17, 18), (18, 19), (19, 20), (20, 21), (21, 22), (22, 23), (23, 24), (24, 25), (25, 26), (26, 27), (27, 28), (28, 29), (29, 30), (30, 31), (0, 31))
+)
+CIRCLE_LINE_EDGES = np.concatenate((np.array(((28, 12),), dtype=np.int32), CIRCLE_EDGES))
 
+
+@shared_widget
 def create_circle_widget(rig, bone_name, radius=1.0, head_tail=0.0, with_line=False, bone_transform_name=None):
     """ Creates a basic circle widget, a circle around the y-axis.
         radius: the radius of the circle
@@ -20,214 +49,229 @@ def create_circle_widget(rig, bone_name, radius=1.0, head_tail=0.0, with_line=Fa
     """
     obj = create_widget(rig, bone_name, bone_transform_name)
     if obj != None:
-        v = [(0.7071068286895752, 2.980232238769531e-07, -0.7071065306663513), (0.8314696550369263, 2.980232238769531e-07, -0.5555699467658997), (0.9238795042037964, 2.682209014892578e-07, -0.3826831877231598), (0.9807852506637573, 2.5331974029541016e-07, -0.19509011507034302), (1.0, 2.365559055306221e-07, 1.6105803979371558e-07), (0.9807853698730469, 2.2351741790771484e-07, 0.19509044289588928), (0.9238796234130859, 2.086162567138672e-07, 0.38268351554870605), (0.8314696550369263, 1.7881393432617188e-07, 0.5555704236030579), (0.7071068286895752, 1.7881393432617188e-07, 0.7071070075035095), (0.5555702447891235, 1.7881393432617188e-07, 0.8314698934555054), (0.38268327713012695, 1.7881393432617188e-07, 0.923879861831665), (0.19509008526802063, 1.7881393432617188e-07, 0.9807855486869812), (-3.2584136988589307e-07, 1.1920928955078125e-07, 1.000000238418579), (-0.19509072601795197, 1.7881393432617188e-07, 0.9807854294776917), (-0.3826838731765747, 1.7881393432617188e-07, 0.9238795638084412), (-0.5555707216262817, 1.7881393432617188e-07, 0.8314695358276367), (-0.7071071863174438, 1.7881393432617188e-07, 0.7071065902709961), (-0.8314700126647949, 1.7881393432617188e-07, 0.5555698871612549), (-0.923879861831665, 2.086162567138672e-07, 0.3826829195022583), (-0.9807853698730469, 2.2351741790771484e-07, 0.1950896978378296), (-1.0, 2.365559907957504e-07, -7.290432222362142e-07), (-0.9807850122451782, 2.5331974029541016e-07, -0.195091113448143), (-0.9238790273666382, 2.682209014892578e-07, -0.38268423080444336), (-0.831468939781189, 2.980232238769531e-07, -0.5555710196495056), (-0.7071058750152588, 2.980232238769531e-07, -0.707107424736023), (-0.555569052696228, 2.980232238769531e-07, -0.8314701318740845), (-0.38268208503723145, 2.980232238769531e-07, -0.923879861831665), (-0.19508881866931915, 2.980232238769531e-07, -0.9807853102684021), (1.6053570561780361e-06, 2.980232238769531e-07, -0.9999997615814209), (0.19509197771549225, 2.980232238769531e-07, -0.9807847142219543), (0.3826850652694702, 2.980232238769531e-07, -0.9238786101341248), (0.5555717945098877, 2.980232238769531e-07, -0.8314683437347412)]
-        verts = [(a[0] * radius, head_tail, a[2] * radius) for a in v]
-        if with_line:
-            edges = [(28, 12), (0, 1), (1, 2), (2, 3), (3, 4), (4, 5), (5, 6), (6, 7), (7, 8), (8, 9), (9, 10), (10, 11), (11, 12), (12, 13), (13, 14), (14, 15), (15, 16), (16, 17), (17, 18), (18, 19), (19, 20), (20, 21), (21, 22), (22, 23), (23, 24), (24, 25), (25, 26), (26, 27), (27, 28), (28, 29), (29, 30), (30, 31), (0, 31)]
-        else:
-            edges = [(0, 1), (1, 2), (2, 3), (3, 4), (4, 5), (5, 6), (6, 7), (7, 8), (8, 9), (9, 10), (10, 11), (11, 12), (12, 13), (13, 14), (14, 15), (15, 16), (16, 17), (17, 18), (18, 19), (19, 20), (20, 21), (21, 22), (22, 23), (23, 24), (24, 25), (25, 26), (26, 27), (27, 28), (28, 29), (29, 30), (30, 31), (0, 31)]
-        mesh = obj.data
-        mesh.from_pydata(verts, edges, [])
-        mesh.update()
+        verts = CIRCLE_VERTS * radius
+        verts[:, 1] = head_tail
+        build_mesh(obj.data, verts, CIRCLE_LINE_EDGES if with_line else CIRCLE_EDGES)
         return obj
     else:
         return None
 
 
+CUBE_VERTS, CUBE_EDGES = shape_arrays(
+    ((1, 1, 1), (1, -1, 1), (-1, -1, 1), (-1, 1, 1), (1, 1, -1), (1, -1, -1), (-1, -1, -1), (-1, 1, -1)),
+    ((0, 1), (1, 2), (2, 3), (3, 0), (4, 5), (5, 6), (6, 7), (7, 4), (0, 4), (1, 5), (2, 6), (3, 7))
+)
+
+
+@shared_widget
 def create_cube_widget(rig, bone_name, radius=0.5, bone_transform_name=None):
     """ Creates a basic cube widget.
     """
     obj = create_widget(rig, bone_name, bone_transform_name)
     if obj is not None:
-        r = radius
-        verts = [(r, r, r), (r, -r, r), (-r, -r, r), (-r, r, r), (r, r, -r), (r, -r, -r), (-r, -r, -r), (-r, r, -r)]
-        edges = [(0, 1), (1, 2), (2, 3), (3, 0), (4, 5), (5, 6), (6, 7), (7, 4), (0, 4), (1, 5), (2, 6), (3, 7)]
-        mesh = obj.data
-        mesh.from_pydata(verts, edges, [])
-        mesh.update()
+        build_mesh(obj.data, CUBE_VERTS * radius, CUBE_EDGES)
+
+
+# Cube with the -Y face at half size (inverted: the +Y face)
+CHAIN_VERTS = CUBE_VERTS * np.where(CUBE_VERTS[:, 1:2] < 0, 0.5, 1.0).astype(np.float32)
+CHAIN_INVERTED_VERTS = CUBE_VERTS * np.where(CUBE_VERTS[:, 1:2] > 0, 0.5, 1.0).astype(np.float32)
 
 
+@shared_widget
 def create_chain_widget(rig, bone_name, radius=0.5, invert=False, bone_transform_name=None):
     """Creates a basic chain widget
     """
     obj = create_widget(rig, bone_name, bone_transform_name)
     if obj != None:
-        r = radius
-        rh = radius/2
-        if invert:
-            verts = [(rh, rh, rh), (r, -r, r), (-r, -r, r), (-rh, rh, rh), (rh, rh, -rh), (r, -r, -r), (-r, -r, -r), (-rh, rh, -rh)]
-        else:
-            verts = [(r, r, r), (rh, -rh, rh), (-rh, -rh, rh), (-r, r, r), (r, r, -r), (rh, -rh, -rh), (-rh, -rh, -rh), (-r, r, -r)]
-        edges = [(0, 1), (1, 2), (2, 3), (3, 0), (4, 5), (5, 6), (6, 7), (7, 4), (0, 4), (1, 5), (2, 6), (3, 7)]
-        mesh = obj.data
-        mesh.from_pydata(verts, edges, [])
-        mesh.update()
+        verts = CHAIN_INVERTED_VERTS if invert else CHAIN_VERTS
+        build_mesh(obj.data, verts * radius, CUBE_EDGES)
 
 
+SPHERE_VERTS, SPHERE_EDGES = shape_arrays(
+    ((0.3535533845424652, 0.3535533845424652, 0.0), (0.4619397521018982, 0.19134171307086945, 0.0), (0.5, -2.1855694143368964e-08, 0.0), (0.4619397521018982, -0.19134175777435303, 0.0), (0.3535533845424652, -0.3535533845424652, 0.0), (0.19134174287319183, -0.4619397521018982, 0.0), (7.549790126404332e-08, -0.5, 0.0), (-0.1913416087627411, -0.46193981170654297, 0.0), (-0.35355329513549805, -0.35355350375175476, 0.0), (-0.4619397521018982, -0.19134178757667542, 0.0), (-0.5, 5.962440319251527e-09, 0.0), (-0.4619397222995758, 0.1913418024778366, 0.0), (-0.35355326533317566, 0.35355350375175476, 0.0), (-0.19134148955345154, 0.46193987131118774, 0.0), (3.2584136988589307e-07, 0.5, 0.0), (0.1913420855998993, 0.46193960309028625, 0.0), (7.450580596923828e-08, 0.46193960309028625, 0.19134199619293213), (5.9254205098113744e-08, 0.5, 2.323586443253589e-07), (4.470348358154297e-08, 0.46193987131118774, -0.1913415789604187), (2.9802322387695312e-08, 0.35355350375175476, -0.3535533547401428), (2.9802322387695312e-08, 0.19134178757667542, -0.46193981170654297), (5.960464477539063e-08, -1.1151834122813398e-08, -0.5000000596046448), (5.960464477539063e-08, -0.1913418024778366, -0.46193984150886536), (5.960464477539063e-08, -0.35355350375175476, -0.3535533845424652), (7.450580596923828e-08, -0.46193981170654297, -0.19134166836738586), (9.348272556053416e-08, -0.5, 1.624372103492533e-08), (1.043081283569336e-07, -0.4619397521018982, 0.19134168326854706), (1.1920928955078125e-07, -0.3535533845424652, 0.35355329513549805), (1.1920928955078125e-07, -0.19134174287319183, 0.46193966269493103), (1.1920928955078125e-07, -4.7414250303745575e-09, 0.49999991059303284), (1.1920928955078125e-07, 0.19134172797203064, 0.46193966269493103), (8.940696716308594e-08, 0.3535533845424652, 0.35355329513549805), (0.3535534739494324, 0.0, 0.35355329513549805), (0.1913418173789978, -2.9802322387695312e-08, 0.46193966269493103), (8.303572940349113e-08, -5.005858838558197e-08, 0.49999991059303284), (-0.19134165346622467, -5.960464477539063e-08, 0.46193966269493103), (-0.35355329513549805, -8.940696716308594e-08, 0.35355329513549805), (-0.46193963289260864, -5.960464477539063e-08, 0.19134168326854706), (-0.49999991059303284, -5.960464477539063e-08, 1.624372103492533e-08), (-0.4619397521018982, -2.9802322387695312e-08, -0.19134166836738586), (-0.3535534143447876, -2.9802322387695312e-08, -0.3535533845424652), (-0.19134171307086945, 0.0, -0.46193984150886536), (7.662531942287387e-08, 9.546055501630235e-09, -0.5000000596046448), (0.19134187698364258, 5.960464477539063e-08, -0.46193981170654297), (0.3535535931587219, 5.960464477539063e-08, -0.3535533547401428), (0.4619399905204773, 5.960464477539063e-08, -0.1913415789604187), (0.5000000596046448, 5.960464477539063e-08, 2.323586443253589e-07), (0.4619396924972534, 2.9802322387695312e-08, 0.19134199619293213)),
+    ((0, 1), (1, 2), (2, 3), (3, 4), (4, 5), (5, 6), (6, 7), (7, 8), (8, 9), (9, 10), (10, 11), (11, 12), (12, 13), (13, 14), (14, 15), (0, 15), (16, 31), (16, 17), (17, 18), (18, 19), (19, 20), (20, 21), (21, 22), (22, 23), (23, 24), (24, 25), (25, 26), (26, 27), (27, 28), (28, 29), (29, 30), (30, 31), (32, 33), (33, 34), (34, 35), (35, 36), (36, 37), (37, 38), (38, 39), (39, 40), (40, 41), (41, 42), (42, 43), (43, 44), (44, 45), (45, 46), (46, 47), (32, 47))
+)
+
+
+@shared_widget
 def create_sphere_widget(rig, bone_name, bone_transform_name=None):
     """ Creates a basic sphere widget, three pependicular overlapping circles.
     """
     obj = create_widget(rig, bone_name, bone_transform_name)
     if obj != None:
-        verts = [(0.3535533845424652, 0.3535533845424652, 0.0), (0.4619397521018982, 0.19134171307086945, 0.0), (0.5, -2.1855694143368964e-08, 0.0), (0.4619397521018982, -0.19134175777435303, 0.0), (0.3535533845424652, -0.3535533845424652, 0.0), (0.19134174287319183, -0.4619397521018982, 0.0), (7.549790126404332e-08, -0.5, 0.0), (-0.1913416087627411, -0.46193981170654297, 0.0), (-0.35355329513549805, -0.35355350375175476, 0.0), (-0.4619397521018982, -0.19134178757667542, 0.0), (-0.5, 5.962440319251527e-09, 0.0), (-0.4619397222995758, 0.1913418024778366, 0.0), (-0.35355326533317566, 0.35355350375175476, 0.0), (-0.19134148955345154, 0.46193987131118774, 0.0), (3.2584136988589307e-07, 0.5, 0.0), (0.1913420855998993, 0.46193960309028625, 0.0), (7.450580596923828e-08, 0.46193960309028625, 0.19134199619293213), (5.9254205098113744e-08, 0.5, 2.323586443253589e-07), (4.470348358154297e-08, 0.46193987131118774, -0.1913415789604187), (2.9802322387695312e-08, 0.35355350375175476, -0.3535533547401428), (2.9802322387695312e-08, 0.19134178757667542, -0.46193981170654297), (5.960464477539063e-08, -1.1151834122813398e-08, -0.5000000596046448), (5.960464477539063e-08, -0.1913418024778366, -0.46193984150886536), (5.960464477539063e-08, -0.35355350375175476, -0.3535533845424652), (7.450580596923828e-08, -0.46193981170654297, -0.19134166836738586), (9.348272556053416e-08, -0.5, 1.624372103492533e-08), (1.043081283569336e-07, -0.4619397521018982, 0.19134168326854706), (1.1920928955078125e-07, -0.3535533845424652, 0.35355329513549805), (1.1920928955078125e-07, -0.19134174287319183, 0.46193966269493103), (1.1920928955078125e-07, -4.7414250303745575e-09, 0.49999991059303284), (1.1920928955078125e-07, 0.19134172797203064, 0.46193966269493103), (8.940696716308594e-08, 0.3535533845424652, 0.35355329513549805), (0.3535534739494324, 0.0, 0.35355329513549805), (0.1913418173789978, -2.9802322387695312e-08, 0.46193966269493103), (8.303572940349113e-08, -5.005858838558197e-08, 0.49999991059303284), (-0.19134165346622467, -5.960464477539063e-08, 0.46193966269493103), (-0.35355329513549805, -8.940696716308594e-08, 0.35355329513549805), (-0.46193963289260864, -5.960464477539063e-08, 0.19134168326854706), (-0.49999991059303284, -5.960464477539063e-08, 1.624372103492533e-08), (-0.4619397521018982, -2.9802322387695312e-08, -0.19134166836738586), (-0.3535534143447876, -2.9802322387695312e-08, -0.3535533845424652), (-0.19134171307086945, 0.0, -0.46193984150886536), (7.662531942287387e-08, 9.546055501630235e-09, -0.5000000596046448), (0.19134187698364258, 5.960464477539063e-08, -0.46193981170654297), (0.3535535931587219, 5.960464477539063e-08, -0.3535533547401428), (0.4619399905204773, 5.960464477539063e-08, -0.1913415789604187), (0.5000000596046448, 5.960464477539063e-08, 2.323586443253589e-07), (0.4619396924972534, 2.9802322387695312e-08, 0.19134199619293213)]
-        edges = [(0, 1), (1, 2), (2, 3), (3, 4), (4, 5), (5, 6), (6, 7), (7, 8), (8, 9), (9, 10), (10, 11), (11, 12), (12, 13), (13, 14), (14, 15), (0, 15), (16, 31), (16, 17), (17, 18), (18, 19), (19, 20), (20, 21), (21, 22), (22, 23), (23, 24), (24, 25), (25, 26), (26, 27), (27, 28), (28, 29), (29, 30), (30, 31), (32, 33), (33, 34), (34, 35), (35, 36), (36, 37), (37, 38), (38, 39), (39, 40), (40, 41), (41, 42), (42, 43), (43, 44), (44, 45), (45, 46), (46, 47), (32, 47)]
-        mesh = obj.data
-        mesh.from_pydata(verts, edges, [])
-        mesh.update()
+        build_mesh(obj.data, SPHERE_VERTS, SPHERE_EDGES)
+
+
+LIMB_VERTS, LIMB_EDGES = shape_arrays(
+    ((0.0, 0.0, 0.0), (0.0, 1.0, 0.0), (0.17678, 0.5, 0.17678), (0.20787, 0.5, 0.13889), (0.23097, 0.5, 0.095671), (0.2452, 0.5, 0.048773), (0.25, 0.5, -2.5459e-09), (0.2452, 0.5, -0.048773), (0.23097, 0.5, -0.095671), (0.20787, 0.5, -0.13889), (0.17678, 0.5, -0.17678), (0.13889, 0.5, -0.20787), (0.095671, 0.5, -0.23097), (0.048773, 0.5, -0.2452), (1.7279e-07, 0.5, -0.25), (-0.048772, 0.5, -0.2452), (-0.095671, 0.5, -0.23097), (-0.13889, 0.5, -0.20787), (-0.17678, 0.5, -0.17678), (-0.20787, 0.5, -0.13889), (-0.23097, 0.5, -0.095671), (-0.2452, 0.5, -0.048772), (-0.25, 0.5, 2.1998e-07), (-0.2452, 0.5, 0.048773), (-0.23097, 0.5, 0.095671), (-0.20787, 0.5, 0.13889), (-0.17678, 0.5, 0.17678), (-0.13889, 0.5, 0.20787), (-0.09567, 0.5, 0.23097), (-0.048772, 0.5, 0.2452), (6.5559e-07, 0.5, 0.25), (0.048773, 0.5, 0.2452), (0.095672, 0.5, 0.23097), (0.13889, 0.5, 0.20787), (-0.04, 0.5, -0.26), (0.04, 0.5, -0.26), (0.0, 0.5, -0.3)),
+    ((0, 1), (2, 3), (4, 3), (5, 4), (5, 6), (6, 7), (8, 7), (8, 9), (10, 9), (10, 11), (11, 12), (13, 12), (14, 13), (14, 15), (16, 15), (16, 17), (17, 18), (19, 18), (19, 20), (21, 20), (21, 22), (22, 23), (24, 23), (25, 24), (25, 26), (27, 26), (27, 28), (29, 28), (29, 30), (30, 31), (32, 31), (32, 33), (2, 33), (34, 35), (35, 36), (36, 34))
+)
 
 
+@shared_widget
 def create_limb_widget(rig, bone_name, bone_transform_name=None):
     """ Creates a basic limb widget, a line that spans the length of the
         bone, with a circle around the center.
     """
     obj = create_widget(rig, bone_name, bone_transform_name)
     if obj != None:
-        verts = [(0.0, 0.0, 0.0), (0.0, 1.0, 0.0), (0.17678, 0.5, 0.17678), (0.20787, 0.5, 0.13889), (0.23097, 0.5, 0.095671), (0.2452, 0.5, 0.048773), (0.25, 0.5, -2.5459e-09), (0.2452, 0.5, -0.048773), (0.23097, 0.5, -0.095671), (0.20787, 0.5, -0.13889), (0.17678, 0.5, -0.17678), (0.13889, 0.5, -0.20787), (0.095671, 0.5, -0.23097), (0.048773, 0.5, -0.2452), (1.7279e-07, 0.5, -0.25), (-0.048772, 0.5, -0.2452), (-0.095671, 0.5, -0.23097), (-0.13889, 0.5, -0.20787), (-0.17678, 0.5, -0.17678), (-0.20787, 0.5, -0.13889), (-0.23097, 0.5, -0.095671), (-0.2452, 0.5, -0.048772), (-0.25, 0.5, 2.1998e-07), (-0.2452, 0.5, 0.048773), (-0.23097, 0.5, 0.095671), (-0.20787, 0.5, 0.13889), (-0.17678, 0.5, 0.17678), (-0.13889, 0.5, 0.20787), (-0.09567, 0.5, 0.23097), (-0.048772, 0.5, 0.2452), (6.5559e-07, 0.5, 0.25), (0.048773, 0.5, 0.2452), (0.095672, 0.5, 0.23097), (0.13889, 0.5, 0.20787), (-0.04, 0.5, -0.26), (0.04, 0.5, -0.26), (0.0, 0.5, -0.3), ]
-        edges = [(0, 1), (2, 3), (4, 3), (5, 4), (5, 6), (6, 7), (8, 7), (8, 9), (10, 9), (10, 11), (11, 12), (13, 12), (14, 13), (14, 15), (16, 15), (16, 17), (17, 18), (19, 18), (19, 20), (21, 20), (21, 22), (22, 23), (24, 23), (25, 24), (25, 26), (27, 26), (27, 28), (29, 28), (29, 30), (30, 31), (32, 31), (32, 33), (2, 33), (34, 35), (35, 36), (36, 34), ]
-        mesh = obj.data
-        mesh.from_pydata(verts, edges, [])
-        mesh.update()
+        build_mesh(obj.data, LIMB_VERTS, LIMB_EDGES)
 
 
+BONE_VERTS, BONE_EDGES = shape_arrays(
+    ((0.04, 1.0, -0.04), (0.1, 0.0, -0.1), (-0.1, 0.0, -0.1), (-0.04, 1.0, -0.04), (0.04, 1.0, 0.04), (0.1, 0.0, 0.1), (-0.1, 0.0, 0.1), (-0.04, 1.0, 0.04)),
+    ((1, 2), (0, 1), (0, 3), (2, 3), (4, 5), (5, 6), (6, 7), (4, 7), (1, 5), (0, 4), (2, 6), (3, 7))
+)
+
+
+@shared_widget
 def create_bone_widget(rig, bone_name, bone_transform_name=None):
     """ Creates a basic bone widget, a simple obolisk-esk shape.
     """
     obj = create_widget(rig, bone_name, bone_transform_name)
     if obj != None:
-        verts = [(0.04, 1.0, -0.04), (0.1, 0.0, -0.1), (-0.1, 0.0, -0.1), (-0.04, 1.0, -0.04), (0.04, 1.0, 0.04), (0.1, 0.0, 0.1), (-0.1, 0.0, 0.1), (-0.04, 1.0, 0.04)]
-        edges = [(1, 2), (0, 1), (0, 3), (2, 3), (4, 5), (5, 6), (6, 7), (4, 7), (1, 5), (0, 4), (2, 6), (3, 7)]
-        mesh = obj.data
-        mesh.from_pydata(verts, edges, [])
-        mesh.update()
+        build_mesh(obj.data, BONE_VERTS, BONE_EDGES)
+
 
+COMPASS_VERTS, COMPASS_EDGES = shape_arrays(
+    ((0.0, 1.2000000476837158, 0.0), (0.19509032368659973, 0.9807852506637573, 0.0), (0.3826834559440613, 0.9238795042037964, 0.0), (0.5555702447891235, 0.8314695954322815, 0.0), (0.7071067690849304, 0.7071067690849304, 0.0), (0.8314696550369263, 0.5555701851844788, 0.0), (0.9238795042037964, 0.3826834261417389, 0.0), (0.9807852506637573, 0.19509035348892212, 0.0), (1.2000000476837158, 7.549790126404332e-08, 0.0), (0.9807853102684021, -0.19509020447731018, 0.0), (0.9238795638084412, -0.38268327713012695, 0.0), (0.8314696550369263, -0.5555701851844788, 0.0), (0.7071067690849304, -0.7071067690849304, 0.0), (0.5555701851844788, -0.8314696550369263, 0.0), (0.38268327713012695, -0.9238796234130859, 0.0), (0.19509008526802063, -0.9807853102684021, 0.0), (-3.2584136988589307e-07, -1.2999999523162842, 0.0), (-0.19509072601795197, -0.9807851910591125, 0.0), (-0.3826838731765747, -0.9238793253898621, 0.0), (-0.5555707216262817, -0.8314692974090576, 0.0), (-0.7071072459220886, -0.707106351852417, 0.0), (-0.8314700126647949, -0.5555696487426758, 0.0), (-0.923879861831665, -0.3826826810836792, 0.0), (-0.9807854294776917, -0.1950894594192505, 0.0), (-1.2000000476837158, 9.655991561885457e-07, 0.0), (-0.980785071849823, 0.1950913518667221, 0.0), (-0.923879086971283, 0.38268446922302246, 0.0), (-0.831468939781189, 0.5555712580680847, 0.0), (-0.7071058750152588, 0.707107663154602, 0.0), (-0.5555691123008728, 0.8314703702926636, 0.0), (-0.38268208503723145, 0.9238801002502441, 0.0), (-0.19508881866931915, 0.9807855486869812, 0.0)),
+    ((0, 1), (1, 2), (2, 3), (3, 4), (4, 5), (5, 6), (6, 7), (7, 8), (8, 9), (9, 10), (10, 11), (11, 12), (12, 13), (13, 14), (14, 15), (15, 16), (16, 17), (17, 18), (18, 19), (19, 20), (20, 21), (21, 22), (22, 23), (23, 24), (24, 25), (25, 26), (26, 27), (27, 28), (28, 29), (29, 30), (30, 31), (0, 31))
+)
 
+
+@shared_widget
 def create_compass_widget(rig, bone_name, bone_transform_name=None):
     """ Creates a compass-shaped widget.
     """
     obj = create_widget(rig, bone_name, bone_transform_name)
     if obj != None:
-        verts = [(0.0, 1.2000000476837158, 0.0), (0.19509032368659973, 0.9807852506637573, 0.0), (0.3826834559440613, 0.9238795042037964, 0.0), (0.5555702447891235, 0.8314695954322815, 0.0), (0.7071067690849304, 0.7071067690849304, 0.0), (0.8314696550369263, 0.5555701851844788, 0.0), (0.9238795042037964, 0.3826834261417389, 0.0), (0.9807852506637573, 0.19509035348892212, 0.0), (1.2000000476837158, 7.549790126404332e-08, 0.0), (0.9807853102684021, -0.19509020447731018, 0.0), (0.9238795638084412, -0.38268327713012695, 0.0), (0.8314696550369263, -0.5555701851844788, 0.0), (0.7071067690849304, -0.7071067690849304, 0.0), (0.5555701851844788, -0.8314696550369263, 0.0), (0.38268327713012695, -0.9238796234130859, 0.0), (0.19509008526802063, -0.9807853102684021, 0.0), (-3.2584136988589307e-07, -1.2999999523162842, 0.0), (-0.19509072601795197, -0.9807851910591125, 0.0), (-0.3826838731765747, -0.9238793253898621, 0.0), (-0.5555707216262817, -0.8314692974090576, 0.0), (-0.7071072459220886, -0.707106351852417, 0.0), (-0.8314700126647949, -0.5555696487426758, 0.0), (-0.923879861831665, -0.3826826810836792, 0.0), (-0.9807854294776917, -0.1950894594192505, 0.0), (-1.2000000476837158, 9.655991561885457e-07, 0.0), (-0.980785071849823, 0.1950913518667221, 0.0), (-0.923879086971283, 0.38268446922302246, 0.0), (-0.831468939781189, 0.5555712580680847, 0.0), (-0.7071058750152588, 0.707107663154602, 0.0), (-0.5555691123008728, 0.8314703702926636, 0.0), (-0.38268208503723145, 0.9238801002502441, 0.0), (-0.19508881866931915, 0.9807855486869812, 0.0)]
-        edges = [(0, 1), (1, 2), (2, 3), (3, 4), (4, 5), (5, 6), (6, 7), (7, 8), (8, 9), (9, 10), (10, 11), (11, 12), (12, 13), (13, 14), (14, 15), (15, 16), (16, 17), (17, 18), (18, 19), (19, 20), (20, 21), (21, 22), (22, 23), (23, 24), (24, 25), (25, 26), (26, 27), (27, 28), (28, 29), (29, 30), (30, 31), (0, 31)]
-        mesh = obj.data
-        mesh.from_pydata(verts, edges, [])
-        mesh.update()
+        build_mesh(obj.data, COMPASS_VERTS, COMPASS_EDGES)
+
 
+EYE_VERTS, EYE_EDGES = shape_arrays(
+    ((1.1920928955078125e-07, 0.5000000596046448, 0.0), (-0.12940943241119385, 0.482962965965271, 0.0), (-0.24999988079071045, 0.4330127537250519, 0.0), (-0.35355329513549805, 0.35355344414711, 0.0), (-0.43301260471343994, 0.2500000596046448, 0.0), (-0.4829627275466919, 0.12940959632396698, 0.0), (-0.49999988079071045, 1.0094120739267964e-07, 0.0), (-0.482962965965271, -0.12940940260887146, 0.0), (-0.43301260471343994, -0.24999986588954926, 0.0), (-0.3535534143447876, -0.35355323553085327, 0.0), (-0.25, -0.43301257491111755, 0.0), (-0.1294095516204834, -0.48296281695365906, 0.0), (-1.1920928955078125e-07, -0.4999999403953552, 0.0), (0.12940943241119385, -0.4829629063606262, 0.0), (0.24999988079071045, -0.4330127537250519, 0.0), (0.35355329513549805, -0.35355353355407715, 0.0), (0.4330127239227295, -0.25000008940696716, 0.0), (0.482962965965271, -0.12940965592861176, 0.0), (0.5000001192092896, -1.6926388468618825e-07, 0.0), (0.48296308517456055, 0.1294093281030655, 0.0), (0.4330129623413086, 0.24999980628490448, 0.0), (0.35355377197265625, 0.35355323553085327, 0.0), (0.25000035762786865, 0.43301260471343994, 0.0), (0.1294100284576416, 0.48296287655830383, 0.0)),
+    ((1, 0), (2, 1), (3, 2), (4, 3), (5, 4), (6, 5), (7, 6), (8, 7), (9, 8), (10, 9), (11, 10), (12, 11), (13, 12), (14, 13), (15, 14), (16, 15), (17, 16), (18, 17), (19, 18), (20, 19), (21, 20), (22, 21), (23, 22), (0, 23))
+)
 
+
+@shared_widget
 def create_eye_widget(rig, bone_name, size=1.0, bone_transform_name=None):
     obj = create_widget(rig, bone_name, bone_transform_name)
     if obj is not None:
-        verts = [(1.1920928955078125e-07*size, 0.5000000596046448*size, 0.0*size), (-0.12940943241119385*size, 0.482962965965271*size, 0.0*size), (-0.24999988079071045*size, 0.4330127537250519*size, 0.0*size), (-0.35355329513549805*size, 0.35355344414711*size, 0.0*size), (-0.43301260471343994*size, 0.2500000596046448*size, 0.0*size), (-0.4829627275466919*size, 0.12940959632396698*size, 0.0*size), (-0.49999988079071045*size, 1.0094120739267964e-07*size, 0.0*size), (-0.482962965965271*size, -0.12940940260887146*size, 0.0*size), (-0.43301260471343994*size, -0.24999986588954926*size, 0.0*size), (-0.3535534143447876*size, -0.35355323553085327*size, 0.0*size), (-0.25*size, -0.43301257491111755*size, 0.0*size), (-0.1294095516204834*size, -0.48296281695365906*size, 0.0*size), (-1.1920928955078125e-07*size, -0.4999999403953552*size, 0.0*size), (0.12940943241119385*size, -0.4829629063606262*size, 0.0*size), (0.24999988079071045*size, -0.4330127537250519*size, 0.0*size), (0.35355329513549805*size, -0.35355353355407715*size, 0.0*size), (0.4330127239227295*size, -0.25000008940696716*size, 0.0*size), (0.482962965965271*size, -0.12940965592861176*size, 0.0*size), (0.5000001192092896*size, -1.6926388468618825e-07*size, 0.0*size), (0.48296308517456055*size, 0.1294093281030655*size, 0.0*size), (0.4330129623413086*size, 0.24999980628490448*size, 0.0*size), (0.35355377197265625*size, 0.35355323553085327*size, 0.0*size), (0.25000035762786865*size, 0.43301260471343994*size, 0.0*size), (0.1294100284576416*size, 0.48296287655830383*size, 0.0*size), ]
-        edges = [(1, 0), (2, 1), (3, 2), (4, 3), (5, 4), (6, 5), (7, 6), (8, 7), (9, 8), (10, 9), (11, 10), (12, 11), (13, 12), (14, 13), (15, 14), (16, 15), (17, 16), (18, 17), (19, 18), (20, 19), (21, 20), (22, 21), (23, 22), (0, 23), ]
-        faces = []
-
-        mesh = obj.data
-        mesh.from_pydata(verts, edges, faces)
-        mesh.update()
+        build_mesh(obj.data, EYE_VERTS * size, EYE_EDGES)
         return obj
     else:
         return None
 
 
+EYES_VERTS, EYES_EDGES = shape_arrays(
+    ((0.8928930759429932, -0.7071065902709961, 0.0), (0.8928932547569275, 0.7071067690849304, 0.0), (-1.8588197231292725, -0.9659252762794495, 0.0), (-2.100001096725464, -0.8660248517990112, 0.0), (-2.3071072101593018, -0.7071059942245483, 0.0), (-2.4660258293151855, -0.49999913573265076, 0.0), (-2.5659260749816895, -0.258818119764328, 0.0), (-2.5999999046325684, 8.575012770961621e-07, 0.0), (-2.5659255981445312, 0.2588198482990265, 0.0), (-2.4660253524780273, 0.5000006556510925, 0.0), (-2.3071064949035645, 0.7071075439453125, 0.0), (-2.099999189376831, 0.866025984287262, 0.0), (-1.8588184118270874, 0.9659261703491211, 0.0), (-1.5999996662139893, 1.000000238418579, 0.0), (-1.341180443763733, 0.9659258723258972, 0.0), (-1.0999995470046997, 0.8660253882408142, 0.0), (-0.8928929567337036, 0.7071067094802856, 0.0), (-0.892893373966217, -0.7071066498756409, 0.0), (-1.100000262260437, -0.8660252690315247, 0.0), (-1.3411810398101807, -0.9659255743026733, 0.0), (1.600000023841858, 1.0, 0.0), (1.3411810398101807, 0.9659258127212524, 0.0), (1.100000023841858, 0.8660253882408142, 0.0), (-1.600000262260437, -0.9999997615814209, 0.0), (1.0999997854232788, -0.8660252690315247, 0.0), (1.341180682182312, -0.9659257531166077, 0.0), (1.5999996662139893, -1.0, 0.0), (1.8588186502456665, -0.965925931930542, 0.0), (2.0999996662139893, -0.8660256266593933, 0.0), (2.3071064949035645, -0.7071071863174438, 0.0), (2.4660253524780273, -0.5000002980232239, 0.0), (2.5659255981445312, -0.25881943106651306, 0.0), (2.5999999046325684, -4.649122899991198e-07, 0.0), (2.5659260749816895, 0.25881853699684143, 0.0), (2.4660258293151855, 0.4999994933605194, 0.0), (2.3071072101593018, 0.707106351852417, 0.0), (2.1000006198883057, 0.8660250902175903, 0.0), (1.8588197231292725, 0.9659256339073181, 0.0), (-1.8070557117462158, -0.7727401852607727, 0.0), (-2.0000009536743164, -0.6928198337554932, 0.0), (-2.1656856536865234, -0.5656847357749939, 0.0), (-2.292820692062378, -0.3999992609024048, 0.0), (-2.3727407455444336, -0.20705445110797882, 0.0), (-2.3999998569488525, 7.336847716032935e-07, 0.0), (-2.3727405071258545, 0.207055926322937, 0.0), (-2.2928202152252197, 0.40000057220458984, 0.0), (-2.1656851768493652, 0.5656861066818237, 0.0), (-1.9999992847442627, 0.6928208470344543, 0.0), (-1.8070547580718994, 0.7727410197257996, 0.0), (-1.5999996662139893, 0.8000002503395081, 0.0), (-1.3929443359375, 0.7727407813072205, 0.0), (-1.1999995708465576, 0.6928203701972961, 0.0), (-1.0343143939971924, 0.5656854510307312, 0.0), (-1.0343146324157715, -0.5656852722167969, 0.0), (-1.2000001668930054, -0.6928201913833618, 0.0), (-1.3929448127746582, -0.7727404236793518, 0.0), (-1.6000001430511475, -0.7999997735023499, 0.0), (1.8070557117462158, 0.772739827632904, 0.0), (2.0000009536743164, 0.6928195953369141, 0.0), (2.1656856536865234, 0.5656843781471252, 0.0), (2.292820692062378, 0.39999890327453613, 0.0), (2.3727407455444336, 0.20705409348011017, 0.0), (2.3999998569488525, -1.0960745839838637e-06, 0.0), (2.3727405071258545, -0.20705628395080566, 0.0), (2.2928202152252197, -0.4000009298324585, 0.0), (2.1656851768493652, -0.5656863451004028, 0.0), (1.9999992847442627, -0.692821204662323, 0.0), (1.8070547580718994, -0.7727413773536682, 0.0), (1.5999996662139893, -0.8000004887580872, 0.0), (1.3929443359375, -0.7727410197257996, 0.0), (1.1999995708465576, -0.6928204894065857, 0.0), (1.0343143939971924, -0.5656855702400208, 0.0), (1.0343146324157715, 0.5656850337982178, 0.0), (1.2000004053115845, 0.6928199529647827, 0.0), (1.3929448127746582, 0.7727401852607727, 0.0), (1.6000001430511475, 0.7999995350837708, 0.0)),
+    ((24, 0), (1, 22), (16, 1), (17, 0), (23, 2), (2, 3), (3, 4), (4, 5), (5, 6), (6, 7), (7, 8), (8, 9), (9, 10), (10, 11), (11, 12), (12, 13), (21, 20), (22, 21), (13, 14), (14, 15), (15, 16), (17, 18), (18, 19), (19, 23), (25, 24), (26, 25), (27, 26), (28, 27), (29, 28), (30, 29), (31, 30), (32, 31), (33, 32), (34, 33), (35, 34), (36, 35), (37, 36), (20, 37), (56, 38), (38, 39), (39, 40), (40, 41), (41, 42), (42, 43), (43, 44), (44, 45), (45, 46), (46, 47), (47, 48), (48, 49), (49, 50), (50, 51), (51, 52), (53, 54), (54, 55), (55, 56), (75, 57), (57, 58), (58, 59), (59, 60), (60, 61), (61, 62), (62, 63), (63, 64), (64, 65), (65, 66), (66, 67), (67, 68), (68, 69), (69, 70), (70, 71), (72, 73), (73, 74), (74, 75), (52, 72), (53, 71))
+)
+
+
+@shared_widget
 def create_eyes_widget(rig, bone_name, size=1.0, bone_transform_name=None):
     obj = create_widget(rig, bone_name, bone_transform_name)
     if obj is not None:
-        verts = [(0.8928930759429932*size, -0.7071065902709961*size, 0.0*size), (0.8928932547569275*size, 0.7071067690849304*size, 0.0*size), (-1.8588197231292725*size, -0.9659252762794495*size, 0.0*size), (-2.100001096725464*size, -0.8660248517990112*size, 0.0*size), (-2.3071072101593018*size, -0.7071059942245483*size, 0.0*size), (-2.4660258293151855*size, -0.49999913573265076*size, 0.0*size), (-2.5659260749816895*size, -0.258818119764328*size, 0.0*size), (-2.5999999046325684*size, 8.575012770961621e-07*size, 0.0*size), (-2.5659255981445312*size, 0.2588198482990265*size, 0.0*size), (-2.4660253524780273*size, 0.5000006556510925*size, 0.0*size), (-2.3071064949035645*size, 0.7071075439453125*size, 0.0*size), (-2.099999189376831*size, 0.866025984287262*size, 0.0*size), (-1.8588184118270874*size, 0.9659261703491211*size, 0.0*size), (-1.5999996662139893*size, 1.000000238418579*size, 0.0*size), (-1.341180443763733*size, 0.9659258723258972*size, 0.0*size), (-1.0999995470046997*size, 0.8660253882408142*size, 0.0*size), (-0.8928929567337036*size, 0.7071067094802856*size, 0.0*size), (-0.892893373966217*size, -0.7071066498756409*size, 0.0*size), (-1.100000262260437*size, -0.8660252690315247*size, 0.0*size), (-1.3411810398101807*size, -0.9659255743026733*size, 0.0*size), (1.600000023841858*size, 1.0*size, 0.0*size), (1.3411810398101807*size, 0.9659258127212524*size, 0.0*size), (1.100000023841858*size, 0.8660253882408142*size, 0.0*size), (-1.600000262260437*size, -0.9999997615814209*size, 0.0*size), (1.0999997854232788*size, -0.8660252690315247*size, 0.0*size), (1.341180682182312*size, -0.9659257531166077*size, 0.0*size), (1.5999996662139893*size, -1.0*size, 0.0*size), (1.8588186502456665*size, -0.965925931930542*size, 0.0*size), (2.0999996662139893*size, -0.8660256266593933*size, 0.0*size), (2.3071064949035645*size, -0.7071071863174438*size, 0.0*size), (2.4660253524780273*size, -0.5000002980232239*size, 0.0*size), (2.5659255981445312*size, -0.25881943106651306*size, 0.0*size), (2.5999999046325684*size, -4.649122899991198e-07*size, 0.0*size), (2.5659260749816895*size, 0.25881853699684143*size, 0.0*size), (2.4660258293151855*size, 0.4999994933605194*size, 0.0*size), (2.3071072101593018*size, 0.707106351852417*size, 0.0*size), (2.1000006198883057*size, 0.8660250902175903*size, 0.0*size), (1.8588197231292725*size, 0.9659256339073181*size, 0.0*size), (-1.8070557117462158*size, -0.7727401852607727*size, 0.0*size), (-2.0000009536743164*size, -0.6928198337554932*size, 0.0*size), (-2.1656856536865234*size, -0.5656847357749939*size, 0.0*size), (-2.292820692062378*size, -0.3999992609024048*size, 0.0*size), (-2.3727407455444336*size, -0.20705445110797882*size, 0.0*size), (-2.3999998569488525*size, 7.336847716032935e-07*size, 0.0*size), (-2.3727405071258545*size, 0.207055926322937*size, 0.0*size), (-2.2928202152252197*size, 0.40000057220458984*size, 0.0*size), (-2.1656851768493652*size, 0.5656861066818237*size, 0.0*size), (-1.9999992847442627*size, 0.6928208470344543*size, 0.0*size), (-1.8070547580718994*size, 0.7727410197257996*size, 0.0*size), (-1.5999996662139893*size, 0.8000002503395081*size, 0.0*size), (-1.3929443359375*size, 0.7727407813072205*size, 0.0*size), (-1.1999995708465576*size, 0.6928203701972961*size, 0.0*size), (-1.0343143939971924*size, 0.5656854510307312*size, 0.0*size), (-1.0343146324157715*size, -0.5656852722167969*size, 0.0*size), (-1.2000001668930054*size, -0.6928201913833618*size, 0.0*size), (-1.3929448127746582*size, -0.7727404236793518*size, 0.0*size), (-1.6000001430511475*size, -0.7999997735023499*size, 0.0*size), (1.8070557117462158*size, 0.772739827632904*size, 0.0*size), (2.0000009536743164*size, 0.6928195953369141*size, 0.0*size), (2.1656856536865234*size, 0.5656843781471252*size, 0.0*size), (2.292820692062378*size, 0.39999890327453613*size, 0.0*size), (2.3727407455444336*size, 0.20705409348011017*size, 0.0*size), (2.3999998569488525*size, -1.0960745839838637e-06*size, 0.0*size), (2.3727405071258545*size, -0.20705628395080566*size, 0.0*size), (2.2928202152252197*size, -0.4000009298324585*size, 0.0*size), (2.1656851768493652*size, -0.5656863451004028*size, 0.0*size), (1.9999992847442627*size, -0.692821204662323*size, 0.0*size), (1.8070547580718994*size, -0.7727413773536682*size, 0.0*size), (1.5999996662139893*size, -0.8000004887580872*size, 0.0*size), (1.3929443359375*size, -0.7727410197257996*size, 0.0*size), (1.1999995708465576*size, -0.6928204894065857*size, 0.0*size), (1.0343143939971924*size, -0.5656855702400208*size, 0.0*size), (1.0343146324157715*size, 0.5656850337982178*size, 0.0*size), (1.2000004053115845*size, 0.6928199529647827*size, 0.0*size), (1.3929448127746582*size, 0.7727401852607727*size, 0.0*size), (1.6000001430511475*size, 0.7999995350837708*size, 0.0*size), ]
-        edges = [(24, 0), (1, 22), (16, 1), (17, 0), (23, 2), (2, 3), (3, 4), (4, 5), (5, 6), (6, 7), (7, 8), (8, 9), (9, 10), (10, 11), (11, 12), (12, 13), (21, 20), (22, 21), (13, 14), (14, 15), (15, 16), (17, 18), (18, 19), (19, 23), (25, 24), (26, 25), (27, 26), (28, 27), (29, 28), (30, 29), (31, 30), (32, 31), (33, 32), (34, 33), (35, 34), (36, 35), (37, 36), (20, 37), (56, 38), (38, 39), (39, 40), (40, 41), (41, 42), (42, 43), (43, 44), (44, 45), (45, 46), (46, 47), (47, 48), (48, 49), (49, 50), (50, 51), (51, 52), (53, 54), (54, 55), (55, 56), (75, 57), (57, 58), (58, 59), (59, 60), (60, 61), (61, 62), (62, 63), (63, 64), (64, 65), (65, 66), (66, 67), (67, 68), (68, 69), (69, 70), (70, 71), (72, 73), (73, 74), (74, 75), (52, 72), (53, 71), ]
-        faces = []
-
-        mesh = obj.data
-        mesh.from_pydata(verts, edges, faces)
-        mesh.update()
+        build_mesh(obj.data, EYES_VERTS * size, EYES_EDGES)
         return obj
     else:
         return None
 
 
+EAR_VERTS, EAR_EDGES = shape_arrays(
+    ((-2.4903741291382175e-09, 1.0, -3.123863123732917e-08), (-7.450580596923828e-09, 0.9829629063606262, 0.0776456817984581), (-1.4901161193847656e-08, 0.9330127239227295, 0.1499999761581421), (-2.9802322387695312e-08, 0.8535534143447876, 0.2121320217847824), (-2.9802322387695312e-08, 0.75, 0.25980761647224426), (-2.9802322387695312e-08, 0.6294095516204834, 0.2897777259349823), (-2.9802322387695312e-08, 0.5000000596046448, 0.29999998211860657), (-5.960464477539063e-08, 0.37059056758880615, 0.2897777855396271), (-5.960464477539063e-08, 0.25000008940696716, 0.25980767607688904), (-4.470348358154297e-08, 0.14644670486450195, 0.21213211119174957), (-4.470348358154297e-08, 0.06698736548423767, 0.15000009536743164), (-4.470348358154297e-08, 0.017037123441696167, 0.07764581590890884), (-3.6718930118695425e-08, 0.0, 1.1981423142515268e-07), (-2.9802322387695312e-08, 0.017037034034729004, -0.07764559239149094), (-2.9802322387695312e-08, 0.06698718667030334, -0.14999987185001373), (-1.4901161193847656e-08, 0.14644640684127808, -0.21213191747665405), (0.0, 0.24999985098838806, -0.25980761647224426), (0.0, 0.3705902695655823, -0.2897777259349823), (0.0, 0.4999997615814209, -0.30000004172325134), (0.0, 0.6294092535972595, -0.2897777855396271), (0.0, 0.7499997615814209, -0.2598077356815338), (1.4901161193847656e-08, 0.8535531759262085, -0.21213220059871674), (0.0, 0.9330125451087952, -0.15000019967556), (0.0, 0.9829628467559814, -0.07764596492052078)),
+    ((1, 0), (2, 1), (3, 2), (4, 3), (5, 4), (6, 5), (7, 6), (8, 7), (9, 8), (10, 9), (11, 10), (12, 11), (13, 12), (14, 13), (15, 14), (16, 15), (17, 16), (18, 17), (19, 18), (20, 19), (21, 20), (22, 21), (23, 22), (0, 23))
+)
+
+
+@shared_widget
 def create_ear_widget(rig, bone_name, size=1.0, bone_transform_name=None):
     obj = create_widget(rig, bone_name, bone_transform_name)
     if obj is not None:
-        verts = [(-2.4903741291382175e-09*size, 1.0*size, -3.123863123732917e-08*size), (-7.450580596923828e-09*size, 0.9829629063606262*size, 0.0776456817984581*size), (-1.4901161193847656e-08*size, 0.9330127239227295*size, 0.1499999761581421*size), (-2.9802322387695312e-08*size, 0.8535534143447876*size, 0.2121320217847824*size), (-2.9802322387695312e-08*size, 0.75*size, 0.25980761647224426*size), (-2.9802322387695312e-08*size, 0.6294095516204834*size, 0.2897777259349823*size), (-2.9802322387695312e-08*size, 0.5000000596046448*size, 0.29999998211860657*size), (-5.960464477539063e-08*size, 0.37059056758880615*size, 0.2897777855396271*size), (-5.960464477539063e-08*size, 0.25000008940696716*size, 0.25980767607688904*size), (-4.470348358154297e-08*size, 0.14644670486450195*size, 0.21213211119174957*size), (-4.470348358154297e-08*size, 0.06698736548423767*size, 0.15000009536743164*size), (-4.470348358154297e-08*size, 0.017037123441696167*size, 0.07764581590890884*size), (-3.6718930118695425e-08*size, 0.0*size, 1.1981423142515268e-07*size), (-2.9802322387695312e-08*size, 0.017037034034729004*size, -0.07764559239149094*size), (-2.9802322387695312e-08*size, 0.06698718667030334*size, -0.14999987185001373*size), (-1.4901161193847656e-08*size, 0.14644640684127808*size, -0.21213191747665405*size), (0.0*size, 0.24999985098838806*size, -0.25980761647224426*size), (0.0*size, 0.3705902695655823*size, -0.2897777259349823*size), (0.0*size, 0.4999997615814209*size, -0.30000004172325134*size), (0.0*size, 0.6294092535972595*size, -0.2897777855396271*size), (0.0*size, 0.7499997615814209*size, -0.2598077356815338*size), (1.4901161193847656e-08*size, 0.8535531759262085*size, -0.21213220059871674*size), (0.0*size, 0.9330125451087952*size, -0.15000019967556*size), (0.0*size, 0.9829628467559814*size, -0.07764596492052078*size), ]
-        edges = [(1, 0), (2, 1), (3, 2), (4, 3), (5, 4), (6, 5), (7, 6), (8, 7), (9, 8), (10, 9), (11, 10), (12, 11), (13, 12), (14, 13), (15, 14), (16, 15), (17, 16), (18, 17), (19, 18), (20, 19), (21, 20), (22, 21), (23, 22), (0, 23), ]
-        faces = []
-
-        mesh = obj.data
-        mesh.from_pydata(verts, edges, faces)
-        mesh.update()
+        build_mesh(obj.data, EAR_VERTS * size, EAR_EDGES)
         return obj
     else:
         return None
 
 
+JAW_VERTS, JAW_EDGES = shape_arrays(
+    ((0.606898307800293, 0.6533132195472717, 0.09324522316455841), (0.5728408694267273, 0.7130533456802368, 0.04735109210014343), (0.478340744972229, 0.856249213218689, 0.0167550016194582), (0.3405401408672333, 1.0092359781265259, 0.003642391413450241), (0.1764744222164154, 1.1159402132034302, 0.0003642391529865563), (0.5728408694267273, 0.7130533456802368, 0.1391393542289734), (0.478340744972229, 0.856249213218689, 0.16973544657230377), (0.3405401408672333, 1.0092359781265259, 0.18284805119037628), (0.1764744222164154, 1.1159402132034302, 0.1861262023448944), (0.0, 1.153113603591919, 0.0), (-0.606898307800293, 0.6533132195472717, 0.09324522316455841), (-0.5728408694267273, 0.7130533456802368, 0.04735109210014343), (-0.478340744972229, 0.856249213218689, 0.0167550016194582), (-0.3405401408672333, 1.0092359781265259, 0.003642391413450241), (-0.1764744222164154, 1.1159402132034302, 0.0003642391529865563), (0.0, 1.153113603591919, 0.18649044632911682), (-0.5728408694267273, 0.7130533456802368, 0.1391393542289734), (-0.478340744972229, 0.856249213218689, 0.16973544657230377), (-0.3405401408672333, 1.0092359781265259, 0.18284805119037628), (-0.1764744222164154, 1.1159402132034302, 0.1861262023448944)),
+    ((1, 0), (2, 1), (3, 2), (4, 3), (9, 4), (6, 5), (7, 6), (8, 7), (15, 8), (5, 0), (11, 10), (12, 11), (13, 12), (14, 13), (9, 14), (17, 16), (18, 17), (19, 18), (15, 19), (16, 10))
+)
+
+
+@shared_widget
 def create_jaw_widget(rig, bone_name, size=1.0, bone_transform_name=None):
     obj = create_widget(rig, bone_name, bone_transform_name)
     if obj is not None:
-        verts = [(0.606898307800293*size, 0.6533132195472717*size, 0.09324522316455841*size), (0.5728408694267273*size, 0.7130533456802368*size, 0.04735109210014343*size), (0.478340744972229*size, 0.856249213218689*size, 0.0167550016194582*size), (0.3405401408672333*size, 1.0092359781265259*size, 0.003642391413450241*size), (0.1764744222164154*size, 1.1159402132034302*size, 0.0003642391529865563*size), (0.5728408694267273*size, 0.7130533456802368*size, 0.1391393542289734*size), (0.478340744972229*size, 0.856249213218689*size, 0.16973544657230377*size), (0.3405401408672333*size, 1.0092359781265259*size, 0.18284805119037628*size), (0.1764744222164154*size, 1.1159402132034302*size, 0.1861262023448944*size), (0.0*size, 1.153113603591919*size, 0.0*size), (-0.606898307800293*size, 0.6533132195472717*size, 0.09324522316455841*size), (-0.5728408694267273*size, 0.7130533456802368*size, 0.04735109210014343*size), (-0.478340744972229*size, 0.856249213218689*size, 0.0167550016194582*size), (-0.3405401408672333*size, 1.0092359781265259*size, 0.003642391413450241*size), (-0.1764744222164154*size, 1.1159402132034302*size, 0.0003642391529865563*size), (0.0*size, 1.153113603591919*size, 0.18649044632911682*size), (-0.5728408694267273*size, 0.7130533456802368*size, 0.1391393542289734*size), (-0.478340744972229*size, 0.856249213218689*size, 0.16973544657230377*size), (-0.3405401408672333*size, 1.0092359781265259*size, 0.18284805119037628*size), (-0.1764744222164154*size, 1.1159402132034302*size, 0.1861262023448944*size), ]
-        edges = [(1, 0), (2, 1), (3, 2), (4, 3), (9, 4), (6, 5), (7, 6), (8, 7), (15, 8), (5, 0), (11, 10), (12, 11), (13, 12), (14, 13), (9, 14), (17, 16), (18, 17), (19, 18), (15, 19), (16, 10), ]
-        faces = []
-
-        mesh = obj.data
-        mesh.from_pydata(verts, edges, faces)
-        mesh.update()
+        build_mesh(obj.data, JAW_VERTS * size, JAW_EDGES)
         return obj
     else:
         return None
 
 
+TEETH_VERTS, TEETH_EDGES = shape_arrays(
+    ((0.6314387321472168, 0.4999997019767761, 0.09999999403953552), (0.5394065976142883, 0.29289281368255615, 0.09999999403953552), (0.3887903690338135, 0.1339743733406067, 0.09999999403953552), (0.19801488518714905, 0.03407406806945801, 0.09999999403953552), (-3.4034394502668874e-07, 0.0, 0.09999999403953552), (-0.19801555573940277, 0.034074246883392334, 0.09999999403953552), (-0.7000000476837158, 1.0000001192092896, -0.10000000894069672), (-0.6778771877288818, 0.7411810755729675, -0.10000000894069672), (-0.6314389705657959, 0.5000001192092896, -0.10000000894069672), (-0.5394070148468018, 0.2928934097290039, -0.10000000894069672), (-0.38879096508026123, 0.13397473096847534, -0.10000000894069672), (-0.19801555573940277, 0.034074246883392334, -0.10000000894069672), (-3.4034394502668874e-07, 0.0, -0.10000000894069672), (0.19801488518714905, 0.03407406806945801, -0.10000000894069672), (0.3887903690338135, 0.1339743733406067, -0.10000000894069672), (0.5394065976142883, 0.29289281368255615, -0.10000000894069672), (0.6314387321472168, 0.4999997019767761, -0.10000000894069672), (0.6778769493103027, 0.7411805391311646, -0.10000000894069672), (0.6999999284744263, 0.9999995231628418, -0.10000000894069672), (-0.38879096508026123, 0.13397473096847534, 0.09999999403953552), (-0.5394070148468018, 0.2928934097290039, 0.09999999403953552), (-0.6314389705657959, 0.5000001192092896, 0.09999999403953552), (-0.6778771877288818, 0.7411810755729675, 0.09999999403953552), (-0.7000000476837158, 1.0000001192092896, 0.09999999403953552), (0.6778769493103027, 0.7411805391311646, 0.09999999403953552), (0.6999999284744263, 0.9999995231628418, 0.09999999403953552)),
+    ((25, 24), (24, 0), (0, 1), (1, 2), (2, 3), (3, 4), (7, 6), (8, 7), (9, 8), (10, 9), (11, 10), (12, 11), (13, 12), (14, 13), (15, 14), (16, 15), (17, 16), (18, 17), (4, 5), (5, 19), (19, 20), (20, 21), (21, 22), (22, 23), (18, 25), (6, 23))
+)
+
+
+@shared_widget
 def create_teeth_widget(rig, bone_name, size=1.0, bone_transform_name=None):
     obj = create_widget(rig, bone_name, bone_transform_name)
     if obj is not None:
-        verts = [(0.6314387321472168*size, 0.4999997019767761*size, 0.09999999403953552*size), (0.5394065976142883*size, 0.29289281368255615*size, 0.09999999403953552*size), (0.3887903690338135*size, 0.1339743733406067*size, 0.09999999403953552*size), (0.19801488518714905*size, 0.03407406806945801*size, 0.09999999403953552*size), (-3.4034394502668874e-07*size, 0.0*size, 0.09999999403953552*size), (-0.19801555573940277*size, 0.034074246883392334*size, 0.09999999403953552*size), (-0.7000000476837158*size, 1.0000001192092896*size, -0.10000000894069672*size), (-0.6778771877288818*size, 0.7411810755729675*size, -0.10000000894069672*size), (-0.6314389705657959*size, 0.5000001192092896*size, -0.10000000894069672*size), (-0.5394070148468018*size, 0.2928934097290039*size, -0.10000000894069672*size), (-0.38879096508026123*size, 0.13397473096847534*size, -0.10000000894069672*size), (-0.19801555573940277*size, 0.034074246883392334*size, -0.10000000894069672*size), (-3.4034394502668874e-07*size, 0.0*size, -0.10000000894069672*size), (0.19801488518714905*size, 0.03407406806945801*size, -0.10000000894069672*size), (0.3887903690338135*size, 0.1339743733406067*size, -0.10000000894069672*size), (0.5394065976142883*size, 0.29289281368255615*size, -0.10000000894069672*size), (0.6314387321472168*size, 0.4999997019767761*size, -0.10000000894069672*size), (0.6778769493103027*size, 0.7411805391311646*size, -0.10000000894069672*size), (0.6999999284744263*size, 0.9999995231628418*size, -0.10000000894069672*size), (-0.38879096508026123*size, 0.13397473096847534*size, 0.09999999403953552*size), (-0.5394070148468018*size, 0.2928934097290039*size, 0.09999999403953552*size), (-0.6314389705657959*size, 0.5000001192092896*size, 0.09999999403953552*size), (-0.6778771877288818*size, 0.7411810755729675*size, 0.09999999403953552*size), (-0.7000000476837158*size, 1.0000001192092896*size, 0.09999999403953552*size), (0.6778769493103027*size, 0.7411805391311646*size, 0.09999999403953552*size), (0.6999999284744263*size, 0.9999995231628418*size, 0.09999999403953552*size), ]
-        edges = [(25, 24), (24, 0), (0, 1), (1, 2), (2, 3), (3, 4), (7, 6), (8, 7), (9, 8), (10, 9), (11, 10), (12, 11), (13, 12), (14, 13), (15, 14), (16, 15), (17, 16), (18, 17), (4, 5), (5, 19), (19, 20), (20, 21), (21, 22), (22, 23), (18, 25), (6, 23), ]
-        faces = []
-
-        mesh = obj.data
-        mesh.from_pydata(verts, edges, faces)
-        mesh.update()
+        build_mesh(obj.data, TEETH_VERTS * size, TEETH_EDGES)
         return obj
     else:
         return None
 
+
+FACE_VERTS, FACE_EDGES = shape_arrays(
+    ((-0.25, -0.25, 0.07499998807907104), (-0.25, 0.25, 0.07499998807907104), (0.25, 0.25, 0.07499998807907104), (0.25, -0.25, 0.07499998807907104), (-0.25, -0.25, -0.07499998807907104), (-0.25, 0.25, -0.07499998807907104), (0.25, 0.25, -0.07499998807907104), (0.25, -0.25, -0.07499998807907104)),
+    ((4, 5), (5, 1), (1, 0), (0, 4), (5, 6), (6, 2), (2, 1), (6, 7), (7, 3), (3, 2), (7, 4), (0, 3))
+)
+
+
+@shared_widget
 def create_face_widget(rig, bone_name, size=1.0, bone_transform_name=None):
     obj = create_widget(rig, bone_name, bone_transform_name)
     if obj is not None:
-        verts = [(-0.25*size, -0.25*size, 0.07499998807907104*size), (-0.25*size, 0.25*size, 0.07499998807907104*size), (0.25*size, 0.25*size, 0.07499998807907104*size), (0.25*size, -0.25*size, 0.07499998807907104*size), (-0.25*size, -0.25*size, -0.07499998807907104*size), (-0.25*size, 0.25*size, -0.07499998807907104*size), (0.25*size, 0.25*size, -0.07499998807907104*size), (0.25*size, -0.25*size, -0.07499998807907104*size), ]
-        edges = [(4, 5), (5, 1), (1, 0), (0, 4), (5, 6), (6, 2), (2, 1), (6, 7), (7, 3), (3, 2), (7, 4), (0, 3), ]
-        faces = []
-
-        mesh = obj.data
-        mesh.from_pydata(verts, edges, faces)
-        mesh.update()
+        build_mesh(obj.data, FACE_VERTS * size, FACE_EDGES)
         return obj
     else:
         return None
 
 
+IKARROW_VERTS, IKARROW_EDGES = shape_arrays(
+    ((0.10000000149011612, 0.0, -0.30000001192092896), (0.10000000149011612, 0.699999988079071, -0.30000001192092896), (-0.10000000149011612, 0.0, -0.30000001192092896), (-0.10000000149011612, 0.699999988079071, -0.30000001192092896), (0.20000000298023224, 0.699999988079071, -0.30000001192092896), (0.0, 1.0, -0.30000001192092896), (-0.20000000298023224, 0.699999988079071, -0.30000001192092896)),
+    ((0, 1), (2, 3), (1, 4), (4, 5), (3, 6), (5, 6), (0, 2))
+)
+
+
+@shared_widget
 def create_ikarrow_widget(rig, bone_name, size=1.0, bone_transform_name=None):
     obj = create_widget(rig, bone_name, bone_transform_name)
     if obj is not None:
-        verts = [(0.10000000149011612*size, 0.0*size, -0.30000001192092896*size), (0.10000000149011612*size, 0.699999988079071*size, -0.30000001192092896*size), (-0.10000000149011612*size, 0.0*size, -0.30000001192092896*size), (-0.10000000149011612*size, 0.699999988079071*size, -0.30000001192092896*size), (0.20000000298023224*size, 0.699999988079071*size, -0.30000001192092896*size), (0.0*size, 1.0*size, -0.30000001192092896*size), (-0.20000000298023224*size, 0.699999988079071*size, -0.30000001192092896*size), ]
-        edges = [(0, 1), (2, 3), (1, 4), (4, 5), (3, 6), (5, 6), (0, 2), ]
-        faces = []
-
-        mesh = obj.data
-        mesh.from_pydata(verts, edges, faces)
-        mesh.update()
+        build_mesh(obj.data, IKARROW_VERTS * size, IKARROW_EDGES)
         return obj
     else:
         return None
 
 
+HAND_VERTS, HAND_EDGES = shape_arrays(
+    ((-0.7000000476837158, 1.4999998807907104, 5.960464477539063e-08), (-0.6999999284744263, -0.24999994039535522, -5.960464477539063e-08), (0.7000000476837158, -0.24999994039535522, 0.0), (0.6999999284744263, 1.4999998807907104, 1.1920928955078125e-07), (-0.699999988079071, 0.7229999899864197, 0.0), (0.699999988079071, 0.7229999899864197, 5.960464477539063e-08), (-0.699999988079071, 0.0, -5.960464477539063e-08), (0.699999988079071, 5.960464477539063e-08, 0.0)),
+    ((1, 2), (0, 3), (0, 4), (3, 5), (4, 6), (1, 6), (5, 7), (2, 7))
+)
+
+
+@shared_widget
 def create_hand_widget(rig, bone_name, size=1.0, bone_transform_name=None):
     # Create hand widget
     obj = create_widget(rig, bone_name, bone_transform_name)
     if obj is not None:
-        verts = [(-0.7000000476837158*size, 1.4999998807907104*size, 5.960464477539063e-08*size), (-0.6999999284744263*size, -0.24999994039535522*size, -5.960464477539063e-08*size), (0.7000000476837158*size, -0.24999994039535522*size, 0.0*size), (0.6999999284744263*size, 1.4999998807907104*size, 1.1920928955078125e-07*size), (-0.699999988079071*size, 0.7229999899864197*size, 0.0*size), (0.699999988079071*size, 0.7229999899864197*size, 5.960464477539063e-08*size), (-0.699999988079071*size, 0.0*size, -5.960464477539063e-08*size), (0.699999988079071*size, 5.960464477539063e-08*size, 0.0*size), ]
-        edges = [(1, 2), (0, 3), (0, 4), (3, 5), (4, 6), (1, 6), (5, 7), (2, 7), ]
-        faces = []
-
-        mesh = obj.data
-        mesh.from_pydata(verts, edges, faces)
-        mesh.update()
+        build_mesh(obj.data, HAND_VERTS * size, HAND_EDGES)
 
         mod = obj.modifiers.new("subsurf", 'SUBSURF')
         mod.levels = 2
@@ -235,17 +279,18 @@ def create_hand_widget(rig, bone_name, size=1.0, bone_transform_name=None):
     else:
         return None
 
+
+FOOT_VERTS, FOOT_EDGES = shape_arrays(
+    ((-0.6999998688697815, -0.5242648720741272, 0.0), (-0.7000001072883606, 1.2257349491119385, 0.0), (0.6999998688697815, 1.2257351875305176, 0.0), (0.7000001072883606, -0.5242648720741272, 0.0), (-0.6999998688697815, 0.2527350187301636, 0.0), (0.7000001072883606, 0.2527352571487427, 0.0), (-0.7000001072883606, 0.975735068321228, 0.0), (0.6999998688697815, 0.9757352471351624, 0.0)),
+    ((1, 2), (0, 3), (0, 4), (3, 5), (4, 6), (1, 6), (5, 7), (2, 7))
+)
+
+
+@shared_widget
 def create_foot_widget(rig, bone_name, size=1.0, bone_transform_name=None):
-    # Create hand widget
     obj = create_widget(rig, bone_name, bone_transform_name)
     if obj is not None:
-        verts = [(-0.6999998688697815*size, -0.5242648720741272*size, 0.0*size), (-0.7000001072883606*size, 1.2257349491119385*size, 0.0*size), (0.6999998688697815*size, 1.2257351875305176*size, 0.0*size), (0.7000001072883606*size, -0.5242648720741272*size, 0.0*size), (-0.6999998688697815*size, 0.2527350187301636*size, 0.0*size), (0.7000001072883606*size, 0.2527352571487427*size, 0.0*size), (-0.7000001072883606*size, 0.975735068321228*size, 0.0*size), (0.6999998688697815*size, 0.9757352471351624*size, 0.0*size), ]
-        edges = [(1, 2), (0, 3), (0, 4), (3, 5), (4, 6), (1, 6), (5, 7), (2, 7), ]
-        faces = []
-
-        mesh = obj.data
-        mesh.from_pydata(verts, edges, faces)
-        mesh.update()
+        build_mesh(obj.data, FOOT_VERTS * size, FOOT_EDGES)
 
         mod = obj.modifiers.new("subsurf", 'SUBSURF')
         mod.levels = 2
@@ -253,71 +298,50 @@ def create_foot_widget(rig, bone_name, size=1.0, bone_transform_name=None):
     else:
         return None
 
+
+BALLSOCKET_VERTS, BALLSOCKET_EDGES = shape_arrays(
+    ((-0.050000108778476715, 0.779460072517395, -0.2224801927804947), (0.049999915063381195, 0.779460072517395, -0.22248023748397827), (0.09999985247850418, 0.6790841817855835, -0.3658318817615509), (-2.3089636158601934e-07, 0.5930476188659668, -0.488704651594162), (-0.10000013560056686, 0.6790841817855835, -0.3658317029476166), (0.04999981075525284, 0.6790841817855835, -0.36583182215690613), (-0.050000183284282684, 0.6790841817855835, -0.3658318519592285), (-0.3658319115638733, 0.6790841221809387, 0.05000019446015358), (-0.3658318817615509, 0.6790841221809387, -0.04999979957938194), (-0.36583176255226135, 0.6790841221809387, 0.10000018030405045), (-0.48870471119880676, 0.5930476188659668, 2.4472291215715813e-07), (-0.3658319413661957, 0.679084062576294, -0.0999998077750206), (-0.22248037159442902, 0.7794600129127502, -0.04999985918402672), (-0.22248034179210663, 0.7794600129127502, 0.05000016465783119), (0.3658319115638733, 0.6790841221809387, -0.05000000819563866), (0.3658319115638733, 0.6790841221809387, 0.05000000074505806), (0.36583179235458374, 0.6790841221809387, -0.09999998658895493), (0.4887046813964844, 0.5930476188659668, -3.8399143420519977e-08), (0.3658319413661957, 0.679084062576294, 0.10000000149011612), (0.050000034272670746, 0.7794599533081055, 0.2224804311990738), (-0.04999997466802597, 0.7794599533081055, 0.2224804311990738), (-0.09999992698431015, 0.679084062576294, 0.36583200097084045), (1.267315070663244e-07, 0.5930474996566772, 0.48870477080345154), (0.1000000610947609, 0.679084062576294, 0.3658318519592285), (-0.049999915063381195, 0.679084062576294, 0.3658319413661957), (0.05000007897615433, 0.679084062576294, 0.36583197116851807), (0.22248029708862305, 0.7794600129127502, 0.05000004544854164), (0.22248028218746185, 0.7794600129127502, -0.04999994859099388), (-4.752442350763886e-08, 0.8284152746200562, -0.1499999612569809), (-0.03882290795445442, 0.8284152746200562, -0.14488883316516876), (-0.07500004768371582, 0.8284152746200562, -0.12990377843379974), (-0.10606606304645538, 0.8284152746200562, -0.10606598109006882), (-0.1299038827419281, 0.8284152746200562, -0.07499996572732925), (-0.14488893747329712, 0.8284152746200562, -0.038822825998067856), (-0.15000006556510925, 0.8284152746200562, 2.4781975582754967e-08), (-0.1448889672756195, 0.8284152746200562, 0.038822878152132034), (-0.1299038827419281, 0.8284152746200562, 0.07500001043081284), (-0.10606609284877777, 0.8284152746200562, 0.1060660257935524), (-0.0750000923871994, 0.8284152746200562, 0.12990383803844452), (-0.038822952657938004, 0.8284152746200562, 0.14488889276981354), (-1.0593657862045802e-07, 0.8284152746200562, 0.15000005066394806), (0.03882275149226189, 0.8284152746200562, 0.14488892257213593), (0.07499989867210388, 0.8284152746200562, 0.1299038976430893), (0.10606591403484344, 0.8284152746200562, 0.10606611520051956), (0.12990373373031616, 0.8284152746200562, 0.0750000849366188), (0.14488881826400757, 0.8284152746200562, 0.038822952657938004), (0.1499999463558197, 0.8284152746200562, 1.0584351883835552e-07), (0.14488881826400757, 0.8284152746200562, -0.03882275149226189), (0.12990379333496094, 0.8284152746200562, -0.07499989122152328), (0.10606604814529419, 0.8284152746200562, -0.10606592148542404), (0.07500004768371582, 0.8284152746200562, -0.12990371882915497), (0.03882291540503502, 0.8284152746200562, -0.14488880336284637)),
+    ((1, 0), (3, 2), (5, 2), (4, 3), (6, 4), (1, 5), (0, 6), (13, 7), (12, 8), (7, 9), (9, 10), (8, 11), (27, 14), (26, 15), (14, 16), (16, 17), (15, 18), (17, 18), (10, 11), (12, 13), (20, 19), (22, 21), (24, 21), (23, 22), (29, 28), (30, 29), (31, 30), (32, 31), (33, 32), (34, 33), (35, 34), (36, 35), (37, 36), (38, 37), (39, 38), (40, 39), (41, 40), (42, 41), (43, 42), (44, 43), (45, 44), (46, 45), (47, 46), (48, 47), (49, 48), (50, 49), (51, 50), (28, 51), (26, 27), (25, 23), (20, 24), (19, 25))
+)
+
+
+@shared_widget
 def create_ballsocket_widget(rig, bone_name, size=1.0, bone_transform_name=None):
     obj = create_widget(rig, bone_name, bone_transform_name)
     if obj is not None:
-        verts = [(-0.050000108778476715*size, 0.779460072517395*size, -0.2224801927804947*size), (0.049999915063381195*size, 0.779460072517395*size, -0.22248023748397827*size), (0.09999985247850418*size, 0.6790841817855835*size, -0.3658318817615509*size), (-2.3089636158601934e-07*size, 0.5930476188659668*size, -0.488704651594162*size), (-0.10000013560056686*size, 0.6790841817855835*size, -0.3658317029476166*size), (0.04999981075525284*size, 0.6790841817855835*size, -0.36583182215690613*size), (-0.050000183284282684*size, 0.6790841817855835*size, -0.3658318519592285*size), (-0.3658319115638733*size, 0.6790841221809387*size, 0.05000019446015358*size), (-0.3658318817615509*size, 0.6790841221809387*size, -0.04999979957938194*size), (-0.36583176255226135*size, 0.6790841221809387*size, 0.10000018030405045*size), (-0.48870471119880676*size, 0.5930476188659668*size, 2.4472291215715813e-07*size), (-0.3658319413661957*size, 0.679084062576294*size, -0.0999998077750206*size), (-0.22248037159442902*size, 0.7794600129127502*size, -0.04999985918402672*size), (-0.22248034179210663*size, 0.7794600129127502*size, 0.05000016465783119*size), (0.3658319115638733*size, 0.6790841221809387*size, -0.05000000819563866*size), (0.3658319115638733*size, 0.6790841221809387*size, 0.05000000074505806*size), (0.36583179235458374*size, 0.6790841221809387*size, -0.09999998658895493*size), (0.4887046813964844*size, 0.5930476188659668*size, -3.8399143420519977e-08*size), (0.3658319413661957*size, 0.679084062576294*size, 0.10000000149011612*size), (0.050000034272670746*size, 0.7794599533081055*size, 0.2224804311990738*size), (-0.04999997466802597*size, 0.7794599533081055*size, 0.2224804311990738*size), (-0.09999992698431015*size, 0.679084062576294*size, 0.36583200097084045*size), (1.267315070663244e-07*size, 0.5930474996566772*size, 0.48870477080345154*size), (0.1000000610947609*size, 0.679084062576294*size, 0.3658318519592285*size), (-0.049999915063381195*size, 0.679084062576294*size, 0.3658319413661957*size), (0.05000007897615433*size, 0.679084062576294*size, 0.36583197116851807*size), (0.22248029708862305*size, 0.7794600129127502*size, 0.05000004544854164*size), (0.22248028218746185*size, 0.7794600129127502*size, -0.04999994859099388*size), (-4.752442350763886e-08*size, 0.8284152746200562*size, -0.1499999612569809*size), (-0.03882290795445442*size, 0.8284152746200562*size, -0.14488883316516876*size), (-0.07500004768371582*size, 0.8284152746200562*size, -0.12990377843379974*size), (-0.10606606304645538*size, 0.8284152746200562*size, -0.10606598109006882*size), (-0.1299038827419281*size, 0.8284152746200562*size, -0.07499996572732925*size), (-0.14488893747329712*size, 0.8284152746200562*size, -0.038822825998067856*size), (-0.15000006556510925*size, 0.8284152746200562*size, 2.4781975582754967e-08*size), (-0.1448889672756195*size, 0.8284152746200562*size, 0.038822878152132034*size), (-0.1299038827419281*size, 0.8284152746200562*size, 0.07500001043081284*size), (-0.10606609284877777*size, 0.8284152746200562*size, 0.1060660257935524*size), (-0.0750000923871994*size, 0.8284152746200562*size, 0.12990383803844452*size), (-0.038822952657938004*size, 0.8284152746200562*size, 0.14488889276981354*size), (-1.0593657862045802e-07*size, 0.8284152746200562*size, 0.15000005066394806*size), (0.03882275149226189*size, 0.8284152746200562*size, 0.14488892257213593*size), (0.07499989867210388*size, 0.8284152746200562*size, 0.1299038976430893*size), (0.10606591403484344*size, 0.8284152746200562*size, 0.10606611520051956*size), (0.12990373373031616*size, 0.8284152746200562*size, 0.0750000849366188*size), (0.14488881826400757*size, 0.8284152746200562*size, 0.038822952657938004*size), (0.1499999463558197*size, 0.8284152746200562*size, 1.0584351883835552e-07*size), (0.14488881826400757*size, 0.8284152746200562*size, -0.03882275149226189*size), (0.12990379333496094*size, 0.8284152746200562*size, -0.07499989122152328*size), (0.10606604814529419*size, 0.8284152746200562*size, -0.10606592148542404*size), (0.07500004768371582*size, 0.8284152746200562*size, -0.12990371882915497*size), (0.03882291540503502*size, 0.8284152746200562*size, -0.14488880336284637*size), ]
-        edges = [(1, 0), (3, 2), (5, 2), (4, 3), (6, 4), (1, 5), (0, 6), (13, 7), (12, 8), (7, 9), (9, 10), (8, 11), (27, 14), (26, 15), (14, 16), (16, 17), (15, 18), (17, 18), (10, 11), (12, 13), (20, 19), (22, 21), (24, 21), (23, 22), (29, 28), (30, 29), (31, 30), (32, 31), (33, 32), (34, 33), (35, 34), (36, 35), (37, 36), (38, 37), (39, 38), (40, 39), (41, 40), (42, 41), (43, 42), (44, 43), (45, 44), (46, 45), (47, 46), (48, 47), (49, 48), (50, 49), (51, 50), (28, 51), (26, 27), (25, 23), (20, 24), (19, 25), ]
-        faces = []
-
-        mesh = obj.data
-        mesh.from_pydata(verts, edges, faces)
-        mesh.update()
+        build_mesh(obj.data, BALLSOCKET_VERTS * size, BALLSOCKET_EDGES)
         return obj
     else:
         return None
 
 
+TOE_VERTS, TOE_EDGES = shape_arrays(
+    ((0.631439, 0.331423, 0.1), (0.539407, 0.538529, 0.1), (0.38879, 0.697448, 0.1), (0.198015, 0.797348, 0.1), (-0.0, 0.831422, 0.1), (-0.198016, 0.797348, 0.1), (-0.7, -0.168578, -0.1), (-0.677877, 0.090241, -0.1), (-0.631439, 0.331422, -0.1), (-0.539407, 0.538529, -0.1), (-0.388791, 0.697448, -0.1), (-0.198016, 0.797348, -0.1), (-0.0, 0.831422, -0.1), (0.198015, 0.797348, -0.1), (0.38879, 0.697448, -0.1), (0.539407, 0.538529, -0.1), (0.631439, 0.331423, -0.1), (0.677877, 0.090242, -0.1), (0.7, -0.168577, -0.1), (-0.388791, 0.697448, 0.1), (-0.539407, 0.538529, 0.1), (-0.631439, 0.331422, 0.1), (-0.677877, 0.090241, 0.1), (-0.7, -0.168578, 0.1), (0.677877, 0.090242, 0.1), (0.7, -0.168577, 0.1)),
+    ((25, 24), (24, 0), (0, 1), (1, 2), (2, 3), (3, 4), (7, 6), (8, 7), (9, 8), (10, 9), (11, 10), (12, 11), (13, 12), (14, 13), (15, 14), (16, 15), (17, 16), (18, 17), (4, 5), (5, 19), (19, 20), (20, 21), (21, 22), (22, 23), (18, 25), (6, 23))
+)
+
+
+@shared_widget
 def create_toe_widget(rig, bone_name, size=1.0, bone_transform_name=None):
     obj = create_widget(rig, bone_name, bone_transform_name)
     if obj is not None:
-        verts = [(0.631439*size, 0.331423*size, 0.100000*size),
-        (0.539407*size, 0.538529*size, 0.100000*size),
-        (0.388790*size, 0.697448*size, 0.100000*size),
-        (0.198015*size, 0.797348*size, 0.100000*size),
-        (-0.000000*size, 0.831422*size, 0.100000*size),
-        (-0.198016*size, 0.797348*size, 0.100000*size),
-        (-0.700000*size, -0.168578*size, -0.100000*size),
-        (-0.677877*size, 0.090241*size, -0.100000*size),
-        (-0.631439*size, 0.331422*size, -0.100000*size),
-        (-0.539407*size, 0.538529*size, -0.100000*size),
-        (-0.388791*size, 0.697448*size, -0.100000*size),
-        (-0.198016*size, 0.797348*size, -0.100000*size),
-        (-0.000000*size, 0.831422*size, -0.100000*size),
-        (0.198015*size, 0.797348*size, -0.100000*size),
-        (0.388790*size, 0.697448*size, -0.100000*size),
-        (0.539407*size, 0.538529*size, -0.100000*size),
-        (0.631439*size, 0.331423*size, -0.100000*size),
-        (0.677877*size, 0.090242*size, -0.100000*size),
-        (0.700000*size, -0.168577*size, -0.100000*size),
-        (-0.388791*size, 0.697448*size, 0.100000*size),
-        (-0.539407*size, 0.538529*size, 0.100000*size),
-        (-0.631439*size, 0.331422*size, 0.100000*size),
-        (-0.677877*size, 0.090241*size, 0.100000*size),
-        (-0.700000*size, -0.168578*size, 0.100000*size),
-        (0.677877*size, 0.090242*size, 0.100000*size),
-        (0.700000*size, -0.168577*size, 0.100000*size),
-        ]
-        edges = [(25, 24), (24, 0), (0, 1), (1, 2), (2, 3), (3, 4), (7, 6), (8, 7), (9, 8), (10, 9), (11, 10), (12, 11), (13, 12), (14, 13), (15, 14), (16, 15), (17, 16), (18, 17), (4, 5), (5, 19), (19, 20), (20, 21), (21, 22), (22, 23), (18, 25), (6, 23), ]
-        faces = []
-
-        mesh = obj.data
-        mesh.from_pydata(verts, edges, faces)
-        mesh.update()
+        build_mesh(obj.data, TOE_VERTS * size, TOE_EDGES)
         return obj
     else:
         return None
 
+
+PAW_VERTS, PAW_EDGES = shape_arrays(
+    ((-0.64747, -0.17301, 0.0), (-0.64747, 1.112, 0.0), (0.64747, 1.112, 0.0), (0.64747, -0.17301, 0.0), (-0.64747, 0.32895, 0.0), (0.64747, 0.32895, 0.0), (-0.64747, 0.86204, 0.0), (0.64747, 0.86204, 0.0)),
+    ((1, 2), (0, 3), (0, 4), (3, 5), (4, 6), (1, 6), (5, 7), (2, 7))
+)
+
+
+@shared_widget
 def create_paw_widget(rig, bone_name, size=1.0, bone_transform_name=None):
     obj = create_widget(rig, bone_name, bone_transform_name)
     if obj is not None:
-        verts = [(-0.64747*size, -0.17301*size, 0.0*size), (-0.64747*size, 1.112*size, 0.0*size), (0.64747*size, 1.112*size, 0.0*size), (0.64747*size, -0.17301*size, 0.0*size), (-0.64747*size, 0.32895*size, 0.0*size), (0.64747*size, 0.32895*size, 0.0*size), (-0.64747*size, 0.86204*size, 0.0*size), (0.64747*size, 0.86204*size, 0.0*size), ]
-        edges = [(1, 2), (0, 3), (0, 4), (3, 5), (4, 6), (1, 6), (5, 7), (2, 7), ]
-        faces = []
-
-        mesh = obj.data
-        mesh.from_pydata(verts, edges, faces)
-        mesh.update()
+        build_mesh(obj.data, PAW_VERTS * size, PAW_EDGES)
 
         mod = obj.modifiers.new("subsurf", 'SUBSURF')
         mod.levels = 2
@@ -326,42 +350,53 @@ def create_paw_widget(rig, bone_name, size=1.0, bone_transform_name=None):
         return None
 
 
+PALM_VERTS, PALM_EDGES = shape_arrays(
+    ((0.1578, 0.0, -0.3), (0.1578, 1.0, -0.2), (-0.1578, 1.0, -0.2), (-0.1578, -0.0, -0.3), (-0.1578, -0.0, 0.3), (-0.1578, 0.835, 0.2165), (0.1578, 0.835, 0.2165), (0.1578, 0.0, 0.3), (0.1578, 0.25, -0.275), (-0.1578, 0.25, -0.275), (0.1578, 0.75, -0.225), (-0.1578, 0.75, -0.225), (0.1578, 0.6194, 0.2381), (0.1578, 0.25, 0.275), (-0.1578, 0.25, 0.275), (-0.1578, 0.6194, 0.2381)),
+    ((1, 2), (0, 3), (4, 7), (5, 6), (8, 0), (9, 3), (10, 1), (11, 2), (12, 6), (13, 7), (4, 14), (15, 5), (10, 8), (11, 9), (15, 14), (12, 13))
+)
+
+
+@shared_widget
 def create_palm_widget(rig, bone_name, flip_xz, size=1.0, bone_transform_name=None):
     obj = create_widget(rig, bone_name, bone_transform_name)
     if obj is not None:
-        mesh = obj.data
-        verts = [(0.1578*size, 0.0*size, -0.3*size), (0.1578*size, 1.0*size, -0.2*size), (-0.1578*size, 1.0*size, -0.2*size), (-0.1578*size, -0.0*size, -0.3*size), (-0.1578*size, -0.0*size, 0.3*size), (-0.1578*size, 0.835*size, 0.2165*size), (0.1578*size, 0.835*size, 0.2165*size), (0.1578*size, 0.0*size, 0.3*size), (0.1578*size, 0.25*size, -0.275*size), (-0.1578*size, 0.25*size, -0.275*size), (0.1578*size, 0.75*size, -0.225*size), (-0.1578*size, 0.75*size, -0.225*size), (0.1578*size, 0.6194*size, 0.2381*size), (0.1578*size, 0.25*size, 0.275*size), (-0.1578*size, 0.25*size, 0.275*size), (-0.1578*size, 0.6194*size, 0.2381*size), ]
-        edges = [(1, 2), (0, 3), (4, 7), (5, 6), (8, 0), (9, 3), (10, 1), (11, 2), (12, 6), (13, 7), (4, 14), (15, 5), (10, 8), (11, 9), (15, 14), (12, 13), ]
-
+        verts = PALM_VERTS * size
         if flip_xz:
             # Flip x/z coordinates
-            verts = [v[::-1] for v in verts]
-        
-        mesh.from_pydata(verts, edges, [])
-        mesh.update()
+            verts = verts[:, ::-1]
+        build_mesh(obj.data, verts, PALM_EDGES)
 
         mod = obj.modifiers.new("subsurf", 'SUBSURF')
         mod.levels = 2
 
 
+THUMB_VERTS, THUMB_EDGES = shape_arrays(
+    ((0.1578, 0.0, -0.3), (0.1578, 1.0, -0.2), (-0.1578, 1.0, -0.2), (-0.1578, -0.0, -0.3), (-0.1578, 0.1224, 0.338), (-0.1578, 0.766, 0.2737), (0.1578, 0.766, 0.2737), (0.1578, 0.1224, 0.338), (0.1578, 0.25, -0.275), (-0.1578, 0.25, -0.275), (0.1578, 0.75, -0.225), (-0.1578, 0.75, -0.225), (0.1578, 0.5515, 0.2951), (0.1578, 0.3209, 0.3182), (-0.1578, 0.3209, 0.3182), (-0.1578, 0.5515, 0.2951)),
+    ((1, 2), (0, 3), (4, 7), (5, 6), (8, 0), (9, 3), (10, 1), (11, 2), (12, 6), (13, 7), (4, 14), (15, 5), (10, 8), (11, 9), (15, 14), (12, 13))
+)
+
+
+@shared_widget
 def create_thumb_widget(rig, bone_name, flip_xz, size=1.0, bone_transform_name=None):
     obj = create_widget(rig, bone_name, bone_transform_name)
     if obj is not None:
-        mesh = obj.data
-        verts = [(0.1578*size, 0.0*size, -0.3*size), (0.1578*size, 1.0*size, -0.2*size), (-0.1578*size, 1.0*size, -0.2*size), (-0.1578*size, -0.0*size, -0.3*size), (-0.1578*size, 0.1224*size, 0.338*size), (-0.1578*size, 0.766*size, 0.2737*size), (0.1578*size, 0.766*size, 0.2737*size), (0.1578*size, 0.1224*size, 0.338*size), (0.1578*size, 0.25*size, -0.275*size), (-0.1578*size, 0.25*size, -0.275*size), (0.1578*size, 0.75*size, -0.225*size), (-0.1578*size, 0.75*size, -0.225*size), (0.1578*size, 0.5515*size, 0.2951*size), (0.1578*size, 0.3209*size, 0.3182*size), (-0.1578*size, 0.3209*size, 0.3182*size), (-0.1578*size, 0.5515*size, 0.2951*size), ]
-        edges = [(1, 2), (0, 3), (4, 7), (5, 6), (8, 0), (9, 3), (10, 1), (11, 2), (12, 6), (13, 7), (4, 14), (15, 5), (10, 8), (11, 9), (15, 14), (12, 13), ]
-
+        verts = THUMB_VERTS * size
         if flip_xz:
             # Flip x/z coordinates
-            verts = [v[::-1] for v in verts]
-        
-        mesh.from_pydata(verts, edges, [])
-        mesh.update()
+            verts = verts[:, ::-1]
+        build_mesh(obj.data, verts, THUMB_EDGES)
 
         mod = obj.modifiers.new("subsurf", 'SUBSURF')
         mod.levels = 2
 
 
+DIRECTED_CIRCLE_VERTS, DIRECTED_CIRCLE_EDGES = shape_arrays(
+    ((0.53033, 0.0, -0.53033), (0.6236, 0.0, -0.41668), (0.69291, 0.0, -0.28701), (0.73559, 0.0, -0.14632), (0.75, 0.0, 1.2079e-07), (0.73559, 0.0, 0.14632), (0.69291, 0.0, 0.28701), (0.6236, 0.0, 0.41668), (0.53033, 0.0, 0.53033), (0.41668, 0.0, 0.6236), (0.28701, 0.0, 0.69291), (0.14632, 0.0, 0.73559), (-2.4438e-07, 0.0, 0.75), (-0.14632, 0.0, 0.73559), (-0.28701, 0.0, 0.69291), (-0.41668, 0.0, 0.6236), (-0.53033, 0.0, 0.53033), (-0.6236, 0.0, 0.41668), (-0.69291, 0.0, 0.28701), (-0.73559, 0.0, 0.14632), (-0.75, 0.0, -5.4678e-07), (-0.73559, 0.0, -0.14632), (-0.69291, 0.0, -0.28701), (-0.6236, 0.0, -0.41668), (-0.53033, 0.0, -0.53033), (-0.41668, 0.0, -0.6236), (-0.28701, 0.0, -0.69291), (-0.14632, 0.0, -0.73559), (1.204e-06, 0.0, -0.75), (0.14632, 0.0, -0.73559), (0.28701, 0.0, -0.69291), (0.41668, 0.0, -0.6236), (-0.065618, 0.0, 0.81746), (0.065618, 0.0, 0.81542), (0.0, 0.0, 0.90415)),
+    ((0, 1), (1, 2), (2, 3), (3, 4), (4, 5), (5, 6), (6, 7), (7, 8), (8, 9), (9, 10), (10, 11), (11, 12), (12, 13), (13, 14), (14, 15), (15, 16), (16, 17), (17, 18), (18, 19), (19, 20), (20, 21), (21, 22), (22, 23), (23, 24), (24, 25), (25, 26), (26, 27), (27, 28), (28, 29), (29, 30), (30, 31), (0, 31), (32, 33), (33, 34), (34, 32))
+)
+
+
+@shared_widget
 def create_directed_circle_widget(rig, bone_name, radius=1.0, head_tail=0.0, bone_transform_name=None):
     """ Creates a directed circle widget, a circle around the y-axis.
         radius: the radius of the circle
@@ -369,11 +404,9 @@ def create_directed_circle_widget(rig, bone_name, radius=1.0, head_tail=0.0, bon
     """
     obj = create_widget(rig, bone_name, bone_transform_name)
     if obj != None:
-        verts = [(0.53033, 0.0, -0.53033), (0.6236, 0.0, -0.41668), (0.69291, 0.0, -0.28701), (0.73559, 0.0, -0.14632), (0.75, 0.0, 1.2079e-07), (0.73559, 0.0, 0.14632), (0.69291, 0.0, 0.28701), (0.6236, 0.0, 0.41668), (0.53033, 0.0, 0.53033), (0.41668, 0.0, 0.6236), (0.28701, 0.0, 0.69291), (0.14632, 0.0, 0.73559), (-2.4438e-07, 0.0, 0.75), (-0.14632, 0.0, 0.73559), (-0.28701, 0.0, 0.69291), (-0.41668, 0.0, 0.6236), (-0.53033, 0.0, 0.53033), (-0.6236, 0.0, 0.41668), (-0.69291, 0.0, 0.28701), (-0.73559, 0.0, 0.14632), (-0.75, 0.0, -5.4678e-07), (-0.73559, 0.0, -0.14632), (-0.69291, 0.0, -0.28701), (-0.6236, 0.0, -0.41668), (-0.53033, 0.0, -0.53033), (-0.41668, 0.0, -0.6236), (-0.28701, 0.0, -0.69291), (-0.14632, 0.0, -0.73559), (1.204e-06, 0.0, -0.75), (0.14632, 0.0, -0.73559), (0.28701, 0.0, -0.69291), (0.41668, 0.0, -0.6236), (-0.065618, 0.0, 0.81746), (0.065618, 0.0, 0.81542), (0.0, 0.0, 0.90415), ]
-        edges = [(0, 1), (1, 2), (2, 3), (3, 4), (4, 5), (5, 6), (6, 7), (7, 8), (8, 9), (9, 10), (10, 11), (11, 12), (12, 13), (13, 14), (14, 15), (15, 16), (16, 17), (17, 18), (18, 19), (19, 20), (20, 21), (21, 22), (22, 23), (23, 24), (24, 25), (25, 26), (26, 27), (27, 28), (28, 29), (29, 30), (30, 31), (0, 31), (32, 33), (33, 34), (34, 32), ]
-        mesh = obj.data
-        mesh.from_pydata([(a[0] * radius, head_tail, a[2] * radius) for a in verts], edges, [])
-        mesh.update()
+        verts = DIRECTED_CIRCLE_VERTS * radius
+        verts[:, 1] = head_tail
+        build_mesh(obj.data, verts, DIRECTED_CIRCLE_EDGES)
         return obj
     else:
         return None
@@ -19,12 +19,13 @@
 # <pep8 compliant>
 
 import bpy
+import os
 from bpy.props import BoolProperty, IntProperty, EnumProperty, StringProperty
 from mathutils import Color
 
 from .utils import (
     get_rig_type, MetarigError, write_metarig, write_widget, unique_name, get_keyed_frames,
-    bones_in_frame, overwrite_prop_animation
+    bones_in_frame, overwrite_prop_animation, invalidate_module_cache
 )
 from . import rig_lists, generate
 
@@ -143,7 +144,9 @@ class DATA_PT_gamerig(bpy.types.Panel):
             rig_name = obj.data.gamerig_rig_name
             target = next((i for i in context.scene.objects if i != obj and i.type == 'ARMATURE' and i.name == rig_name), None)
             if target:
-                layout.row().operator("pose.gamerig_generate", text="Regenerate Rig", icon='POSE_HLT')
+                row = layout.row(align=True)
+                row.operator("pose.gamerig_generate", text="Regenerate Rig", icon='POSE_HLT')
+                row.operator("pose.gamerig_generate", text="", icon='FILE_REFRESH').force = True
                 layout.row().box().label(text="Overwrite to '%s'" % target.name, icon='INFO')
             else:
                 layout.row().operator("pose.gamerig_generate", text="Generate New Rig", icon='POSE_HLT')
@@ -151,21 +154,7 @@ class DATA_PT_gamerig(bpy.types.Panel):
         elif obj.mode == 'EDIT':
             # Build types list
             collection_name = str(id_store.gamerig_collection).replace(" ", "")
-
-            for i in range(0, len(id_store.gamerig_types)):
-                id_store.gamerig_types.remove(0)
-
-            for r in rig_lists.rig_list:
-
-                if collection_name == "All":
-                    a = id_store.gamerig_types.add()
-                    a.name = r
-                elif r.startswith(collection_name + '.'):
-                    a = id_store.gamerig_types.add()
-                    a.name = r
-                elif (collection_name == "None") and ("." not in r):
-                    a = id_store.gamerig_types.add()
-                    a.name = r
+            sync_rig_types(id_store, rig_lists.filtered_rig_list(collection_name))
 
             # Rig type list
             layout.row().template_list("UI_UL_list", "gamerig_types", id_store, "gamerig_types", id_store, 'gamerig_active_type')
@@ -174,6 +163,21 @@ class DATA_PT_gamerig(bpy.types.Panel):
             props.metarig_type = id_store.gamerig_types[id_store.gamerig_active_type].name
 
 
+def sync_rig_types(id_store, rig_types):
+    """ Fills window_manager.gamerig_types with rig_types, unless it
+        already holds them from a previous redraw.
+    """
+    synced = getattr(sync_rig_types, 'synced', None)
+    if synced is not None and synced[0] == id_store.as_pointer() and synced[1] is rig_types\
+      and len(id_store.gamerig_types) == len(rig_types):
+        return
+    id_store.gamerig_types.clear()
+    for r in rig_types:
+        a = id_store.gamerig_types.add()
+        a.name = r
+    sync_rig_types.synced = (id_store.as_pointer(), rig_types)
+
+
 class DATA_OT_gamerig_add_bone_groups(bpy.types.Operator):
     bl_idname = "armature.gamerig_add_bone_groups"
     bl_label  = "GameRig Add Standard Bone Groups"
@@ -448,23 +452,8 @@ class BONE_PT_gamerig_type(bpy.types.Panel):
         layout = self.layout
 
         # Build types list
-        for i in range(0, len(id_store.gamerig_types)):
-            id_store.gamerig_types.remove(0)
+        sync_rig_types(id_store, rig_lists.filtered_rig_list(collection_name, include_implementation=False))
 
-        for r in rig_lists.rig_list:
-            if r in rig_lists.implementation_rigs:
-                continue
-            # collection = r.split('.')[0]  # UNUSED
-            if collection_name == "All":
-                a = id_store.gamerig_types.add()
-                a.name = r
-            elif r.startswith(collection_name + '.'):
-                a = id_store.gamerig_types.add()
-                a.name = r
-            elif collection_name == "None" and len(r.split('.')) == 1:
-                a = id_store.gamerig_types.add()
-                a.name = r
-        
         # Rig collection field
         row = layout.row()
         row.prop(id_store, 'gamerig_collection', text="Category")
@@ -476,6 +465,8 @@ class BONE_PT_gamerig_type(bpy.types.Panel):
         # Rig type parameters / Rig type non-exist alert
         if rig_name != "":
             try:
+                if rig_name not in rig_lists.rig_types:
+                    raise ImportError(rig_name)
                 rig = get_rig_type(rig_name)
                 rig.Rig
             except (ImportError, AttributeError):
@@ -507,6 +498,8 @@ class VIEW3D_PT_gamerig_dev_tools(bpy.types.Panel):
          and context.preferences.addons['gamerig'].preferences.shows_dev_tools
 
     def draw(self, context):
+        self.layout.row().operator("script.gamerig_reload_rig_types")
+
         obj = context.active_object
         if obj is not None:
             if context.mode == 'EDIT_ARMATURE':
@@ -592,6 +585,17 @@ class RevealUnlinkedWidget(bpy.types.Operator):
         return {'FINISHED'}
 
 
+class ReloadRigTypes(bpy.types.Operator):
+    """Reload all rig type and metarig modules on their next use"""
+
+    bl_idname  = "script.gamerig_reload_rig_types"
+    bl_label   = "Reload Rig Types"
+
+    def execute(self, context):
+        invalidate_module_cache()
+        return {'FINISHED'}
+
+
 class Generate(bpy.types.Operator):
     """Generates a rig from the active metarig armature"""
 
@@ -600,6 +604,12 @@ class Generate(bpy.types.Operator):
     bl_options     = {'UNDO'}
     bl_description = 'Generates a rig from the active metarig armature'
 
+    force: BoolProperty(
+        name="Force",
+        description="Regenerate even if the metarig has not changed since the last generation",
+        default=False
+    )
+
     @classmethod
     def poll(cls, context):
         return not context.object.hide_viewport and not context.object.hide_select
@@ -610,8 +620,14 @@ class Generate(bpy.types.Operator):
 
         use_global_undo = context.preferences.edit.use_global_undo
         context.preferences.edit.use_global_undo = False
+        profile_path = None
+        profile_dir = context.preferences.addons['gamerig'].preferences.profile_dir
+        if profile_dir:
+            profile_path = os.path.join(bpy.path.abspath(profile_dir), "gamerig_profile_%s" % bpy.path.clean_name(context.object.data.gamerig_rig_name))
+
         try:
-            generate.generate_rig(context, context.object)
+            if not generate.generate_rig(context, context.object, force=self.force, profile_path=profile_path):
+                self.report({'INFO'}, "Rig is up to date")
         except MetarigError as rig_exception:
             gamerig_report_exception(self, rig_exception)
         finally:
@@ -775,6 +791,7 @@ classes = (
     VIEW3D_PT_gamerig_dev_tools,
     LayerInit,
     RevealUnlinkedWidget,
+    ReloadRigTypes,
     Generate,
     Sample,
     EncodeMetarig,
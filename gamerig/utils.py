@@ -19,24 +19,31 @@
 # <pep8 compliant>
 
 import bpy
+import bisect
+import functools
 import imp
 import importlib
+import inspect
+import json
 import math
 import random
 import string
+import sys
 import time
 import re
 import os
 from mathutils import Vector, Matrix, Color
 from rna_prop_ui import rna_idprop_ui_prop_get
+from . import profiler
+from .naming import (
+    ORG_PREFIX, JIG_PREFIX, MCH_PREFIX,
+    strip_trailing_number, unique_name, basename, is_org, is_jig, is_mch,
+    org, mch, make_mechanism_name, insert_before_first_period
+)
 
 RIG_DIR = "rigs"  # Name of the directory where rig types are kept
 METARIG_DIR = "metarigs"  # Name of the directory where metarigs are kept
 
-ORG_PREFIX = "ORG-"  # Prefix of original bones.
-JIG_PREFIX = "JIG-"  # Prefix of jig bones. (delete automatically after generation.)
-MCH_PREFIX = "MCH-"  # Prefix of mechanism bones.
-
 MODULE_NAME = "gamerig"  # Windows/Mac blender is weird, so __package__ doesn't work --- realy even now?
 
 #=======================================================================
@@ -62,93 +69,143 @@ def random_id(length=10):
     return ''.join([random.choice(string.ascii_lowercase + string.digits) for i in range(length)])
     #return ''.join(random.choices(string.ascii_lowercase + string.digits, k=length))
 
-#=======================================================================
-# Name manipulation
-#=======================================================================
-
-def strip_trailing_number(s):
-    m = re.search(r'\.(\d{3})$', s)
-    return s[0:-4] if m else s
-
-
-def unique_name(collection, base_name):
-    base_name = strip_trailing_number(base_name)
-    count = 1
-    name = base_name
-
-    while collection.get(name):
-        name = "%s.%03d" % (base_name, count)
-        count += 1
-    return name
-
+#=======================
+# Mode switching
+#=======================
 
-def basename(name):
-    """ Returns the name with ORG_PREFIX stripped from it.
+class ModePipeline:
+    """ Bookkeeping for a mode-switch-free generation pass.
+        While a pipeline is active, set_mode() skips switches to the mode
+        the armature is already in, and pose bone work queued with
+        defer_pose() is applied in one batch the next time the armature
+        leaves edit mode.
+    """
+    def __init__(self):
+        self.performed = 0   # mode switches actually executed
+        self.saved     = 0   # mode switches the legacy code path would have made
+        self.pose_queue = []
+
+    def flush(self):
+        """ Runs every queued pose bone operation, in queue order. Each
+            counts towards the profiler span that queued it.
         """
-    if name.startswith(ORG_PREFIX):
-        return name[len(ORG_PREFIX):]
-    elif name.startswith(JIG_PREFIX):
-        return name[len(JIG_PREFIX):]
-    elif name.startswith(MCH_PREFIX):
-        return name[len(MCH_PREFIX):]
-    else:
-        return name
-
-
-def is_org(name):
-    return name.startswith(ORG_PREFIX) or name.startswith(JIG_PREFIX)
+        queue = self.pose_queue
+        self.pose_queue = []
+        obj = bpy.context.active_object
+        for func, args, span in queue:
+            with profiler.deferred(span, obj):
+                func(*args)
+        return len(queue)
 
+    def report(self):
+        return "Mode switches: %d performed, %d saved." % (self.performed, self.saved)
 
-def is_jig(name):
-    return name.startswith(JIG_PREFIX)
 
-
-def is_mch(name):
-    return name.startswith(MCH_PREFIX)
+def get_mode_pipeline():
+    """ Returns the active ModePipeline, or None.
+    """
+    return getattr(set_mode, 'pipeline', None)
 
 
-def org(name):
-    """ Prepends the ORG_PREFIX to a name if it doesn't already have
-        it, and returns it.
+def begin_mode_pipeline():
+    """ Starts a mode pipeline and returns it.
     """
-    if is_org(name):
-        return name
-    else:
-        return ORG_PREFIX + name
+    set_mode.pipeline = ModePipeline()
+    return set_mode.pipeline
 
 
-def mch(name):
-    """ Prepends the MCH_PREFIX to a name if it doesn't already have
-        it, and returns it.
+def end_mode_pipeline():
+    """ Flushes pending pose bone work and stops the active mode pipeline.
+        Returns the finished pipeline (or None if none was active).
     """
-    if name.startswith(MCH_PREFIX):
-        return name
+    pipeline = get_mode_pipeline()
+    if pipeline is not None:
+        if pipeline.pose_queue:
+            set_mode('OBJECT')
+            pipeline.flush()
+        set_mode.pipeline = None
+    return pipeline
+
+
+def set_mode(mode):
+    """ Switches the active object to the given mode.
+        Same as bpy.ops.object.mode_set() outside of a mode pipeline.
+    """
+    pipeline = get_mode_pipeline()
+    if pipeline is None:
+        bpy.ops.object.mode_set(mode=mode)
+        profiler.count(profiler.OPERATOR_CALLS)
+        profiler.count(profiler.MODE_SWITCHES)
+        return
+
+    obj = bpy.context.active_object
+    if obj is None or obj.mode != mode:
+        bpy.ops.object.mode_set(mode=mode)
+        profiler.count(profiler.OPERATOR_CALLS)
+        profiler.count(profiler.MODE_SWITCHES)
+        pipeline.performed += 1
     else:
-        return MCH_PREFIX + name
+        pipeline.saved += 1
 
-make_mechanism_name = mch
+    # Pose bones for newly created edit bones only exist outside of edit mode.
+    if mode != 'EDIT' and pipeline.pose_queue:
+        pipeline.flush()
 
 
-def insert_before_first_period(name, text):
-    t = name.split('.', 1)
-    return t[0] + text + '.' + t[1] if len(t) > 1 else name + text
+def defer_pose(func, *args):
+    """ Queues func(*args) to run the next time the armature leaves edit
+        mode. Runs it immediately if no mode pipeline is active.
+        Returns True if the call was deferred.
+    """
+    pipeline = get_mode_pipeline()
+    if pipeline is None:
+        func(*args)
+        return False
+    pipeline.pose_queue.append((func, args, profiler.current_span()))
+    return True
 
 #=======================
 # Bone manipulation
 #=======================
 
+def is_armature_model(obj):
+    """ Returns True if obj is an armature_model.ModelObject rather than a
+        Blender object.
+    """
+    return getattr(obj, 'is_armature_model', False)
+
+
+def is_edit_armature(obj):
+    """ Returns True if the edit bones of obj can be changed: obj is the
+        active armature in edit mode, or an armature model.
+    """
+    if is_armature_model(obj):
+        return True
+    return obj == bpy.context.active_object and bpy.context.mode == 'EDIT_ARMATURE'
+
+
 def new_bone(obj, bone_name):
     """ Adds a new bone to the given armature object.
         Returns the resulting bone's name.
     """
-    if obj == bpy.context.active_object and bpy.context.mode == 'EDIT_ARMATURE':
+    if is_edit_armature(obj):
         edit_bone = obj.data.edit_bones.new(bone_name)
         name = edit_bone.name
         edit_bone.head = (0, 0, 0)
         edit_bone.tail = (0, 1, 0)
         edit_bone.roll = 0
-        bpy.ops.object.mode_set(mode='OBJECT')
-        bpy.ops.object.mode_set(mode='EDIT')
+        pipeline = get_mode_pipeline()
+        if is_armature_model(obj):
+            # Model bones have their pose bone right away.
+            pass
+        elif pipeline is None:
+            bpy.ops.object.mode_set(mode='OBJECT')
+            bpy.ops.object.mode_set(mode='EDIT')
+            profiler.count(profiler.OPERATOR_CALLS, 2)
+            profiler.count(profiler.MODE_SWITCHES, 2)
+        else:
+            # The pose bone appears on the next batched leave of edit mode.
+            pipeline.saved += 2
         return name
     else:
         raise MetarigError("Can't add new bone '%s' outside of edit mode" % bone_name)
@@ -163,7 +220,7 @@ def copy_bone_simple(obj, bone_name, assign_name=''):
     if bone_name not in obj.data.edit_bones:
         raise MetarigError("copy_bone(): bone '%s' not found, cannot copy it" % bone_name)
 
-    if obj == bpy.context.active_object and bpy.context.mode == 'EDIT_ARMATURE':
+    if is_edit_armature(obj):
         if assign_name == '':
             assign_name = bone_name
         # Copy the edit bone
@@ -192,7 +249,10 @@ def copy_bone(obj, bone_name, assign_name=''):
     if bone_name not in obj.data.edit_bones:
         raise MetarigError("copy_bone(): bone '%s' not found, cannot copy it" % bone_name)
 
-    if obj == bpy.context.active_object and bpy.context.mode == 'EDIT_ARMATURE':
+    if is_armature_model(obj):
+        return obj.copy_bone(bone_name, assign_name)
+
+    if is_edit_armature(obj):
         if assign_name == '':
             assign_name = bone_name
         # Copy the edit bone
@@ -220,11 +280,29 @@ def copy_bone(obj, bone_name, assign_name=''):
         edit_bone_2.bbone_easein = edit_bone_1.bbone_easein
         edit_bone_2.bbone_easeout = edit_bone_1.bbone_easeout
 
-        bpy.ops.object.mode_set(mode='OBJECT')
+        if get_mode_pipeline() is not None:
+            defer_pose_copy(obj, bone_name_1, bone_name_2)
+        else:
+            bpy.ops.object.mode_set(mode='OBJECT')
+            copy_pose_bones(obj, [(bone_name_1, bone_name_2)])
+            bpy.ops.object.mode_set(mode='EDIT')
+            profiler.count(profiler.OPERATOR_CALLS, 2)
+            profiler.count(profiler.MODE_SWITCHES, 2)
+
+        return bone_name_2
+    else:
+        raise MetarigError("Cannot copy bones outside of edit mode")
 
-        # Get the pose bones
-        pose_bone_1 = obj.pose.bones[bone_name_1]
-        pose_bone_2 = obj.pose.bones[bone_name_2]
+
+def copy_pose_bones(obj, pairs):
+    """ Copies rotation mode, transform locks and custom properties for each
+        (source, destination) pose bone name pair.
+        Must be out of edit mode.
+    """
+    pose_bones = obj.pose.bones
+    for bone_name_1, bone_name_2 in pairs:
+        pose_bone_1 = pose_bones[bone_name_1]
+        pose_bone_2 = pose_bones[bone_name_2]
 
         # Copy pose bone attributes
         pose_bone_2.rotation_mode = pose_bone_1.rotation_mode
@@ -248,11 +326,22 @@ def copy_bone(obj, bone_name, assign_name=''):
                     for key in prop1.keys():
                         prop2[key] = prop1[key]
 
-        bpy.ops.object.mode_set(mode='EDIT')
 
-        return bone_name_2
+def defer_pose_copy(obj, bone_name_1, bone_name_2):
+    """ Records a pose bone copy for the active mode pipeline.
+        Consecutive copies on the same armature, made in the same profiler
+        span, are merged into a single copy_pose_bones() call, applied when
+        the armature leaves edit mode.
+    """
+    pipeline = get_mode_pipeline()
+    queue = pipeline.pose_queue
+    span = profiler.current_span()
+    if queue and queue[-1][0] is copy_pose_bones and queue[-1][1][0] == obj and queue[-1][2] is span:
+        queue[-1][1][1].append((bone_name_1, bone_name_2))
     else:
-        raise MetarigError("Cannot copy bones outside of edit mode")
+        queue.append((copy_pose_bones, (obj, [(bone_name_1, bone_name_2)]), span))
+    # copy_bone() would have left and re-entered edit mode here.
+    pipeline.saved += 2
 
 
 def flip_bone(obj, bone_name):
@@ -261,7 +350,7 @@ def flip_bone(obj, bone_name):
     if bone_name not in obj.data.bones:
         raise MetarigError("flip_bone(): bone '%s' not found, cannot copy it" % bone_name)
 
-    if obj == bpy.context.active_object and bpy.context.mode == 'EDIT_ARMATURE':
+    if is_edit_armature(obj):
         bone = obj.data.edit_bones[bone_name]
         head = Vector(bone.head)
         tail = Vector(bone.tail)
@@ -278,7 +367,7 @@ def put_bone(obj, bone_name, pos):
     if bone_name not in obj.data.bones:
         raise MetarigError("put_bone(): bone '%s' not found, cannot move it" % bone_name)
 
-    if obj == bpy.context.active_object and bpy.context.mode == 'EDIT_ARMATURE':
+    if is_edit_armature(obj):
         bone = obj.data.edit_bones[bone_name]
 
         delta = pos - bone.head
@@ -316,8 +405,63 @@ def obj_to_bone(obj, rig, bone_name):
     obj.scale = (bone.length * scl_avg), (bone.length * scl_avg), (bone.length * scl_avg)
 
 
-def create_widget(rig, bone_name, bone_transform_name=None):
+class WidgetRegistry:
+    """ The widget name -> object mapping of a generated rig, kept on its
+        armature in gamerig_widgets, so that regeneration finds the widgets
+        again without searching the scene and blend data by name.
+    """
+    def __init__(self, rig):
+        self.rig = rig
+        self.widgets = {w.name: w.widget for w in rig.data.gamerig_widgets if w.widget is not None}
+        self.used = {}
+        self.orphan_meshes = []
+
+    def find(self, name):
+        """ Returns the widget object of a name, or None.
+        """
+        obj = self.widgets.get(name)
+        if obj is not None and obj.name == name:
+            return obj
+        # Unregistered (new bone, or a rig generated before the registry)
+        return bpy.data.objects.get(name)
+
+    def store(self):
+        """ Records the widgets used by this generation on the rig, and
+            removes the previous widgets that are no longer used.
+        """
+        stale = [
+            obj for name, obj in self.widgets.items()
+            if name not in self.used and obj.name == name and not obj.users_scene
+        ]
+        entries = self.rig.data.gamerig_widgets
+        entries.clear()
+        for name, obj in self.used.items():
+            entry = entries.add()
+            entry.name = name
+            entry.widget = obj
+
+        meshes = [mesh for mesh in self.orphan_meshes if mesh.users == 0]
+        if hasattr(bpy.data, 'batch_remove'):
+            bpy.data.batch_remove(stale + meshes)
+        else:
+            for obj in stale:
+                bpy.data.objects.remove(obj)
+            for mesh in meshes:
+                bpy.data.meshes.remove(mesh)
+
+
+def get_widget_registry(rig):
+    """ Returns the WidgetRegistry of rig for the current generation.
+    """
+    registry = getattr(create_widget, 'registry', None)
+    if registry is None or registry.rig != rig:
+        registry = create_widget.registry = WidgetRegistry(rig)
+    return registry
+
+
+def create_widget(rig, bone_name, bone_transform_name=None, mesh=None):
     """ Creates an empty widget object for a bone, and returns the object.
+        mesh: existing mesh for the object to use, instead of a new empty one.
     """
     if bone_transform_name is None:
         bone_transform_name = bone_name
@@ -325,30 +469,32 @@ def create_widget(rig, bone_name, bone_transform_name=None):
     obj_name = get_wgt_name(rig.name, bone_name)
     scene = bpy.context.scene
     collection = bpy.context.collection
-    id_store = bpy.context.window_manager
+    registry = get_widget_registry(rig)
+    obj = registry.find(obj_name)
 
     # Check if it already exists in the scene
-    if obj_name in scene.objects:
+    if obj is not None and scene in obj.users_scene:
         # Move object to bone position, in case it changed
-        obj = scene.objects[obj_name]
         obj_to_bone(obj, rig, bone_transform_name)
+        registry.used[obj_name] = obj
 
         return None
     else:
-        # Delete object if it exists in blend data but not scene data.
-        # This is necessary so we can then create the object without
-        # name conflicts.
-        if obj_name in bpy.data.objects:
-            bpy.data.objects[obj_name].user_clear()
-            bpy.data.objects.remove(bpy.data.objects[obj_name])
-
-        # Create mesh object
-        mesh = bpy.data.meshes.new(obj_name)
-        obj = bpy.data.objects.new(obj_name, mesh)
+        if mesh is None:
+            mesh = bpy.data.meshes.new(obj_name)
+        if obj is not None:
+            # Reuse the widget object from the previous generation, with new geometry
+            registry.orphan_meshes.append(obj.data)
+            obj.data = mesh
+            for mod in list(obj.modifiers):
+                obj.modifiers.remove(mod)
+        else:
+            obj = bpy.data.objects.new(obj_name, mesh)
         collection.objects.link(obj)
         if not hasattr(create_widget, 'created_widgets') or create_widget.created_widgets is None:
             create_widget.created_widgets = []
         create_widget.created_widgets.append((obj, bone_name))
+        registry.used[obj_name] = obj
 
         # Move object to bone position and set layers
         obj_to_bone(obj, rig, bone_transform_name)
@@ -356,6 +502,42 @@ def create_widget(rig, bone_name, bone_transform_name=None):
         return obj
 
 
+def shared_widget(func):
+    """ Decorates a widget shape function, so that the mesh it builds is
+        shared by all the bones it is called for with the same parameters
+        during a generation, instead of being rebuilt for each of them.
+    """
+    signature = inspect.signature(func)
+    per_bone = list(signature.parameters)[:2] + ['bone_transform_name']
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        call = signature.bind(*args, **kwargs)
+        call.apply_defaults()
+        key = (func.__module__, func.__name__) + tuple(
+            item for item in call.arguments.items() if item[0] not in per_bone
+        )
+        if getattr(create_widget, 'shared_widgets', None) is None:
+            create_widget.shared_widgets = {}
+        shared = create_widget.shared_widgets.get(key)
+
+        if shared is None:
+            created = len(create_widget.created_widgets or [])
+            result = func(*args, **kwargs)
+            if len(create_widget.created_widgets or []) > created:
+                create_widget.shared_widgets[key] = create_widget.created_widgets[-1][0]
+            return result
+
+        rig, bone_name = list(call.arguments.values())[:2]
+        obj = create_widget(rig, bone_name, call.arguments.get('bone_transform_name'), mesh=shared.data)
+        if obj is not None:
+            for mod in shared.modifiers:
+                copy_attributes(mod, obj.modifiers.new(mod.name, mod.type))
+        return obj
+
+    return wrapper
+
+
 def assign_and_unlink_all_widgets(collection, armature):
     """ Unlink all created widget objects from current scene for cleanup.
     """
@@ -364,6 +546,8 @@ def assign_and_unlink_all_widgets(collection, armature):
             armature.pose.bones[bone_name].custom_shape = obj
             collection.objects.unlink(obj)
         create_widget.created_widgets = None
+    get_widget_registry(armature).store()
+    create_widget.registry = None
 
 
 #=============================================
@@ -509,45 +693,298 @@ def align_bone_y_axis(obj, bone, vec):
 # Misc
 #=============================================
 
+# Attributes copy_attributes() sets before the others of their RNA type, as
+# the others depend on them (the type of the ID, the number of coefficients).
+COPY_FIRST_ATTRIBUTES = {
+    'DriverTarget': ('id_type',),
+    'FModifierGenerator': ('poly_order',),
+}
+# Attributes only writable in some states of their struct, which
+# copy_attributes() checks before setting them.
+COPY_GUARDED_ATTRIBUTES = {
+    'DriverTarget': ('id_type',),  # Only for single property driver variables
+}
+
+
+def get_copy_attributes(a):
+    """ Returns the names of the writable RNA properties of a's type,
+        the attributes copy_attributes() transfers. Cached per RNA type.
+    """
+    rna = a.bl_rna
+    keys = get_copy_attributes.cache.get(rna.identifier)
+    if keys is None:
+        keys = tuple(sorted(
+            prop.identifier for prop in rna.properties
+            if not prop.is_readonly
+            and not prop.identifier.startswith("_")
+            and not prop.identifier.startswith("error_")
+            and prop.identifier not in ("group", "is_valid", "rna_type")
+        ))
+        get_copy_attributes.cache[rna.identifier] = keys
+    return keys
+
+get_copy_attributes.cache = {}
+
+
+def is_id_type(struct):
+    """ True if an RNA struct type is an ID type (Object, Text, ...).
+    """
+    while struct is not None:
+        if struct.identifier == 'ID':
+            return True
+        struct = struct.base
+    return False
+
+
+def get_copy_plan(a):
+    """ Returns the attributes copy_attributes() sets, in order, for a's
+        RNA type: the writable properties, without collections and pointers
+        to structs of other IDs, COPY_FIRST_ATTRIBUTES first. Cached per
+        RNA type.
+    """
+    rna = a.bl_rna
+    plan = get_copy_plan.cache.get(rna.identifier)
+    if plan is None:
+        keys = [
+            key for key in get_copy_attributes(a)
+            if rna.properties[key].type != 'COLLECTION'
+            and (rna.properties[key].type != 'POINTER' or is_id_type(rna.properties[key].fixed_type))
+        ]
+        first = [key for key in COPY_FIRST_ATTRIBUTES.get(rna.identifier, ()) if key in keys]
+        plan = tuple(first + [key for key in keys if key not in first])
+        get_copy_plan.cache[rna.identifier] = plan
+    return plan
+
+get_copy_plan.cache = {}
+
+
 def copy_attributes(a, b):
-    keys = dir(a)
-    for key in keys:
-        if not key.startswith("_") \
-        and not key.startswith("error_") \
-        and key != "group" \
-        and key != "is_valid" \
-        and key != "rna_type" \
-        and key != "bl_rna":
+    """ Copies the writable RNA properties of a to b, a struct of the same type.
+    """
+    guarded = COPY_GUARDED_ATTRIBUTES.get(a.bl_rna.identifier, ())
+    for key in get_copy_plan(a):
+        if key not in guarded or not b.is_property_readonly(key):
+            setattr(b, key, getattr(a, key))
+
+
+class ParameterRecorder:
+    """ Stands in for the GameRigParameters class in a rig type's
+        add_parameters(), recording the names and declarations of the
+        parameters it adds. With params None, they are only recorded.
+    """
+    def __init__(self, params=None):
+        object.__setattr__(self, 'params', params)
+        object.__setattr__(self, 'names', [])
+        object.__setattr__(self, 'declarations', {})
+
+    def __setattr__(self, name, value):
+        if name not in self.names:
+            self.names.append(name)
+        self.declarations[name] = value
+        if self.params is not None:
+            setattr(self.params, name, value)
+
+    def __getattr__(self, name):
+        if self.params is None:
+            raise AttributeError(name)
+        return getattr(self.params, name)
+
+    def to_json(self):
+        """ Returns the recorded declarations as [name, property type,
+            keywords] lists, or None if any cannot be stored as JSON
+            (e.g. update callbacks).
+        """
+        result = []
+        for name in self.names:
+            value = self.declarations[name]
+            if hasattr(value, 'function'):
+                function, keywords = value.function, value.keywords
+            elif isinstance(value, tuple) and len(value) == 2 and isinstance(value[1], dict):
+                function, keywords = value
+            else:
+                return None
             try:
-                setattr(b, key, getattr(a, key))
-            except AttributeError:
-                pass
+                json.dumps(keywords)
+            except (TypeError, ValueError):
+                return None
+            result.append([name, function.__name__, keywords])
+        return result
+
+
+def make_property(prop_type, keywords):
+    """ Returns a bpy.props declaration from ParameterRecorder.to_json() data.
+    """
+    def to_tuples(value):
+        if isinstance(value, list):
+            return tuple(to_tuples(v) for v in value)
+        return value
+
+    return getattr(bpy.props, prop_type)(**{k: to_tuples(v) for k, v in keywords.items()})
+
+
+def reloads_changed_modules():
+    """ Whether rig type and metarig modules are reloaded when their files
+        change (add-on preference, for rig development).
+    """
+    try:
+        return bpy.context.preferences.addons[MODULE_NAME].preferences.reloads_rig_types
+    except (AttributeError, KeyError):
+        return False
+
+
+def _module_mtime(module):
+    try:
+        return os.stat(module.__file__).st_mtime_ns
+    except (AttributeError, TypeError, OSError):
+        return None
+
+
+def load_module(name):
+    """ Imports a module of the add-on by relative name and returns it.
+        Modules are cached; a cached module is reloaded only after
+        invalidate_module_cache(), or when its file changed while
+        reloads_changed_modules() is on.
+    """
+    entry = load_module.cache.get(name)
+    if entry is not None:
+        module, mtime = entry
+        if not reloads_changed_modules() or _module_mtime(module) == mtime:
+            return module
+        module = importlib.reload(module)
+    elif MODULE_NAME + name in sys.modules:
+        # Imported before the cache was invalidated, or by a previous load of the add-on
+        module = importlib.reload(sys.modules[MODULE_NAME + name])
+    else:
+        module = importlib.import_module(name, package=MODULE_NAME)
+    load_module.cache[name] = (module, _module_mtime(module))
+    return module
+
+load_module.cache = {}
+
+
+def invalidate_module_cache():
+    """ Makes load_module() reload every cached module on next use.
+    """
+    load_module.cache.clear()
 
 
 def get_rig_type(rig_type):
     """ Fetches a rig module by name, and returns it.
     """
-    name = ".%s.%s" % (RIG_DIR, rig_type)
-    submod = importlib.import_module(name, package=MODULE_NAME)
-    importlib.reload(submod)
-    return submod
+    return load_module(".%s.%s" % (RIG_DIR, rig_type))
 
 
 def get_metarig_module(metarig_name, path=METARIG_DIR):
     """ Fetches a rig module by name, and returns it.
     """
+    return load_module(".%s.%s" % (path, metarig_name))
 
-    name = ".%s.%s" % (path, metarig_name)
-    submod = importlib.import_module(name, package=MODULE_NAME)
-    importlib.reload(submod)
-    return submod
+
+class BoneHierarchy:
+    """ Index of an armature's bone hierarchy, built in a single pass over
+        its bones (or edit bones): parent, depth, children and connection
+        of every bone, by name. If pose_bones is given, the gamerig_type
+        of every bone is indexed as well.
+    """
+    def __init__(self, bones, pose_bones=None):
+        self.rig_type = {}
+        if pose_bones is not None:
+            for pb in pose_bones:
+                self.rig_type[pb.name] = pb.gamerig_type
+        self.parent = {}
+        self.children = {}
+        self.connected = {}
+        for bone in bones:
+            name = bone.name
+            parent = bone.parent
+            self.parent[name] = parent.name if parent else None
+            self.connected[name] = bone.use_connect
+            self.children.setdefault(name, [])
+            if parent:
+                self.children.setdefault(parent.name, []).append(name)
+
+        self.depth = {}
+        for name in self.parent:
+            chain = []
+            while name is not None and name not in self.depth:
+                chain.append(name)
+                name = self.parent[name]
+            depth = -1 if name is None else self.depth[name]
+            for name in reversed(chain):
+                depth += 1
+                self.depth[name] = depth
+
+    def __contains__(self, name):
+        return name in self.parent
+
+    def sorted(self, names):
+        """ Returns names ordered root-most to leaf-most, then alphabetically.
+        """
+        return sorted(names, key=lambda name: (self.depth[name], name))
+
+    def ancestors(self, name):
+        """ Yields the names of the parents of a bone, nearest first.
+        """
+        name = self.parent[name]
+        while name is not None:
+            yield name
+            name = self.parent[name]
+
+    def nearest_ancestor(self, name, rig_type):
+        """ Returns the name of the nearest parent of a bone with the given
+            gamerig_type, or None.
+        """
+        for ancestor in self.ancestors(name):
+            if self.rig_type.get(ancestor) == rig_type:
+                return ancestor
+        return None
+
+    def connected_chain(self, name):
+        """ Same as connected_children_names().
+        """
+        names = []
+        while True:
+            connected = [child for child in self.children[name] if self.connected[child]]
+            if len(connected) != 1:
+                return names
+            name = connected[0]
+            names.append(name)
+
+
+def get_bone_hierarchy(obj):
+    """ Returns the shared BoneHierarchy of obj, or None if there is none
+        or it was invalidated.
+    """
+    cache = getattr(get_bone_hierarchy, 'cache', None)
+    if cache is not None and cache[0] == obj.as_pointer():
+        return cache[1]
+    return None
+
+
+def set_bone_hierarchy(obj, hierarchy):
+    """ Shares a BoneHierarchy of obj with connected_children_names() and
+        find_root_bone(), until invalidate_bone_hierarchy() is called.
+        It must be invalidated as soon as bones are added or reparented.
+    """
+    get_bone_hierarchy.cache = (obj.as_pointer(), hierarchy)
 
 
-def connected_children_names(obj, bone_name):
+def invalidate_bone_hierarchy():
+    get_bone_hierarchy.cache = None
+
+
+def connected_children_names(obj, bone_name, hierarchy=None):
     """ Returns a list of bone names (in order) of the bones that form a single
         connected chain starting with the given bone as a parent.
         If there is a connected branch, the list stops there.
+        hierarchy: BoneHierarchy of obj to walk instead of the bones, defaults
+        to the shared one.
     """
+    if hierarchy is None:
+        hierarchy = get_bone_hierarchy(obj)
+    if hierarchy is not None and bone_name in hierarchy:
+        return hierarchy.connected_chain(bone_name)
+
     bone = obj.data.bones[bone_name]
     names = []
 
@@ -568,10 +1005,17 @@ def connected_children_names(obj, bone_name):
 
     return names
 
-def find_root_bone(obj, bone_name):
+def find_root_bone(obj, bone_name, hierarchy=None):
     """ Find root rig original bone from all parent.
         This works while initializing (inner rig's __init__ function) only.
+        hierarchy: BoneHierarchy of obj to walk instead of the bones, defaults
+        to the shared one.
     """
+    if hierarchy is None:
+        hierarchy = get_bone_hierarchy(obj)
+    if hierarchy is not None and bone_name in hierarchy and hierarchy.rig_type:
+        return hierarchy.nearest_ancestor(bone_name, 'root')
+
     bone = obj.data.edit_bones[bone_name]
     if bone:
         bone = bone.parent
@@ -838,19 +1282,124 @@ def gamma_correct(color):
 #=============================================
 
 
-def get_keyed_frames(rig):
-    frames = []
-    if rig.animation_data:
-        if rig.animation_data.action:
-            fcus = rig.animation_data.action.fcurves
-            for fc in fcus:
-                for kp in fc.keyframe_points:
-                    if kp.co[0] not in frames:
-                        frames.append(kp.co[0])
+def _fcurve_frames(fcurve):
+    """ Returns the keyframe coordinates of an fcurve as a flat [frame, value, ...] list.
+    """
+    co = [0.0] * (2 * len(fcurve.keyframe_points))
+    fcurve.keyframe_points.foreach_get('co', co)
+    return co
+
+
+def _split_bone_data_path(data_path):
+    """ Splits 'pose.bones["bone"].prop' or 'pose.bones["bone"]["prop"]'
+        into (bone, prop), or returns None for other paths.
+    """
+    if not data_path.startswith('pose.bones["'):
+        return None
+    end = data_path.find('"]', 12)
+    if end < 0:
+        return None
+    bone_name = data_path[12:end]
+    rest = data_path[end + 2:]
+    if rest.startswith('["') and rest.endswith('"]'):
+        return bone_name, rest[2:-2]
+    return bone_name, rest.lstrip('.')
+
+
+class KeyframeIndex:
+    """ Keyframes of an action, with the fcurve data paths grouped by bone
+        and property and the keyed frames kept sorted for binary searches.
+        Holds no RNA references, so a cached index never outlives its fcurves.
+    """
+    def __init__(self, signature):
+        self.fcurves = {}       # (bone, prop) -> [(data_path, array_index), ...]
+        self.bone_frames = {}   # bone -> sorted keyed frames
+        frames = set()
+        bone_frames = {}
+        for data_path, array_index, curve_frames in signature:
+            frames.update(curve_frames)
+            key = _split_bone_data_path(data_path)
+            if key is None:
+                continue
+            self.fcurves.setdefault(key, []).append((data_path, array_index))
+            bone_frames.setdefault(key[0], set()).update(curve_frames)
+        self.frames = sorted(frames)
+        for bone_name, bone_set in bone_frames.items():
+            self.bone_frames[bone_name] = sorted(bone_set)
+
+    @staticmethod
+    def action_signature(action):
+        """ Returns the data path, array index and keyed frames of each fcurve
+            of an action, read with one foreach_get per fcurve.
+        """
+        return tuple(
+            (fcurve.data_path, fcurve.array_index, tuple(_fcurve_frames(fcurve)[0::2]))
+            for fcurve in action.fcurves
+        )
+
+    def is_bone_keyed(self, bone_name, frame):
+        """ True if the named bone has a key at frame.
+        """
+        frames = self.bone_frames.get(bone_name)
+        if not frames:
+            return False
+        i = bisect.bisect_left(frames, frame)
+        return i < len(frames) and frames[i] == frame
+
+    def find_fcurve(self, action, bone_name, prop_name):
+        """ Returns the first fcurve of action animating prop_name of the named bone, or None.
+        """
+        for data_path, array_index in self.fcurves.get((bone_name, prop_name), ()):
+            fcurve = action.fcurves.find(data_path, index=array_index)
+            if fcurve is not None:
+                return fcurve
+        return None
+
+
+def get_keyframe_index(rig):
+    """ Returns the KeyframeIndex of the rig's active action, or None.
+        The index is cached per action. It is dropped when the action is
+        edited (see invalidate_edited_keyframe_indices()) or its fcurve
+        count changes, and reading it costs no keyframe reads otherwise.
+    """
+    action = rig.animation_data.action if rig.animation_data else None
+    if action is None:
+        return None
+    pointer = action.as_pointer()
+    entry = get_keyframe_index.cache.get(pointer)
+    if entry is None or entry[0] != len(action.fcurves):
+        entry = (len(action.fcurves), KeyframeIndex(KeyframeIndex.action_signature(action)))
+        get_keyframe_index.cache[pointer] = entry
+    return entry[1]
+
+get_keyframe_index.cache = {}
+
+
+@bpy.app.handlers.persistent
+def invalidate_keyframe_index(*args):
+    """ Drops all cached keyframe indices.
+        Also registered as a load_post/undo_post handler, as action
+        pointers can be reused once the file or undo step changes.
+    """
+    get_keyframe_index.cache.clear()
+
+
+@bpy.app.handlers.persistent
+def invalidate_edited_keyframe_indices(*args):
+    """ Drops the cached keyframe indices of edited actions.
+        Runs as a depsgraph update handler.
+    """
+    if not get_keyframe_index.cache:
+        return
+    depsgraph = args[1] if len(args) > 1 else bpy.context.evaluated_depsgraph_get()
+    for update in depsgraph.updates:
+        if isinstance(update.id, bpy.types.Action):
+            get_keyframe_index.cache.pop(update.id.original.as_pointer(), None)
 
-    frames.sort()
 
-    return frames
+def get_keyed_frames(rig):
+    index = get_keyframe_index(rig)
+    return list(index.frames) if index else []
 
 
 def bones_in_frame(f, rig, *args):
@@ -861,38 +1410,24 @@ def bones_in_frame(f, rig, *args):
     :param args: bone names
     :return:
     """
-
-    if rig.animation_data and rig.animation_data.action:
-        fcus = rig.animation_data.action.fcurves
-    else:
+    index = get_keyframe_index(rig)
+    if index is None:
         return False
-
-    for fc in fcus:
-        animated_frames = [kp.co[0] for kp in fc.keyframe_points]
-        for bone in args:
-            if bone in fc.data_path.split('"') and f in animated_frames:
-                return True
-
-    return False
+    return any(index.is_bone_keyed(bone, f) for bone in args)
 
 
 def overwrite_prop_animation(rig, bone, prop_name, value, frames):
-    act = rig.animation_data.action
-    if not act:
+    index = get_keyframe_index(rig)
+    if index is None:
         return
 
-    bone_name = bone.name
-    curve = None
-
-    for fcu in act.fcurves:
-        words = fcu.data_path.split('"')
-        if words[0] == "pose.bones[" and words[1] == bone_name and words[-2] == prop_name:
-            curve = fcu
-            break
-
+    curve = index.find_fcurve(rig.animation_data.action, bone.name, prop_name)
     if not curve:
         return
 
-    for kp in curve.keyframe_points:
-        if kp.co[0] in frames:
-            kp.co[1] = value
+    frames = set(frames)
+    co = _fcurve_frames(curve)
+    for i in range(0, len(co), 2):
+        if co[i] in frames:
+            co[i + 1] = value
+    curve.keyframe_points.foreach_set('co', co)